@@ -1,9 +1,9 @@
-import smbus
+from i2c_bus import get_bus
 import time
 
 class Adc:
     def __init__(self):
-        self.bus = smbus.SMBus(1)
+        self.bus = get_bus().client("adc")
         self.ADDRESS = 0x48
         self.PCF8591_CMD = 0x40
         self.ADS7830_CMD = 0x84
@@ -28,15 +28,33 @@ class Adc:
     
     def recv_ads7830(self, channel):
         command_set = self.ADS7830_CMD | ((((channel << 2) | (channel >> 1)) & 0x07) << 4)
-        self.bus.write_byte(self.ADDRESS, command_set)
+        # One bus transaction per attempt, so retries never hold off motor or servo writes.
         while True:
-            value1, value2 = self.bus.read_byte(self.ADDRESS), self.bus.read_byte(self.ADDRESS)
+            with self.bus.transaction():
+                self.bus.write_byte(self.ADDRESS, command_set)
+                value1, value2 = self.bus.read_byte(self.ADDRESS), self.bus.read_byte(self.ADDRESS)
             if value1 == value2:
                 break
         return round(value1 / 255.0 * 3.3, 2)
     
+    def read_once(self, channel):
+        """
+        One conversion in volts with a fixed number of bus transfers (no
+        retry loop); the first read returns the previous conversion and is
+        dropped. Noise is left to the caller, e.g. AdcSampler's median filter.
+        """
+        with self.bus.transaction():
+            if self.Index == "PCF8591":
+                self.bus.read_byte_data(self.ADDRESS, self.PCF8591_CMD + channel)
+                return round(self.bus.read_byte_data(self.ADDRESS, self.PCF8591_CMD + channel) / 256.0 * 3.3, 2)
+            self.bus.write_byte(self.ADDRESS, self.ADS7830_CMD | ((((channel << 2) | (channel >> 1)) & 0x07) << 4))
+            self.bus.read_byte(self.ADDRESS)
+            return round(self.bus.read_byte(self.ADDRESS) / 255.0 * 3.3, 2)
+    
     def recv_adc(self, channel):
         return self.recv_pcf8591(channel) if self.Index == "PCF8591" else self.recv_ads7830(channel)
+
+    recvADC = recv_adc  # name used by server.py, Light.py and Motor.Rotate
     
     def close(self):
         self.bus.close()
@@ -1,5 +1,5 @@
 import time
-from gpiozero import Buzzer as GPIOBuzzer
+from hal import GPIOBuzzer
 from Command import COMMAND as cmd
 
 class Buzzer:
@@ -10,6 +10,7 @@ class COMMAND:
     CMD_LIGHT = "CMD_LIGHT"
     CMD_POWER = "CMD_POWER" 
     CMD_MODE ="CMD_MODE"
+    CMD_PROTOCOL = "CMD_PROTOCOL"
     
     def __init__(self):
         pass
@@ -1,13 +1,14 @@
 import time
 from Motor import *
 from ADC import *
+import devices
 
 class Light:
     
     def run(self):
         try:
-            self.adc=Adc()
-            self.PWM=Motor()
+            self.adc=devices.get("adc_sampler")
+            self.PWM=devices.get("motor")
             self.PWM.setMotorModel(0,0,0,0)
             while True:
                 L = self.adc.recvADC(0)
@@ -23,6 +24,7 @@ class Light:
                         
                     elif R > L :
                         self.PWM.setMotorModel(1400,1400,-1200,-1200)
+                time.sleep(0.05)  # the sampler refreshes channels 0/1 at 20 Hz
                     
         except KeyboardInterrupt:
            led_Car.PWM.setMotorModel(0,0,0,0) 
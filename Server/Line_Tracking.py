@@ -1,13 +1,13 @@
 import time
 from Motor import *
-from gpiozero import LineSensor
+import devices
 
 IR01 = 14
 IR02 = 15
 IR03 = 23
-IR01_sensor = LineSensor(IR01)
-IR02_sensor = LineSensor(IR02)
-IR03_sensor = LineSensor(IR03)
+IR01_sensor = devices.lazy("ir01")
+IR02_sensor = devices.lazy("ir02")
+IR03_sensor = devices.lazy("ir03")
 
 class Line_Tracking:
     def __init__(self):
@@ -48,7 +48,7 @@ class Line_Tracking:
                 #pass
                 PWM.setMotorModel(0,0,0,0)
             
-infrared=Line_Tracking()
+infrared=devices.lazy("line_tracking")
 
 if __name__ == '__main__':
     print ('Program is starting ... ')
@@ -2,14 +2,20 @@ import time
 import math
 from PCA9685 import PCA9685
 from ADC import *
+from sensor_events import MotorRecord
+import devices
+import sensor_events
 
 class Motor:
-    def __init__(self):
+    def __init__(self, burst=True, cache=True):
         self.last_command = [0, 0, 0, 0]
-        self.pwm = PCA9685(0x40, debug=True)
+        self.pwm = PCA9685(0x40, debug=True, burst=burst, cache=cache)
         self.pwm.setPWMFreq(50)
         self.time_proportion = 3
-        self.adc = Adc()
+        self.adc = devices.lazy("adc_sampler")  # only Rotate reads the battery
+        self.commands = 0
+        self.command_transactions = 0
+        self.command_bus_time = 0.0
     def duty_range(self,duty1,duty2,duty3,duty4):
         if duty1>4095:
             duty1=4095
@@ -31,56 +37,55 @@ class Motor:
         elif duty4<-4095:
             duty4=-4095
         return duty1,duty2,duty3,duty4
-        
-    def left_Upper_Wheel(self,duty):
+
+    @staticmethod
+    def wheel_duties(duty):
+        """(forward channel duty, reverse channel duty) of one wheel; 0 brakes both."""
         if duty>0:
-            self.pwm.setMotorPwm(0,0)
-            self.pwm.setMotorPwm(1,duty)
+            return duty,0
         elif duty<0:
-            self.pwm.setMotorPwm(1,0)
-            self.pwm.setMotorPwm(0,abs(duty))
-        else:
-            self.pwm.setMotorPwm(0,4095)
-            self.pwm.setMotorPwm(1,4095)
+            return 0,abs(duty)
+        return 4095,4095
+
+    def left_Upper_Wheel(self,duty):
+        forward,reverse=self.wheel_duties(duty)
+        self.pwm.setMotorPwms(0,[reverse,forward])
     def left_Lower_Wheel(self,duty):
-        if duty>0:
-            self.pwm.setMotorPwm(3,0)
-            self.pwm.setMotorPwm(2,duty)
-        elif duty<0:
-            self.pwm.setMotorPwm(2,0)
-            self.pwm.setMotorPwm(3,abs(duty))
-        else:
-            self.pwm.setMotorPwm(2,4095)
-            self.pwm.setMotorPwm(3,4095)
+        forward,reverse=self.wheel_duties(duty)
+        self.pwm.setMotorPwms(2,[forward,reverse])
     def right_Upper_Wheel(self,duty):
-        if duty>0:
-            self.pwm.setMotorPwm(6,0)
-            self.pwm.setMotorPwm(7,duty)
-        elif duty<0:
-            self.pwm.setMotorPwm(7,0)
-            self.pwm.setMotorPwm(6,abs(duty))
-        else:
-            self.pwm.setMotorPwm(6,4095)
-            self.pwm.setMotorPwm(7,4095)
+        forward,reverse=self.wheel_duties(duty)
+        self.pwm.setMotorPwms(6,[reverse,forward])
     def right_Lower_Wheel(self,duty):
-        if duty>0:
-            self.pwm.setMotorPwm(4,0)
-            self.pwm.setMotorPwm(5,duty)
-        elif duty<0:
-            self.pwm.setMotorPwm(5,0)
-            self.pwm.setMotorPwm(4,abs(duty))
-        else:
-            self.pwm.setMotorPwm(4,4095)
-            self.pwm.setMotorPwm(5,4095)
+        forward,reverse=self.wheel_duties(duty)
+        self.pwm.setMotorPwms(4,[reverse,forward])
             
  
     def setMotorModel(self,duty1,duty2,duty3,duty4):
+        """All four wheels (channels 0-7) in one block write; publishes a MotorRecord when the duties change."""
+        transactions,bus_time=self.pwm.transactions,self.pwm.bus_time
         duty1,duty2,duty3,duty4=self.duty_range(duty1,duty2,duty3,duty4)
-        self.left_Upper_Wheel(duty1)
-        self.left_Lower_Wheel(duty2)
-        self.right_Upper_Wheel(duty3)
-        self.right_Lower_Wheel(duty4)
+        lu_f,lu_r=self.wheel_duties(duty1)
+        ll_f,ll_r=self.wheel_duties(duty2)
+        ru_f,ru_r=self.wheel_duties(duty3)
+        rl_f,rl_r=self.wheel_duties(duty4)
+        self.pwm.setMotorPwms(0,[lu_r,lu_f,ll_f,ll_r,rl_r,rl_f,ru_r,ru_f])
+        changed = [duty1, duty2, duty3, duty4] != self.last_command
         self.last_command = [duty1, duty2, duty3, duty4]
+        if changed:
+            sensor_events.bus.publish(MotorRecord(time.monotonic_ns(), duty1, duty2, duty3, duty4))
+        self.commands += 1
+        self.command_transactions += self.pwm.transactions-transactions
+        self.command_bus_time += self.pwm.bus_time-bus_time
+
+    def command_stats(self):
+        """I2C transactions and bus time per setMotorModel call so far."""
+        n = max(self.commands, 1)
+        return {
+            "commands": self.commands,
+            "transactions_per_command": self.command_transactions / n,
+            "bus_time_per_command_ms": self.command_bus_time / n * 1000,
+        }
             
     def Rotate(self,n):
         angle = n
@@ -105,7 +110,7 @@ class Motor:
         """ Retrieve last command sent to motors """
         return self.last_command
 
-PWM=Motor()          
+PWM=devices.lazy("motor")
 def loop(): 
     PWM.setMotorModel(2000,2000,2000,2000)       #Forward
     time.sleep(3)
@@ -3,7 +3,8 @@ import json
 import subprocess
 import time
 import math
-import smbus
+import threading
+from i2c_bus import get_bus
 
 class ParameterManager:
     PARAM_FILE = 'params.json'
@@ -94,43 +95,155 @@ class ParameterManager:
     def get_pi_version(self):
         return self.get_param('Pi_Version')
 
+class ShadowRegisters:
+    """
+    Last (on, off) value written to every channel of one PCA9685.
+    Shared by all PCA9685 objects on the same address, since Motor, Servo
+    and friends each open their own handle to the same chip.
+    """
+    def __init__(self, channels=16):
+        self.lock = threading.RLock()
+        self.channels = [None] * channels
+        self.requested = 0
+        self.suppressed = 0
+
+_shadows = {}
+_shadows_lock = threading.Lock()
+
+def shadow_for(address):
+    with _shadows_lock:
+        if address not in _shadows:
+            _shadows[address] = ShadowRegisters()
+        return _shadows[address]
+
 class PCA9685:
     __MODE1 = 0x00
     __PRESCALE = 0xFE
     __LED0_ON_L = 0x06
     __LED0_OFF_L = 0x08
+    __MODE1_AI = 0x20          # register auto-increment, needed for block writes
+    MAX_BLOCK_CHANNELS = 8     # 8 channels x 4 registers = 32 bytes, the SMBus block limit
     
-    def __init__(self, address=0x40, debug=False):
-        self.bus = smbus.SMBus(1)
+    def __init__(self, address=0x40, debug=False, burst=True, cache=True, client="motor"):
+        self.bus = get_bus().client(client)
         self.address = address
         self.debug = debug
-        self.write(self.__MODE1, 0x00)
+        self.burst = burst
+        self.cache = cache
+        self.shadow = shadow_for(address)
+        self.transactions = 0
+        self.bus_time = 0.0
+        self.write(self.__MODE1, self.__MODE1_AI if burst else 0x00)
     
     def write(self, reg, value):
+        start = time.perf_counter()
         self.bus.write_byte_data(self.address, reg, value)
+        self.bus_time += time.perf_counter() - start
+        self.transactions += 1
+    
+    def write_block(self, reg, values):
+        start = time.perf_counter()
+        self.bus.write_i2c_block_data(self.address, reg, values)
+        self.bus_time += time.perf_counter() - start
+        self.transactions += 1
     
     def read(self, reg):
         return self.bus.read_byte_data(self.address, reg)
     
+    def bus_stats(self):
+        return {"transactions": self.transactions, "bus_time": self.bus_time}
+    
+    def shadow_stats(self):
+        """Channel writes requested through the cache and how many were skipped as unchanged."""
+        shadow = self.shadow
+        return {
+            "requested": shadow.requested,
+            "suppressed": shadow.suppressed,
+            "suppressed_fraction": shadow.suppressed / shadow.requested if shadow.requested else 0.0,
+        }
+    
     def setPWMFreq(self, freq):
         prescaleval = 25000000.0 / 4096.0 / float(freq) - 1.0
         prescale = int(math.floor(prescaleval + 0.5))
-        oldmode = self.read(self.__MODE1)
-        self.write(self.__MODE1, (oldmode & 0x7F) | 0x10)
-        self.write(self.__PRESCALE, prescale)
-        self.write(self.__MODE1, oldmode)
+        with self.bus.transaction():
+            oldmode = self.read(self.__MODE1)
+            self.write(self.__MODE1, (oldmode & 0x7F) | 0x10)
+            self.write(self.__PRESCALE, prescale)
+            self.write(self.__MODE1, oldmode)
         time.sleep(0.005)
         self.write(self.__MODE1, oldmode | 0x80)
     
-    def setPWM(self, channel, on, off):
-        self.write(self.__LED0_ON_L + 4 * channel, on & 0xFF)
-        self.write(self.__LED0_ON_L + 4 * channel + 1, on >> 8)
-        self.write(self.__LED0_OFF_L + 4 * channel, off & 0xFF)
-        self.write(self.__LED0_OFF_L + 4 * channel + 1, off >> 8)
+    def _write_channels(self, first_channel, values):
+        """Puts (on, off) pairs for consecutive channels on the bus, bypassing the shadow."""
+        if not self.burst:
+            for i, (on, off) in enumerate(values):
+                reg = self.__LED0_ON_L + 4 * (first_channel + i)
+                self.write(reg, on & 0xFF)
+                self.write(reg + 1, on >> 8)
+                self.write(reg + 2, off & 0xFF)
+                self.write(reg + 3, off >> 8)
+            return
+        for start in range(0, len(values), self.MAX_BLOCK_CHANNELS):
+            data = []
+            for on, off in values[start:start + self.MAX_BLOCK_CHANNELS]:
+                data += [on & 0xFF, on >> 8, off & 0xFF, off >> 8]
+            self.write_block(self.__LED0_ON_L + 4 * (first_channel + start), data)
+    
+    def setPWM(self, channel, on, off, force=False):
+        self.setPWMs(channel, [(on, off)], force)
+    
+    def setPWMs(self, first_channel, values, force=False):
+        """
+        Sets consecutive channels from a list of (on, off) pairs.
+        With burst enabled this is one auto-increment block write per
+        MAX_BLOCK_CHANNELS channels instead of four byte writes per channel.
+        Channels whose shadow already holds the value are not written
+        unless force is set; with burst the changed span still goes out
+        as one block.
+        """
+        if not self.cache:
+            self._write_channels(first_channel, values)
+            return
+        shadow = self.shadow
+        with shadow.lock:
+            shadow.requested += len(values)
+            changed = [i for i, value in enumerate(values)
+                       if force or shadow.channels[first_channel + i] != tuple(value)]
+            shadow.suppressed += len(values) - len(changed)
+            if not changed:
+                return
+            if self.burst:
+                runs = [(changed[0], changed[-1])]
+            else:
+                runs = [(i, i) for i in changed]
+            try:
+                for lo, hi in runs:
+                    self._write_channels(first_channel + lo, values[lo:hi + 1])
+            except Exception:
+                self.invalidate(range(first_channel, first_channel + len(values)))
+                raise
+            for i, value in enumerate(values):
+                shadow.channels[first_channel + i] = tuple(value)
+    
+    def invalidate(self, channels=None):
+        """Forgets the shadow so the next write of these channels always reaches the bus."""
+        with self.shadow.lock:
+            for channel in (range(len(self.shadow.channels)) if channels is None else channels):
+                self.shadow.channels[channel] = None
+    
+    def refresh(self):
+        """Re-sends every shadowed channel, e.g. after a bus error or a chip reset."""
+        with self.shadow.lock:
+            known = [(channel, value) for channel, value in enumerate(self.shadow.channels) if value is not None]
+            for channel, value in known:
+                self._write_channels(channel, [value])
     
     def setMotorPwm(self, channel, duty):
         self.setPWM(channel, 0, duty)
     
+    def setMotorPwms(self, first_channel, duties):
+        self.setPWMs(first_channel, [(0, duty) for duty in duties])
+    
     def setServoPulse(self, channel, pulse):
         self.setPWM(channel, 0, int(pulse * 4096 / 20000))
 
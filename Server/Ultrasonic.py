@@ -1,18 +1,24 @@
 import time
 import random
 from Motor import *
-from gpiozero import DistanceSensor
 from servo import *
 from PCA9685 import PCA9685
+from loop_timing import LoopTimer, install_dump_handler
+from sensor_events import ScanRecord
+import devices
+import sensor_events
 
 trigger_pin = 27
 echo_pin = 22
-sensor = DistanceSensor(echo=echo_pin, trigger=trigger_pin, max_distance=3)
+sensor = devices.lazy("distance_sensor")
+TIMING_TRACE = None  # e.g. "rule_timing.csv" or ".jsonl" to trace every stage
+RULE_STAGES = ("servo_settle", "echo_read", "run_motor", "motor_write")
 
 class Ultrasonic:
-    def __init__(self):
-        self.PWM = Motor()
-        self.pwm_S = Servo()
+    def __init__(self, trace_path=TIMING_TRACE):
+        self.timing = LoopTimer("rule_based", stages=RULE_STAGES, trace_path=trace_path)
+        self.PWM = devices.get("motor")
+        self.pwm_S = devices.get("servo")
         self.motor_values = [0, 0, 0, 0]  
 
         self.last_L, self.last_M, self.last_R = 100, 100, 100
@@ -21,12 +27,42 @@ class Ultrasonic:
         self.stuck_timer = None  
 
         self.pwm_S.setServoPwm('0', 90)
-        time.sleep(0.5)
+        self.pwm_S.wait_settled('0')
 
     def get_distance(self):
         """Gets the current distance from the ultrasonic sensor in cm."""
         return int(sensor.distance * 100)
 
+    def set_motor_model(self, duty1, duty2, duty3, duty4):
+        t0 = self.timing.now()
+        self.PWM.setMotorModel(duty1, duty2, duty3, duty4)
+        self.timing.record("motor_write", t0)
+
+    def scan_angle(self, angle):
+        """Moves the servo to angle, waits for it to settle and returns the distance; publishes a ScanRecord."""
+        t0 = self.timing.now()
+        self.pwm_S.setServoPwm('0', angle)
+        self.pwm_S.wait_settled('0')
+        self.timing.record("servo_settle", t0)
+        t0 = self.timing.now()
+        distance = self.get_distance()
+        self.timing.record("echo_read", t0)
+        t_ns = time.monotonic_ns()
+        if angle == 30:
+            self.last_L = distance
+        elif angle == 90:
+            self.last_M = distance
+        elif angle == 150:
+            self.last_R = distance
+        sensor_events.bus.publish(ScanRecord(t_ns, angle, distance, self.last_L, self.last_M, self.last_R))
+        return distance
+
+    def timed_run_motor(self, L, M, R):
+        """run_motor including its manoeuvre sleeps, as the run_motor stage."""
+        t0 = self.timing.now()
+        self.run_motor(L, M, R)
+        self.timing.record("run_motor", t0)
+
     def detect_stuck(self, L, M, R):
         """
         Detect if the bot is stuck:
@@ -52,22 +88,22 @@ class Ultrasonic:
         print("🛑 Robot is stuck! Performing escape maneuver...")
 
         self.motor_values = [-1500, -1500, -1500, -1500]
-        self.PWM.setMotorModel(-1500, -1500, -1500, -1500)
+        self.set_motor_model(-1500, -1500, -1500, -1500)
         time.sleep(1)
 
         if random.choice([True, False]):
             print("🔄 Turning LEFT to escape!")
             self.motor_values = [-1800, -1800, 1800, 1800]  
-            self.PWM.setMotorModel(-1800, -1800, 1800, 1800)
+            self.set_motor_model(-1800, -1800, 1800, 1800)
         else:
             print("🔄 Turning RIGHT to escape!")
             self.motor_values = [1800, 1800, -1800, -1800]  
-            self.PWM.setMotorModel(1800, 1800, -1800, -1800)
+            self.set_motor_model(1800, 1800, -1800, -1800)
 
         time.sleep(0.7)
 
         self.motor_values = [600, 600, 600, 600]
-        self.PWM.setMotorModel(600, 600, 600, 600)
+        self.set_motor_model(600, 600, 600, 600)
 
     def run_motor(self, L, M, R):
         """Controls movement based on sensor readings."""
@@ -79,84 +115,78 @@ class Ultrasonic:
 
         if (L < 30 and M < 30 and R < 30) or M < 30:
             self.motor_values = [-1200, -1200, -1200, -1200]
-            self.PWM.setMotorModel(-1200, -1200, -1200, -1200)  
+            self.set_motor_model(-1200, -1200, -1200, -1200)  
             time.sleep(0.2)
 
             if L < R:
                 self.motor_values = [1600, 1600, -1600, -1600]
-                self.PWM.setMotorModel(1600, 1600, -1600, -1600)
+                self.set_motor_model(1600, 1600, -1600, -1600)
             else:
                 self.motor_values = [-1600, -1600, 1600, 1600]
-                self.PWM.setMotorModel(-1600, -1600, 1600, 1600)
+                self.set_motor_model(-1600, -1600, 1600, 1600)
             time.sleep(0.3)
 
         elif L < 30 and M < 30:
             self.motor_values = [2000, 2000, -2000, -2000]
-            self.PWM.setMotorModel(2000, 2000, -2000, -2000)
+            self.set_motor_model(2000, 2000, -2000, -2000)
             time.sleep(0.3)
 
         elif R < 30 and M < 30:
             self.motor_values = [-2000, -2000, 2000, 2000]
-            self.PWM.setMotorModel(-2000, -2000, 2000, 2000)
+            self.set_motor_model(-2000, -2000, 2000, 2000)
             time.sleep(0.3)
 
         elif L < 20:
             self.motor_values = [1500, 1500, -800, -800]
-            self.PWM.setMotorModel(1500, 1500, -800, -800)
+            self.set_motor_model(1500, 1500, -800, -800)
             if L < 10:
                 self.motor_values = [2000, 2000, -1200, -1200]
-                self.PWM.setMotorModel(2000, 2000, -1200, -1200)
+                self.set_motor_model(2000, 2000, -1200, -1200)
             time.sleep(0.3)
 
         elif R < 20:
             self.motor_values = [-600, -600, 1500, 1500]
-            self.PWM.setMotorModel(-800, -800, 1500, 1500)
+            self.set_motor_model(-800, -800, 1500, 1500)
             if R < 10:
                 self.motor_values = [-1200, -1200, 2000, 2000]
-                self.PWM.setMotorModel(-1200, -1200, 2000, 2000)
+                self.set_motor_model(-1200, -1200, 2000, 2000)
             time.sleep(0.3)
 
         else:
             self.motor_values = [600, 600, 600, 600]
-            self.PWM.setMotorModel(600, 600, 600, 600)
+            self.set_motor_model(600, 600, 600, 600)
 
     def run(self):
         """Main loop for ultrasonic navigation."""
-        self.PWM = Motor()
-        self.pwm_S = Servo()
-
         for i in range(30, 151, 60):
-            self.pwm_S.setServoPwm('0', i)
-            time.sleep(0.2)
+            d = self.scan_angle(i)
             if i == 30:
-                L = self.get_distance()
+                L = d
             elif i == 90:
-                M = self.get_distance()
+                M = d
             else:
-                R = self.get_distance()
+                R = d
                 
         while True:
             for i in range(90, 30, -60):
-                self.pwm_S.setServoPwm('0', i)
-                time.sleep(0.2)
+                d = self.scan_angle(i)
                 if i == 30:
-                    L = self.get_distance()
+                    L = d
                 elif i == 90:
-                    M = self.get_distance()
+                    M = d
                 else:
-                    R = self.get_distance()
-                self.run_motor(L, M, R)
+                    R = d
+                self.timed_run_motor(L, M, R)
 
             for i in range(30, 151, 60):
-                self.pwm_S.setServoPwm('0', i)
-                time.sleep(0.2)
+                d = self.scan_angle(i)
                 if i == 30:
-                    L = self.get_distance()
+                    L = d
                 elif i == 90:
-                    M = self.get_distance()
+                    M = d
                 else:
-                    R = self.get_distance()
-                self.run_motor(L, M, R)
+                    R = d
+                self.timed_run_motor(L, M, R)
 
     def get_motor_values(self):
         return self.motor_values
@@ -164,12 +194,14 @@ class Ultrasonic:
     def get_last_sensor_values(self):
         return self.last_L, self.last_M, self.last_R
 
-ultrasonic = Ultrasonic()
+ultrasonic = devices.lazy("ultrasonic")
 
 if __name__ == '__main__':
     print('🚀 Robot is starting...')
+    install_dump_handler()
     try:
         ultrasonic.run()
     except KeyboardInterrupt:
+        print(ultrasonic.timing.format())
         PWM.setMotorModel(0, 0, 0, 0)
         ultrasonic.pwm_S.setServoPwm('0', 90)
\ No newline at end of file
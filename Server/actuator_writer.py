@@ -0,0 +1,104 @@
+"""
+Latest-wins writer stage for the actuators.
+
+Command handlers hand their hardware call to the writer instead of
+making it themselves, so they never wait on the I2C bus:
+
+    writer = ActuatorWriter()
+    writer.submit("drive", motor.setMotorModel, 600, 600, 600, 600)
+    writer.submit("servo", servo.setServoPwm, '0', 90, key='0')
+
+Only the newest pending call per (group, key) is kept; an older one that
+was not applied yet is replaced and counted as coalesced. One writer
+thread applies the pending calls, each group at most RATES[group] times
+per second, so a joystick flood turns into a steady stream of fresh
+duty cycles instead of a backlog of stale ones.
+"""
+import threading
+import time
+
+RATES = {"drive": 100, "servo": 50, "led": 30}  # applies per second; 0 = unlimited
+
+class ActuatorWriter:
+    def __init__(self, rates=RATES, clock=time.monotonic):
+        self.clock = clock
+        self.intervals = {group: 1.0 / rate if rate else 0.0 for group, rate in rates.items()}
+        self.counters = {group: {"received": 0, "coalesced": 0, "cancelled": 0, "applied": 0, "errors": 0}
+                         for group in rates}
+        self._pending = {}    # (group, key) -> (fn, args), oldest slot first
+        self._due = dict.fromkeys(rates, 0.0)
+        self._busy = set()    # groups whose calls are being applied right now
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def submit(self, group, fn, *args, key=None):
+        """Queues fn(*args) for group, replacing a pending call with the same key. Never blocks on the hardware."""
+        with self._cond:
+            counters = self.counters[group]
+            counters["received"] += 1
+            slot = (group, key)
+            if slot in self._pending:
+                counters["coalesced"] += 1
+            self._pending[slot] = (fn, args)
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name="actuators", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, group):
+        """Drops the group's pending calls and waits for one being applied, so a direct write after it wins."""
+        with self._cond:
+            for slot in [slot for slot in self._pending if slot[0] == group]:
+                del self._pending[slot]
+                self.counters[group]["cancelled"] += 1
+            while group in self._busy:
+                self._cond.wait()
+
+    def flush(self, timeout=None):
+        """Waits until every pending call has been applied; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    now = self.clock()
+                    due = [slot for slot in self._pending if self._due[slot[0]] <= now]
+                    if due:
+                        break
+                    wait = min(self._due[group] for group, _ in self._pending) - now if self._pending else None
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                batch = [(slot[0], self._pending.pop(slot)) for slot in due]
+                for group, _ in batch:
+                    self._busy.add(group)
+                    self._due[group] = now + self.intervals[group]
+            for group, (fn, args) in batch:
+                try:
+                    fn(*args)
+                    outcome = "applied"
+                except Exception as e:
+                    print(f"{group} actuator exception: ", e)
+                    outcome = "errors"
+                with self._cond:
+                    self.counters[group][outcome] += 1
+            with self._cond:
+                self._busy.clear()
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {group: dict(counters, pending=sum(1 for slot in self._pending if slot[0] == group))
+                    for group, counters in self.counters.items()}
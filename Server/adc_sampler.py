@@ -0,0 +1,122 @@
+"""
+Background sampler for the ADC channels.
+
+One thread polls every channel at its own rate with a single bounded
+conversion (Adc.read_once), keeps the raw samples in a per-channel ring
+buffer and publishes a median-filtered value together with the time it
+was taken. Readers never touch the bus:
+
+    sampler = devices.get("adc_sampler")
+    volts, age = sampler.read(2)      # O(1), age in seconds
+    volts = sampler.recvADC(2)        # drop-in for Adc.recvADC
+
+Channel 0/1 are the photoresistors, channel 2 the battery divider.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+
+ADC_RATES = {0: 20.0, 1: 20.0, 2: 2.0}  # Hz per channel
+FILTER_WINDOW = 5                        # samples in the median filter
+BUFFER_SIZE = 64                         # raw samples kept per channel
+
+class ChannelBuffer:
+    def __init__(self, channel, rate, window=FILTER_WINDOW, size=BUFFER_SIZE):
+        self.channel = channel
+        self.rate = rate
+        self.window = window
+        self.samples = deque(maxlen=size)
+        self.latest = (None, 0.0)   # (filtered volts, monotonic time), replaced as one tuple
+        self.count = 0
+        self.bus_time = 0.0
+
+    def add(self, volts, stamp):
+        self.samples.append(volts)
+        self.count += 1
+        recent = sorted(itertools.islice(reversed(self.samples), self.window))
+        self.latest = (recent[len(recent) // 2], stamp)
+
+class AdcSampler:
+    def __init__(self, adc, rates=ADC_RATES, window=FILTER_WINDOW, size=BUFFER_SIZE):
+        self.adc = adc
+        self.channels = {channel: ChannelBuffer(channel, rate, window, size) for channel, rate in rates.items()}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self, channel):
+        buffer = self.channels[channel]
+        start = time.monotonic()
+        volts = self.adc.read_once(channel)
+        end = time.monotonic()
+        buffer.bus_time += end - start
+        buffer.add(volts, end)
+
+    def start(self):
+        """Takes one sample of every channel, so reads never block, then starts polling."""
+        if self._thread is not None:
+            return self
+        for channel in self.channels:
+            self.sample(channel)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="adc_sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def set_rate(self, channel, rate):
+        self.channels[channel].rate = rate
+
+    def _run(self):
+        # Due times advance by whole periods from the start, so the rate does not drift.
+        due = {channel: time.monotonic() + 1.0 / buffer.rate for channel, buffer in self.channels.items()}
+        while not self._stop.is_set():
+            channel = min(due, key=due.get)
+            delay = due[channel] - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            try:
+                self.sample(channel)
+            except OSError as e:
+                print("ADC sample error: ", e)
+            period = 1.0 / self.channels[channel].rate
+            due[channel] += period
+            if due[channel] < time.monotonic():
+                due[channel] = time.monotonic() + period   # fell behind: skip, don't burst
+
+    def read(self, channel):
+        """Latest filtered volts of a channel and its age in seconds."""
+        volts, stamp = self.channels[channel].latest
+        return volts, time.monotonic() - stamp
+
+    def recv_adc(self, channel):
+        return self.channels[channel].latest[0]
+
+    recvADC = recv_adc
+
+    def stats(self):
+        now = time.monotonic()
+        return {channel: {
+                    "rate_hz": buffer.rate,
+                    "samples": buffer.count,
+                    "age_ms": (now - buffer.latest[1]) * 1000,
+                    "bus_ms_per_sample": buffer.bus_time / buffer.count * 1000 if buffer.count else 0.0,
+                } for channel, buffer in self.channels.items()}
+
+if __name__ == '__main__':
+    import devices
+    sampler = devices.get("adc_sampler")
+    try:
+        while True:
+            for channel in sampler.channels:
+                volts, age = sampler.read(channel)
+                print(f"ch{channel}: {volts:.2f} V ({age * 1000:.0f} ms old)")
+            print('----')
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sampler.stop()
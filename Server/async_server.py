@@ -0,0 +1,244 @@
+"""
+asyncio front end for server.Server.
+
+Same wire protocol as the threaded server: '#'-separated text commands
+and telemetry on port 5000, length-prefixed JPEG frames on port 8000.
+Instead of readdata/sendvideo/Power threads and Timer chains, one event
+loop runs
+
+  - the command reader of the current client (each received chunk is fed
+    to a CommandParser in one executor call, so its commands run in order),
+  - the video streams of the connected viewers, fed by the shared
+    camera_service.CameraService,
+  - the Server's periodic telemetry jobs, each as a task that the
+    commands enable and disable exactly like on the PeriodicScheduler,
+  - the battery report and alarm.
+
+Read-only telemetry subscribers (telemetry.TelemetryHub, port 5001) are
+served by the hub's own threads in both modes.
+
+Blocking hardware calls go to two bounded executors: a single worker for
+commands, so they keep their order, and a small pool for telemetry.
+The mode loops (light, ultrasonic, line tracking) stay threads as before.
+
+    python async_server.py
+"""
+import asyncio
+import io
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from command_parser import CommandParser
+
+TELEMETRY_WORKERS = 2
+POWER_INTERVAL = 3.0
+
+class LoopConnection:
+    """socket-like send() that queues bytes on an asyncio StreamWriter from any thread."""
+    def __init__(self, loop, writer):
+        self.loop = loop
+        self.writer = writer
+
+    def send(self, data):
+        if self.writer.is_closing():
+            raise ConnectionError("client disconnected")
+        self.loop.call_soon_threadsafe(self.writer.write, data)
+        return len(data)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.writer.close)
+
+class LoopScheduler:
+    """
+    PeriodicScheduler stand-in that runs the same PeriodicJobs as event-loop
+    tasks. enable/disable may be called from any thread.
+    """
+    def __init__(self, front, jobs):
+        self.front = front
+        self.jobs = jobs
+        self.tasks = {}
+        self.pending = {}
+
+    def enable(self, name, delay=None):
+        if self.front.loop is None:
+            self.pending[name] = delay
+            return
+        self.front.loop.call_soon_threadsafe(self._start, name, delay)
+
+    def disable(self, name):
+        self.pending.pop(name, None)
+        if self.front.loop is not None:
+            self.front.loop.call_soon_threadsafe(self._cancel, name)
+
+    def is_enabled(self, name):
+        return self.jobs[name].enabled
+
+    def _start(self, name, delay):
+        job = self.jobs[name]
+        if job.enabled:
+            return
+        job.enabled = True
+        job.deadline = self.front.loop.time() + (job.period if delay is None else delay)
+        self.tasks[name] = asyncio.ensure_future(self.front.periodic(job))
+
+    def _cancel(self, name):
+        self.jobs[name].enabled = False
+        task = self.tasks.pop(name, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def start_pending(self):
+        for name, delay in self.pending.items():
+            self._start(name, delay)
+        self.pending.clear()
+
+    def stats(self):
+        return {name: job.stats() for name, job in self.jobs.items()}
+
+class AsyncStreamingOutput(io.BufferedIOBase):
+    """Camera output that keeps the newest frame and wakes the video task."""
+    def __init__(self, loop):
+        self.loop = loop
+        self.frame = None
+        self.ready = asyncio.Event()
+
+    def write(self, buf):
+        self.frame = buf
+        self.loop.call_soon_threadsafe(self.ready.set)
+        return len(buf)
+
+class AsyncServer:
+    def __init__(self, server, host='0.0.0.0', command_port=5000, video_port=8000, workers=TELEMETRY_WORKERS):
+        self.server = server
+        self.host = host
+        self.command_port = command_port
+        self.video_port = video_port
+        self.commands = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async_cmd")
+        self.telemetry = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="async_io")
+        self.loop = None
+        self.started = None
+        self._main = None
+        self._finished = threading.Event()
+        self.clients = {}     # handler task -> (writer, AsyncStreamingOutput or None)
+        server.scheduler = LoopScheduler(self, server.scheduler.jobs)
+
+    async def handle_commands(self, reader, writer):
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connection1 = LoopConnection(self.loop, writer)
+        self.server.protocol = 'text'
+        print("Client connection successful !")
+        parser = CommandParser(self.server.handlers)
+        self.clients[asyncio.current_task()] = (writer, None)
+        try:
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                await self.loop.run_in_executor(self.commands, parser.feed, chunk)
+        except ConnectionError as e:
+            print(e)
+        finally:
+            self.clients.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def handle_video(self, reader, writer):
+        print("socket video connected ... ")
+        output = AsyncStreamingOutput(self.loop)
+        viewer = self.server.camera_service.subscribe(output)
+        self.clients[asyncio.current_task()] = (writer, output)
+        try:
+            while True:
+                await output.ready.wait()
+                output.ready.clear()
+                if writer.is_closing():
+                    break
+                frame = output.frame
+                writer.write(struct.pack('<I', len(frame)))
+                writer.write(frame)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(asyncio.current_task(), None)
+            self.server.camera_service.unsubscribe(viewer)
+            writer.close()
+            print("End transmit ... ")
+
+    async def periodic(self, job):
+        while job.enabled:
+            await asyncio.sleep(max(0.0, job.deadline - self.loop.time()))
+            started = self.loop.time()
+            try:
+                await self.loop.run_in_executor(self.telemetry, job.fn)
+            except Exception as e:
+                print(f"Periodic job '{job.name}' failed: {e}")
+            job.ran(started, self.loop.time())
+
+    async def power(self):
+        while True:
+            volts = await self.loop.run_in_executor(self.telemetry, self.server.power_tick)
+            await asyncio.sleep(POWER_INTERVAL)
+            await self.loop.run_in_executor(self.telemetry, self.server.power_alarm, volts)
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self._main = asyncio.current_task()
+        command_server = await asyncio.start_server(self.handle_commands, self.host, self.command_port,
+                                                    reuse_port=True)
+        video_server = await asyncio.start_server(self.handle_video, self.host, self.video_port,
+                                                  reuse_port=True)
+        self.server.telemetry.serve(self.host)
+        print(f"Async server listening on {self.host} (ports {self.command_port} & {self.video_port}).")
+        self.server.scheduler.start_pending()
+        tasks = [asyncio.create_task(self.power())]
+        if self.started is not None:
+            self.started.set()
+        async with command_server, video_server:
+            await asyncio.gather(command_server.serve_forever(), video_server.serve_forever(), *tasks)
+
+    async def _shutdown(self):
+        """Closes the client connections, lets their handlers finish, then ends serve()."""
+        for writer, output in list(self.clients.values()):
+            writer.close()
+            if output is not None:
+                output.ready.set()
+        if self.clients:
+            await asyncio.wait(list(self.clients), timeout=1.0)
+        self._main.cancel()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop = None
+            self._main = None
+            for job in self.server.scheduler.jobs.values():
+                job.enabled = False
+            self.commands.shutdown(wait=False)
+            self.telemetry.shutdown(wait=False)
+            self._finished.set()
+
+    def stop(self, timeout=5.0):
+        """
+        Closes ports 5000 and 8000 and every open connection, and ends run().
+        Callable from any thread; waits up to timeout for the loop to finish.
+        """
+        loop = self.loop
+        if loop is None or self._main is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+        except RuntimeError:
+            return   # the loop has already closed
+        self._finished.wait(timeout)
+
+if __name__ == '__main__':
+    from server import Server
+    try:
+        AsyncServer(Server()).run()
+    except KeyboardInterrupt:
+        print("Closing async server")
@@ -0,0 +1,74 @@
+"""
+Cost of an ADC reading for the consumers on the simulated bus.
+
+Compares Adc.recvADC (synchronous, retries until two reads agree) with
+AdcSampler.recvADC (cached, filtered value from the background thread),
+each read while a motor thread drives the shared I2C bus.
+
+    python bench_adc.py [--reads 300] [--i2c-latency 0.0003]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ.setdefault("ROBOT_HARDWARE", "sim")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hal
+from ADC import Adc
+from Motor import Motor
+from adc_sampler import AdcSampler
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+def run(reader, reads):
+    stop = threading.Event()
+    motor = Motor()
+
+    def drive():
+        i = 0
+        while not stop.is_set():
+            duty = 1000 + (i % 2) * 500
+            motor.setMotorModel(duty, duty, duty, duty)
+            i += 1
+            time.sleep(0.005)
+
+    thread = threading.Thread(target=drive, daemon=True)
+    thread.start()
+    latencies = []
+    for i in range(reads):
+        t0 = time.perf_counter()
+        reader.recvADC(i % 3)
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(0.002)
+    stop.set()
+    thread.join()
+    return latencies
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=300)
+    parser.add_argument("--i2c-latency", type=float, default=0.0003, help="seconds per simulated I2C transaction")
+    args = parser.parse_args()
+
+    hal.sim.configure(i2c_write=args.i2c_latency, i2c_read=args.i2c_latency)
+    hal.sim.record_writes = False
+    noise = random.Random(0)
+    hal.sim.adc_values = {0: lambda: 1.0 + noise.choice((0, 0, 0.02)), 1: 1.0, 2: 2.6}
+
+    adc = Adc()
+    sampler = AdcSampler(adc).start()
+    print(f"{'reader':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, reader in (("sync", adc), ("sampler", sampler)):
+        latencies = run(reader, args.reads)
+        print(f"{name:<10} {percentile(latencies, 50) * 1000:>8.3f} {percentile(latencies, 99) * 1000:>8.3f} "
+              f"{max(latencies) * 1000:>8.3f}")
+    sampler.stop()
+    for channel, s in sampler.stats().items():
+        print(f"ch{channel}: {s['samples']} samples at {s['rate_hz']:.0f} Hz, "
+              f"{s['bus_ms_per_sample']:.2f} bus ms/sample, {s['age_ms']:.0f} ms old")
@@ -0,0 +1,100 @@
+"""
+Per-viewer cameras vs. the shared CameraService, on the simulated camera.
+
+Connects --viewers loopback viewers for --seconds, first giving each its
+own camera and encoder (the old sendvideo, one per connection), then
+subscribing them all to one CameraService. Reports frames encoded per
+second, frames received per viewer and process CPU, then the CPU once
+the viewers have left and the service's idle timeout has stopped the
+camera. With ROBOT_HARDWARE=pi the same run measures the real encoder.
+
+    python bench_camera.py [--viewers 3] [--seconds 5] [--idle-timeout 1]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+os.environ.setdefault("ROBOT_HARDWARE", "sim")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hal
+from hal import Picamera2, JpegEncoder, FileOutput
+from camera_service import CameraService, cpu_load
+from video_stream import FrameSlot, VideoStreamer
+
+def drain(sock, counter, index):
+    while True:
+        try:
+            data = sock.recv(1 << 16)
+        except OSError:
+            return
+        if not data:
+            return
+        counter[index] += len(data)
+
+def stream(sock, output, encoder, camera, streamers):
+    streamer = VideoStreamer(sock, output, encoder, camera)
+    streamers.append(streamer)
+    try:
+        streamer.run()
+    except OSError:
+        pass
+
+def run(mode, args):
+    pairs = [socket.socketpair() for _ in range(args.viewers)]
+    received = [0] * args.viewers
+    streamers, cameras, viewers = [], [], []
+    service = CameraService(idle_timeout=args.idle_timeout)
+    frames_before = hal.sim.counters["frames"]
+    for i, (robot, viewer_sock) in enumerate(pairs):
+        threading.Thread(target=drain, args=(viewer_sock, received, i), daemon=True).start()
+        output = FrameSlot()
+        if mode == "per-viewer":
+            camera = Picamera2()
+            camera.configure(camera.create_video_configuration(main={"size": (400, 300)}))
+            encoder = JpegEncoder(q=90)
+            camera.start_recording(encoder, FileOutput(output))
+            cameras.append(camera)
+        else:
+            encoder = camera = service.subscribe(output)
+            viewers.append(encoder)
+        threading.Thread(target=stream, args=(robot, output, encoder, camera, streamers), daemon=True).start()
+
+    load = cpu_load(args.seconds)
+    encoded = hal.sim.counters["frames"] - frames_before
+    frames = sum(s.frames for s in streamers)
+    for streamer in streamers:
+        streamer.stop()
+    for camera in cameras:
+        camera.stop_recording()
+    for viewer in viewers:
+        service.unsubscribe(viewer)
+    for robot, viewer_sock in pairs:
+        robot.close()
+        viewer_sock.close()
+    time.sleep(args.idle_timeout + 0.2)
+    result = {
+        "encoded_fps": encoded / args.seconds,
+        "received_fps_per_viewer": frames / args.seconds / args.viewers,
+        "cpu_watching_pct": load * 100,
+        "cpu_after_pct": cpu_load(args.seconds) * 100,
+    }
+    if mode == "shared":
+        result["camera_stopped"] = not service.stats()["recording"]
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viewers", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--idle-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{args.viewers} viewers for {args.seconds:.0f} s, then none")
+    for mode in ("per-viewer", "shared"):
+        result = run(mode, args)
+        print(f"{mode:<11} " + "  ".join(
+            f"{name} {value:.1f}" if isinstance(value, float) else f"{name} {value}" for name, value in result.items()))
@@ -0,0 +1,82 @@
+"""
+Cost of a logged row for the caller: open/append/close per row (the old
+log_data_to_csv) vs. CsvLogger with each fsync mode.
+
+Logs --rows server-style rows into a temporary file and reports the
+caller-side latency of one row and the overall rows per second
+(including the final flush), plus the logger's queue depth.
+
+    python bench_csv.py [--rows 20000] [--dir /path/on/the/sd/card]
+"""
+import argparse
+import csv
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_logger import CsvLogger
+
+def row(i):
+    return [datetime.datetime.now().isoformat(), 31.5, 42.0, 120.25, 1.2, 1.3, "010",
+            600 + i % 7, 600, -600, 600]
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))] if values else 0.0
+
+def old_logger(path):
+    def log(values):
+        with open(path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(values)
+    return log, lambda: None, None
+
+def new_logger(path, fsync):
+    logger = CsvLogger(path, fsync=fsync)
+    return logger.log, logger.close, logger
+
+def run(make, rows):
+    latencies = []
+    log, close, logger = make()
+    start = time.perf_counter()
+    for i in range(rows):
+        values = row(i)
+        t0 = time.perf_counter()
+        log(values)
+        latencies.append(time.perf_counter() - t0)
+    depth = logger.max_depth if logger is not None else 0
+    close()
+    elapsed = time.perf_counter() - start
+    if logger is not None:
+        depth = max(depth, logger.max_depth)
+    return {
+        "call_p50_us": percentile(latencies, 50) * 1e6,
+        "call_p99_us": percentile(latencies, 99) * 1e6,
+        "rows_per_s": rows / elapsed,
+        "max_queue_depth": depth,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dir", help="directory for the test files (default: a temporary directory)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="bench_csv_")
+    configs = {
+        "open per row": lambda path: old_logger(path),
+        "CsvLogger": lambda path: new_logger(path, None),
+        "  fsync=close": lambda path: new_logger(path, "close"),
+        "  fsync=batch": lambda path: new_logger(path, "batch"),
+    }
+    print(f"{args.rows} rows into {directory}")
+    for i, (name, make) in enumerate(configs.items()):
+        path = os.path.join(directory, f"bench_{i}.csv")
+        result = run(lambda: make(path), args.rows)
+        os.remove(path)
+        print(f"{name:<14} " + "  ".join(
+            f"{key} {value:.1f}" if isinstance(value, float) else f"{key} {value}" for key, value in result.items()))
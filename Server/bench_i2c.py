@@ -0,0 +1,65 @@
+"""
+Motor command latency on a busy simulated I2C bus.
+
+ADC pollers (like Server.Power and the light mode) read channels in tight
+loops while a motor thread issues setMotorModel at a fixed rate. The run
+is repeated with the shared I2CBus serving waiters in plain FIFO order
+and by priority, and the bus wait of each client is printed.
+
+    python bench_i2c.py [--seconds 3] [--pollers 2] [--i2c-latency 0.0003]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("ROBOT_HARDWARE", "sim")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hal
+import i2c_bus
+from ADC import Adc
+from Motor import Motor
+
+def run(prioritised, seconds, pollers, motor_hz):
+    hal.sim.reset()
+    bus = i2c_bus._bus = i2c_bus.I2CBus(1, prioritised=prioritised)
+    motor = Motor()
+    adcs = [Adc() for _ in range(pollers)]
+    stop = threading.Event()
+
+    def poll(adc):
+        while not stop.is_set():
+            for channel in range(3):
+                adc.recv_adc(channel)
+
+    threads = [threading.Thread(target=poll, args=(adc,), daemon=True) for adc in adcs]
+    for thread in threads:
+        thread.start()
+    end = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < end:
+        duty = 1000 + (i % 2) * 500
+        motor.setMotorModel(duty, duty, duty, duty)
+        i += 1
+        time.sleep(1.0 / motor_hz)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return bus
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--pollers", type=int, default=2)
+    parser.add_argument("--motor-hz", type=float, default=50.0)
+    parser.add_argument("--i2c-latency", type=float, default=0.0003, help="seconds per simulated I2C transaction")
+    args = parser.parse_args()
+
+    hal.sim.configure(i2c_write=args.i2c_latency, i2c_read=args.i2c_latency)
+    hal.sim.record_writes = False
+    for prioritised in (False, True):
+        bus = run(prioritised, args.seconds, args.pollers, args.motor_hz)
+        print("priority" if prioritised else "fifo")
+        print(bus.format())
@@ -0,0 +1,103 @@
+"""
+Compares the torch and NumPy inference paths of test_inference.py.
+
+Each backend runs in its own subprocess so startup time and peak RSS are
+measured in isolation, then the predicted class of every row of the
+dataset is compared between the two.
+
+    python bench_inference.py [--model ../models/best_model.pth] [--csv ../data/robot_data_v2.csv]
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(HERE, "..", "models", "best_model.pth")
+DEFAULT_CSV = os.path.join(HERE, "..", "data", "robot_data_v2.csv")
+
+def read_inputs(csv_file):
+    with open(csv_file, newline='') as f:
+        reader = csv.DictReader(f)
+        return [(int(row["L_distance"]), int(row["M_distance"]), int(row["R_distance"])) for row in reader]
+
+def run_backend(backend, model_path, csv_file, repeats):
+    """Runs inside the child process; prints one JSON line of results."""
+    import resource
+    import time
+
+    start = time.perf_counter()
+    sys.path.insert(0, HERE)
+    import numpy as np
+    if backend == "torch":
+        import torch
+        from direction_classifier_net import DirectionClassifierNet
+        model = DirectionClassifierNet(input_dim=3, hidden_dim=64, output_dim=11, num_hidden_layers=2)
+        model.load_state_dict(torch.load(model_path, map_location="cpu"))
+        model.eval()
+
+        def predict(L, M, R):
+            with torch.no_grad():
+                logits = model(torch.from_numpy(np.array([[L, M, R]], dtype=np.float32)))
+                return torch.argmax(logits, dim=1).item()
+    else:
+        from numpy_inference import NumpyDirectionClassifier
+        model = NumpyDirectionClassifier(model_path)
+        predict = model.predict_index
+    load_time = time.perf_counter() - start
+
+    inputs = read_inputs(csv_file)
+    preds = [predict(L, M, R) for L, M, R in inputs]
+
+    timings = []
+    for _ in range(repeats):
+        for L, M, R in inputs[:1000]:
+            t0 = time.perf_counter_ns()
+            predict(L, M, R)
+            timings.append(time.perf_counter_ns() - t0)
+    timings.sort()
+
+    print(json.dumps({
+        "backend": backend,
+        "torch_imported": "torch" in sys.modules,
+        "load_s": load_time,
+        "p50_us": timings[len(timings) // 2] / 1000,
+        "p99_us": timings[int(len(timings) * 0.99)] / 1000,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "preds": preds,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.model, args.csv, args.repeats)
+        return
+
+    results = {}
+    for backend in ("torch", "numpy"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--backend", backend, "--model", args.model,
+             "--csv", args.csv, "--repeats", str(args.repeats)],
+            capture_output=True, text=True, check=True)
+        results[backend] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"{'backend':<8} {'load [s]':>9} {'p50 [us]':>9} {'p99 [us]':>9} {'RSS [MB]':>9}  torch imported")
+    for backend, r in results.items():
+        print(f"{backend:<8} {r['load_s']:>9.3f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f} "
+              f"{r['max_rss_mb']:>9.1f}  {r['torch_imported']}")
+
+    torch_preds, numpy_preds = results["torch"]["preds"], results["numpy"]["preds"]
+    mismatches = sum(a != b for a, b in zip(torch_preds, numpy_preds))
+    print(f"argmax agreement on {len(torch_preds)} rows: {len(torch_preds) - mismatches}/{len(torch_preds)}")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Finding one session in a long log: one append-only robot_data.csv vs. the
+segmented LogStore.
+
+Writes --days of rows at --rate rows/s (the server's 0.2 s logger is 5)
+both to a single CSV and through a SegmentedLogger, then fetches a
+--window-minutes window from the middle of the data: by scanning the
+single file, and by LogStore.query reading only the overlapping
+segments. Reports disk usage, segments read and query time.
+
+    python bench_log_store.py [--days 3] [--rate 5] [--segment-mb 4] [--dir /path/on/the/sd/card]
+"""
+import argparse
+import csv
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from log_store import LogStore, SegmentedLogger
+
+HEADER = ["timestamp", "L_distance", "M_distance", "R_distance", "light1", "light2",
+          "line_sensors", "motor1", "motor2", "motor3", "motor4"]
+
+def rows(start, count, rate):
+    step = datetime.timedelta(seconds=1 / rate)
+    for i in range(count):
+        yield [(start + i * step).isoformat(), 30 + i % 50, 42.5, 120 + i % 7, 1.2, 1.3, "010",
+               600 if i % 40 else 0, 600, -600, 600]
+
+def directory_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+def scan(path, start, end):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        return sum(1 for row in reader if start <= row[0] < end)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=3.0)
+    parser.add_argument("--rate", type=float, default=5.0)
+    parser.add_argument("--segment-mb", type=float, default=4.0)
+    parser.add_argument("--window-minutes", type=float, default=60.0)
+    parser.add_argument("--dir", help="directory for the test files (default: a temporary directory)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="bench_log_store_")
+    flat_path = os.path.join(directory, "robot_data.csv")
+    segment_dir = os.path.join(directory, "logs")
+    count = int(args.days * 86400 * args.rate)
+    first = datetime.datetime(2026, 1, 1)
+
+    t0 = time.perf_counter()
+    logger = SegmentedLogger(segment_dir, HEADER, max_bytes=int(args.segment_mb * 1024 * 1024), batch_rows=4096)
+    with open(flat_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for values in rows(first, count, args.rate):
+            writer.writerow(values)
+            logger.log(values)
+            if len(logger.queue) > 100000:
+                logger.flush()
+    logger.close()
+    print(f"{count} rows ({args.days:g} days at {args.rate:g}/s) written in {time.perf_counter() - t0:.1f} s")
+
+    store = LogStore(segment_dir)
+    middle = first + datetime.timedelta(days=args.days / 2)
+    start = middle.isoformat()
+    end = (middle + datetime.timedelta(minutes=args.window_minutes)).isoformat()
+
+    t0 = time.perf_counter()
+    flat_rows = scan(flat_path, start, end)
+    flat_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    chosen = store.overlapping(start, end)
+    store_rows = sum(1 for _ in store.query(start, end))
+    store_time = time.perf_counter() - t0
+
+    flat_size = os.path.getsize(flat_path)
+    store_size = directory_size(segment_dir)
+    print(f"{args.window_minutes:g} minute window from {start}")
+    print(f"{'':<14}{'disk bytes':>14}{'files read':>12}{'rows':>9}{'query ms':>10}")
+    print(f"{'single csv':<14}{flat_size:>14,}{1:>12}{flat_rows:>9}{flat_time * 1000:>10.1f}")
+    print(f"{'segmented':<14}{store_size:>14,}{len(chosen):>12}{store_rows:>9}{store_time * 1000:>10.1f}")
+    print(f"{len(store.stems())} segments, disk {flat_size / store_size:.1f}x smaller, "
+          f"query {flat_time / store_time:.0f}x faster, same rows: {flat_rows == store_rows}")
@@ -0,0 +1,60 @@
+"""
+I2C cost of Motor.setMotorModel on the simulated bus.
+
+Replays a drive sequence through Motor with byte-wise writes (the old
+path), with burst block writes, and with burst writes behind the shadow
+register cache, checks that all leave the PCA9685 registers in the same
+state, and prints transactions and bus time per motor command.
+
+    python bench_motor.py [--commands 500] [--i2c-latency 0.0002]
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("ROBOT_HARDWARE", "sim")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hal
+from Motor import Motor
+from directions import DIRECTION_TO_MOTOR
+
+def drive_sequence(n):
+    """The inference loop mostly repeats FORWARD with the odd turn."""
+    moves = list(DIRECTION_TO_MOTOR.values())
+    return [moves[1] if i % 5 else moves[(i // 5) % len(moves)] for i in range(n)]
+
+def run(motor, sequence):
+    hal.sim.reset()
+    motor.pwm.invalidate()
+    for duties in sequence:
+        motor.setMotorModel(*duties)
+    return motor.command_stats(), {ch: hal.sim.pwm(ch) for ch in range(8)}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--i2c-latency", type=float, default=0.0002, help="seconds per simulated I2C transaction")
+    parser.add_argument("--byte-latency", type=float, default=0.00009, help="seconds per data byte (~100 kHz bus)")
+    args = parser.parse_args()
+
+    hal.sim.configure(i2c_write=args.i2c_latency, i2c_read=args.i2c_latency, i2c_byte=args.byte_latency)
+    sequence = drive_sequence(args.commands)
+    results = {}
+    configs = (("byte writes", {"burst": False, "cache": False}),
+               ("burst", {"burst": True, "cache": False}),
+               ("burst+shadow", {"burst": True, "cache": True}))
+    suppressed = 0.0
+    for name, kwargs in configs:
+        motor = Motor(**kwargs)
+        results[name] = run(motor, sequence)
+        if kwargs["cache"]:
+            suppressed = motor.pwm.shadow_stats()["suppressed_fraction"]
+
+    print(f"{'path':<14} {'transactions/cmd':>17} {'bus ms/cmd':>11}")
+    for name, (stats, _) in results.items():
+        print(f"{name:<14} {stats['transactions_per_command']:>17.2f} {stats['bus_time_per_command_ms']:>11.3f}")
+    print(f"channel writes suppressed by the shadow cache: {suppressed:.1%}")
+    same = all(registers == results["byte writes"][1] for _, registers in results.values())
+    print(f"final PCA9685 motor registers identical: {same}")
+    sys.exit(0 if same else 1)
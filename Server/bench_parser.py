@@ -0,0 +1,136 @@
+"""
+Commands parsed per second: CommandParser vs. the old readdata loop.
+
+Replays a command stream in 1024-byte recv-sized chunks through both
+parsers with no-op handlers. The stream is a synthetic driving session
+(mostly CMD_MOTOR with servo, LED, buzzer and power requests mixed in)
+unless --stream points at a raw capture of port 5000 traffic. The old
+loop keeps its per-buffer print (to /dev/null); --no-print drops it.
+The same commands are also replayed as binary_protocol frames.
+
+    python bench_parser.py [--commands 200000] [--stream capture.bin]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Command import COMMAND as cmd
+from command_parser import CommandParser, ARGUMENTS
+from binary_protocol import encode_text
+
+def synthetic_stream(n, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.80:
+            d = [rng.randrange(-4095, 4096) for _ in range(4)]
+            lines.append(f"CMD_MOTOR#{d[0]}#{d[1]}#{d[2]}#{d[3]}")
+        elif r < 0.90:
+            lines.append(f"CMD_SERVO#{rng.randrange(2)}#{rng.randrange(0, 181)}")
+        elif r < 0.95:
+            lines.append(f"CMD_LED#{rng.randrange(256)}#{rng.randrange(256)}#{rng.randrange(256)}#{rng.randrange(256)}")
+        elif r < 0.98:
+            lines.append(f"CMD_BUZZER#{rng.randrange(2)}")
+        else:
+            lines.append("CMD_POWER")
+    return ("\n".join(lines) + "\n").encode()
+
+def binary_stream(stream):
+    """The text stream re-encoded as one frame per command."""
+    lines = stream.decode().splitlines()
+    return b"".join(encode_text(line, seq) for seq, line in enumerate(lines) if line)
+
+def chunks(stream, size=1024):
+    return [stream[i:i + size] for i in range(0, len(stream), size)]
+
+def legacy_loop(chunks, handler, out=None):
+    """The pre-CommandParser readdata body: decode, concatenate, print, split, then `in` scans."""
+    restCmd = ""
+    count = 0
+    for chunk in chunks:
+        AllData = restCmd + chunk.decode('utf-8')
+        if out is not None:
+            print(AllData, file=out)
+        if len(AllData) < 5:
+            restCmd = AllData
+        restCmd = ""
+        cmdArray = AllData.split("\n")
+        if cmdArray[-1] != "":
+            restCmd = cmdArray[-1]
+            cmdArray = cmdArray[:-1]
+        for oneCmd in cmdArray:
+            data = oneCmd.split("#")
+            if data == None:
+                continue
+            elif cmd.CMD_MODE in data:
+                handler(data[1])
+            elif cmd.CMD_MOTOR in data:
+                handler(int(data[1]), int(data[2]), int(data[3]), int(data[4]))
+            elif cmd.CMD_M_MOTOR in data:
+                handler(int(data[1]), int(data[2]), int(data[3]), int(data[4]))
+            elif cmd.CMD_CAR_ROTATE in data:
+                handler(int(data[1]), int(data[2]), int(data[3]), int(data[4]))
+            elif cmd.CMD_SERVO in data:
+                handler(data[1], int(data[2]))
+            elif cmd.CMD_LED in data:
+                handler(int(data[1]), int(data[2]), int(data[3]), int(data[4]))
+            elif cmd.CMD_LED_MOD in data:
+                handler(data[1])
+            elif cmd.CMD_SONIC in data:
+                handler(data[1])
+            elif cmd.CMD_BUZZER in data:
+                handler(data[1])
+            elif cmd.CMD_LIGHT in data:
+                handler(data[1])
+            elif cmd.CMD_POWER in data:
+                handler()
+            else:
+                continue
+            count += 1
+    return count
+
+def parser_loop(chunks, handler):
+    parser = CommandParser({name: handler for name in ARGUMENTS})
+    count = 0
+    for chunk in chunks:
+        count += parser.feed(chunk)
+    return count
+
+def best_rate(loop, data, repeats):
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        count = loop(data, lambda *args: None)
+        best = max(best, count / (time.perf_counter() - start))
+    return best, count
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=200000)
+    parser.add_argument("--stream", help="raw bytes captured from port 5000")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-print", action="store_true", help="leave out the old loop's print(AllData)")
+    args = parser.parse_args()
+
+    if args.stream:
+        with open(args.stream, "rb") as f:
+            stream = f.read()
+    else:
+        stream = synthetic_stream(args.commands)
+    data = chunks(stream)
+    devnull = None if args.no_print else open(os.devnull, "w")
+    legacy, n_legacy = best_rate(lambda c, h: legacy_loop(c, h, devnull), data, args.repeats)
+    table, n_table = best_rate(parser_loop, data, args.repeats)
+    frames = binary_stream(stream)
+    binary, n_binary = best_rate(parser_loop, chunks(frames), args.repeats)
+    print(f"{len(stream)} bytes of text, {len(frames)} bytes of frames, {n_table} commands")
+    print(f"{'old readdata loop':<20} {legacy:>12,.0f} commands/s")
+    print(f"{'CommandParser':<20} {table:>12,.0f} commands/s  ({table / legacy:.2f}x)")
+    print(f"{'  binary frames':<20} {binary:>12,.0f} commands/s  ({binary / legacy:.2f}x)")
+    if not n_legacy == n_table == n_binary:
+        print(f"command count differs: old loop {n_legacy}, parser {n_table}, binary {n_binary}")
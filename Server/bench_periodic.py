@@ -0,0 +1,86 @@
+"""
+Timer chains vs. PeriodicScheduler for the server's telemetry periods.
+
+Runs three jobs at the sendUltrasonic/sendLight/sendLine periods, first
+as self-respawning threading.Timer chains (the old server), then on one
+PeriodicScheduler, and reports threads created, tick lateness and how
+far the last tick drifted from its ideal time.
+
+    python bench_periodic.py [--seconds 5] [--work 0.002]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from periodic import PeriodicScheduler
+
+PERIODS = {"ultrasonic": 0.23, "light": 0.17, "line": 0.20}
+
+def timer_chains(seconds, work):
+    ticks = {name: [] for name in PERIODS}
+    created = [0]
+    end = time.monotonic() + seconds
+
+    def tick(name):
+        if time.monotonic() >= end:
+            return
+        ticks[name].append(time.monotonic())
+        time.sleep(work)
+        timer = threading.Timer(PERIODS[name], tick, args=(name,))
+        created[0] += 1
+        timer.start()
+
+    start = time.monotonic()
+    for name, period in PERIODS.items():
+        timer = threading.Timer(period, tick, args=(name,))
+        created[0] += 1
+        timer.start()
+    time.sleep(seconds + 0.3)
+    return start, ticks, created[0]
+
+def scheduler(seconds, work):
+    ticks = {name: [] for name in PERIODS}
+    before = threading.active_count()
+    sched = PeriodicScheduler()
+
+    def job(name):
+        def run():
+            ticks[name].append(time.monotonic())
+            time.sleep(work)
+        return run
+
+    start = time.monotonic()
+    for name, period in PERIODS.items():
+        sched.add(name, period, job(name))
+        sched.enable(name)
+    created = threading.active_count() - before
+    time.sleep(seconds)
+    for name in PERIODS:
+        sched.disable(name)
+    sched.stop()
+    return start, ticks, created
+
+def report(label, start, ticks, created):
+    late, drift = [], []
+    for name, times in ticks.items():
+        period = PERIODS[name]
+        for i, t in enumerate(times):
+            late.append(t - (start + (i + 1) * period))
+        drift.append(late[-1] if times else 0.0)
+    n = sum(len(times) for times in ticks.values())
+    print(f"{label:<12} {created:>8} {n:>6} {sum(late) / len(late) * 1000:>10.2f} "
+          f"{max(late) * 1000:>10.2f} {max(drift) * 1000:>10.2f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--work", type=float, default=0.002, help="seconds each tick spends on hardware")
+    args = parser.parse_args()
+
+    print(f"{'':<12} {'threads':>8} {'ticks':>6} {'late ms':>10} {'max ms':>10} {'drift ms':>10}")
+    report("timer chain", *timer_chains(args.seconds, args.work))
+    report("scheduler", *scheduler(args.seconds, args.work))
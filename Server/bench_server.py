@@ -0,0 +1,170 @@
+"""
+Load test of server.Server on the simulated hardware backend.
+
+Starts the server against hal.sim, either as the threaded server
+(readdata, sendvideo, Power threads) or as async_server.AsyncServer,
+connects a client to port 5000, floods it with CMD_MOTOR commands and
+measures CMD_POWER round trips. Nothing here needs a Raspberry Pi.
+--mode both runs each mode in its own process and prints them side by side.
+--protocol binary negotiates binary_protocol frames and sends those instead.
+
+    python bench_server.py [--mode threaded|async|both] [--protocol text|binary] [--commands 2000]
+                           [--i2c-latency 0.0002]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("ROBOT_HARDWARE", "sim")
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import hal
+from binary_protocol import FRAME, MAGIC, OPCODES, encode
+from Command import COMMAND as cmd
+
+def recv_line(sock, buf, prefix):
+    while True:
+        while b"\n" in buf[0]:
+            line, buf[0] = buf[0].split(b"\n", 1)
+            if line.startswith(prefix):
+                return line
+        data = sock.recv(4096)
+        if not data:
+            raise ConnectionError("server closed the connection")
+        buf[0] += data
+
+def recv_frame(sock, buf, opcode):
+    while True:
+        while len(buf[0]) >= FRAME.size:
+            frame = FRAME.unpack_from(buf[0])
+            buf[0] = buf[0][FRAME.size:]
+            if frame[0] == MAGIC and frame[1] == opcode:
+                return frame
+        data = sock.recv(4096)
+        if not data:
+            raise ConnectionError("server closed the connection")
+        buf[0] += data
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))] if values else 0.0
+
+def start_server(mode="threaded"):
+    """Builds a Server and starts it like main.py (threaded) or on an AsyncServer event loop."""
+    import server
+    srv = server.Server()
+    if mode == "async":
+        from async_server import AsyncServer
+        front = AsyncServer(srv)
+        front.started = threading.Event()
+        threading.Thread(target=front.run, daemon=True).start()
+        front.started.wait()
+        return srv
+    srv.StartTcpServer()
+    for target in (srv.readdata, srv.sendvideo, srv.Power):
+        threading.Thread(target=target, daemon=True).start()
+    return srv
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="bench_server_")
+    shutil.copy(os.path.join(HERE, "params.json"), workdir)
+    os.chdir(workdir)
+    hal.sim.configure(i2c_write=args.i2c_latency, i2c_read=args.i2c_latency)
+
+    start = time.perf_counter()
+    srv = start_server(args.mode)
+    startup = time.perf_counter() - start
+
+    client = socket.create_connection(("127.0.0.1", 5000))
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    buf = [b""]
+
+    if args.protocol == "binary":
+        client.sendall(b"CMD_PROTOCOL#binary\n")
+        recv_line(client, buf, b"CMD_PROTOCOL#")
+        seq = iter(range(1 << 32))
+        power = lambda: encode(cmd.CMD_POWER, (), next(seq))
+        motor = lambda duty: encode(cmd.CMD_MOTOR, (duty,) * 4, next(seq))
+        reply = lambda: recv_frame(client, buf, OPCODES[cmd.CMD_POWER])
+    else:
+        power = lambda: b"CMD_POWER\n"
+        motor = lambda duty: f"CMD_MOTOR#{duty}#{duty}#{duty}#{duty}\n".encode()
+        reply = lambda: recv_line(client, buf, b"CMD_POWER#")
+
+    # The first request builds the ADC (and whatever it needs) through the device registry.
+    t0 = time.perf_counter()
+    client.sendall(power())
+    reply()
+    first_power = time.perf_counter() - t0
+
+    rtts = []
+    for _ in range(args.pings):
+        t0 = time.perf_counter()
+        client.sendall(power())
+        reply()
+        rtts.append(time.perf_counter() - t0)
+
+    writes_before = hal.sim.counters["i2c_write"]
+    t0 = time.perf_counter()
+    for i in range(args.commands):
+        client.sendall(motor(600 + (i % 2) * 100))
+    client.sendall(motor(1234))
+    while srv.last_m1 != 1234:  # marker command: everything before it has been applied
+        time.sleep(0.0005)
+    flood = time.perf_counter() - t0
+    writes = hal.sim.counters["i2c_write"] - writes_before
+
+    return {
+        "startup_s": startup,
+        "threads": threading.active_count(),
+        "first_power_ms": first_power * 1000,
+        "power_rtt_p50_ms": percentile(rtts, 50) * 1000,
+        "power_rtt_p99_ms": percentile(rtts, 99) * 1000,
+        "motor_commands_per_s": args.commands / flood,
+        "i2c_writes_per_motor_command": writes / args.commands,
+        "drive_applied_per_command": srv.actuators.stats()["drive"]["applied"] / (args.commands + 1),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--pings", type=int, default=200)
+    parser.add_argument("--i2c-latency", type=float, default=0.0, help="seconds per simulated I2C transaction")
+    parser.add_argument("--mode", choices=["threaded", "async", "both"], default="threaded")
+    parser.add_argument("--protocol", choices=["text", "binary"], default="text")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode == "both":
+        columns = {}
+        for mode in ("threaded", "async"):
+            command = [sys.executable, os.path.abspath(__file__), "--mode", mode, "--json", "--protocol", args.protocol,
+                       "--commands", str(args.commands), "--pings", str(args.pings),
+                       "--i2c-latency", str(args.i2c_latency)]
+            out = subprocess.run(command, capture_output=True, text=True, timeout=600)
+            columns[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{'':<30}" + "".join(f"{mode:>12}" for mode in columns))
+        for name in columns["threaded"]:
+            print(f"{name:<30}" + "".join(
+                f"{c[name]:>12.3f}" if isinstance(c[name], float) else f"{c[name]:>12}" for c in columns.values()))
+        sys.exit(0)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(args)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, value in results.items():
+            print(f"{name:<30} {value:.3f}" if isinstance(value, float) else f"{name:<30} {value}")
+    sys.stdout.flush()
+    os._exit(0)
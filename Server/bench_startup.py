@@ -0,0 +1,92 @@
+"""
+Start-up cost of `import server` and `server.Server()` on the simulated
+hardware backend.
+
+Each measurement runs in a fresh interpreter inside a scratch directory
+(params.json copied in) and reports the import time, the Server()
+construction time, the I2C transactions spent while starting and how
+many Motor/Servo/Adc objects were built. --ref REV also measures the
+Server/ tree of another git revision for a before/after comparison.
+
+    python bench_startup.py [--runs 3] [--ref HEAD~1]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = r"""
+import json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+built = {"Motor": 0, "Servo": 0, "Adc": 0}
+t0 = time.perf_counter()
+import server
+t1 = time.perf_counter()
+import hal
+for module, name in (("Motor", "Motor"), ("servo", "Servo"), ("ADC", "Adc")):
+    cls = getattr(sys.modules[module], name)
+    def counting(self, *args, _init=cls.__init__, _name=name, **kwargs):
+        built[_name] += 1
+        _init(self, *args, **kwargs)
+    cls.__init__ = counting
+writes_at_import = hal.sim.counters["i2c_write"] + hal.sim.counters["i2c_read"]
+t2 = time.perf_counter()
+srv = server.Server()
+t3 = time.perf_counter()
+result = {"import_s": t1 - t0, "construct_s": t3 - t2, "total_s": t3 - t0,
+          "i2c_at_import": writes_at_import,
+          "i2c_in_construct": hal.sim.counters["i2c_write"] + hal.sim.counters["i2c_read"] - writes_at_import}
+result.update({"built_" + name: count for name, count in built.items()})
+sys.stdout.write("RESULT " + json.dumps(result) + "\n")
+sys.stdout.flush()
+os._exit(0)
+"""
+
+def measure(server_dir):
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        shutil.copy(os.path.join(server_dir, "params.json"), workdir)
+        env = dict(os.environ, ROBOT_HARDWARE="sim")
+        out = subprocess.run([sys.executable, "-c", PROBE, server_dir], cwd=workdir, env=env,
+                             capture_output=True, text=True, timeout=120)
+        for line in out.stdout.splitlines():
+            if line.startswith("RESULT "):
+                return json.loads(line[len("RESULT "):])
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "no result")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def checkout(ref):
+    """Extracts Server/ of a git revision into a temporary directory."""
+    target = tempfile.mkdtemp(prefix="bench_startup_ref_")
+    archive = subprocess.run(["git", "archive", ref, "."], cwd=HERE, capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", target], input=archive.stdout, check=True)
+    return target
+
+def median_run(server_dir, runs):
+    results = [measure(server_dir) for _ in range(runs)]
+    return {key: sorted(r[key] for r in results)[len(results) // 2] for key in results[0]}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--ref", help="git revision to compare against, e.g. HEAD~1")
+    args = parser.parse_args()
+
+    trees = {"working tree": HERE}
+    if args.ref:
+        trees = {args.ref: checkout(args.ref), **trees}
+    rows = {name: median_run(path, args.runs) for name, path in trees.items()}
+    keys = list(next(iter(rows.values())))
+    print(f"{'':<18}" + "".join(f"{name:>16}" for name in rows))
+    for key in keys:
+        print(f"{key:<18}" + "".join(
+            f"{r[key]:>16.3f}" if isinstance(r[key], float) else f"{r[key]:>16}" for r in rows.values()))
+    for name, path in trees.items():
+        if path != HERE:
+            shutil.rmtree(path, ignore_errors=True)
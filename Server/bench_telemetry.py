@@ -0,0 +1,127 @@
+"""
+Telemetry fan-out with one stalled subscriber.
+
+A publisher emits telemetry lines at --rate per second for --seconds to
+--fast reading subscribers plus one subscriber that never reads. First
+each line is sent with a blocking sendall to every socket in turn
+(what a naive fan-out from the robot loop would do), then through
+telemetry.TelemetryHub. Reports lines published, publish() latency and
+how much the reading subscribers received.
+
+    python bench_telemetry.py [--seconds 5] [--rate 20000] [--fast 2]
+"""
+import argparse
+import contextlib
+import io
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Command import COMMAND as cmd
+from telemetry import TelemetryHub
+
+LINE = ("CMD_MODE#3#" + "42.5" * 8 + "\n").encode()
+
+def reader(sock, counts, index):
+    while True:
+        try:
+            data = sock.recv(65536)
+        except OSError:
+            return
+        if not data:
+            return
+        counts[index] += data.count(b"\n")
+
+def connect(port, stalled=False):
+    sock = socket.socket()
+    if stalled:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    return sock
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))] if values else 0.0
+
+def publisher(publish, seconds, rate, latencies):
+    period = 1.0 / rate
+    start = time.perf_counter()
+    next_tick = start
+    while time.perf_counter() - start < seconds:
+        t0 = time.perf_counter()
+        try:
+            publish()
+        except OSError:   # the blocked sendall fails once the bench closes the stalled client
+            return
+        latencies.append(time.perf_counter() - t0)
+        next_tick += period
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+def run(mode, args):
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    hub = None
+    if mode == "hub":
+        hub = TelemetryHub()
+        hub.serve("127.0.0.1", 0)
+        port = hub.port
+    else:
+        port = listener.getsockname()[1]
+
+    clients = [connect(port) for _ in range(args.fast)] + [connect(port, stalled=True)]
+    if mode == "hub":
+        while len(hub.subscribers) < len(clients):
+            time.sleep(0.01)
+        publish = lambda: hub.publish("distance", cmd.CMD_MODE, "3", "42.5" * 8)
+    else:
+        peers = [listener.accept()[0] for _ in clients]
+        def publish():
+            for peer in peers:
+                peer.sendall(LINE)
+
+    counts = [0] * args.fast
+    for i in range(args.fast):
+        threading.Thread(target=reader, args=(clients[i], counts, i), daemon=True).start()
+
+    latencies = []
+    thread = threading.Thread(target=publisher, args=(publish, args.seconds, args.rate, latencies), daemon=True)
+    thread.start()
+    thread.join(args.seconds + 1.0)
+    published = len(latencies)
+    time.sleep(0.2)
+    result = {
+        "published": published,
+        "stalled": thread.is_alive(),
+        "publish_p50_us": percentile(latencies, 50) * 1e6,
+        "publish_p99_us": percentile(latencies, 99) * 1e6,
+        "fast_received_min": min(counts),
+    }
+    if hub is not None:
+        result["dropped"] = sum(subscriber.dropped for subscriber in hub.subscribers)
+        hub.stop()
+    for sock in clients:
+        sock.close()
+    listener.close()
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=20000.0, help="lines published per second")
+    parser.add_argument("--fast", type=int, default=2, help="subscribers that keep up")
+    args = parser.parse_args()
+
+    print(f"{args.rate:.0f} lines/s for {args.seconds:.1f} s, {args.fast} reading subscribers + 1 stalled")
+    for mode in ("sendall", "hub"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run(mode, args)
+        print(f"{mode:<8} " + "  ".join(
+            f"{name} {value:.1f}" if isinstance(value, float) else f"{name} {value}" for name, value in result.items()))
+    os._exit(0)
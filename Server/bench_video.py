@@ -0,0 +1,129 @@
+"""
+Video latency over a slow link: old sendvideo loop vs. VideoStreamer.
+
+hal's simulated camera produces 400x300 synthetic JPEG-sized frames at
+30 fps with the capture time stamped into each frame. A loopback viewer
+reads port-8000 style frames no faster than --link bytes per second and
+measures how old each frame is when it has been received. The old loop
+writes every frame at q=90 through a buffered socket file; the
+VideoStreamer sends only the newest frame and adapts quality and fps.
+
+    python bench_video.py [--seconds 10] [--link 400000]
+"""
+import argparse
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+os.environ.setdefault("ROBOT_HARDWARE", "sim")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hal import Picamera2, JpegEncoder, FileOutput
+from video_stream import FrameSlot, VideoStreamer
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))] if values else 0.0
+
+def viewer(sock, link, seconds, ages, sizes):
+    """Reads frames at most link bytes/s; records each frame's age and size."""
+    start = time.monotonic()
+    free = start   # when the simulated link has carried everything read so far
+    buf = bytearray()
+    while time.monotonic() - start < seconds:
+        data = sock.recv(4096)
+        if not data:
+            break
+        free = max(free, time.monotonic()) + len(data) / link
+        time.sleep(max(0.0, free - time.monotonic()))
+        buf += data
+        while len(buf) >= 4:
+            length = struct.unpack_from('<I', buf)[0]
+            if len(buf) < 4 + length:
+                break
+            captured = struct.unpack_from('<d', buf, 6)[0]
+            ages.append(time.monotonic() - captured)
+            sizes.append(length)
+            del buf[:4 + length]
+
+def legacy(sock, camera):
+    """The old sendvideo loop: every frame, q=90, through sock.makefile('wb')."""
+    connection = sock.makefile('wb')
+    output = FrameSlot()
+    camera.start_recording(JpegEncoder(q=90), FileOutput(output))
+    seq = 0
+    try:
+        while True:
+            with output.condition:
+                output.condition.wait_for(lambda: output.seq > seq)
+                seq, frame = output.seq, output.frame
+            connection.write(struct.pack('<I', len(frame)))
+            connection.write(frame)
+    except (OSError, ValueError):
+        pass
+    camera.stop_recording()
+    return None
+
+def streamer(sock, camera, box):
+    output = FrameSlot()
+    encoder = JpegEncoder(q=90)
+    camera.start_recording(encoder, FileOutput(output))
+    box.append(VideoStreamer(sock, output, encoder, camera))
+    try:
+        box[0].run()
+    except OSError:
+        pass
+    camera.stop_recording()
+
+def run(mode, args):
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    client = socket.socket()
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, args.rcvbuf)
+    client.connect(listener.getsockname())
+    server, _ = listener.accept()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, args.sndbuf)
+    camera = Picamera2()
+    camera.configure(camera.create_video_configuration(main={"size": (400, 300)}))
+    box = []
+    target = legacy if mode == "old loop" else streamer
+    thread = threading.Thread(target=target, args=(server, camera) + ((box,) if target is streamer else ()),
+                              daemon=True)
+    thread.start()
+    ages, sizes = [], []
+    viewer(client, args.link, args.seconds, ages, sizes)
+    if box:
+        box[0].stop()
+    client.close()
+    server.close()
+    listener.close()
+    thread.join(2.0)
+    tail = ages[len(ages) // 2:]   # steady state
+    result = {
+        "fps_received": len(ages) / args.seconds,
+        "mean_frame_kb": sum(sizes) / len(sizes) / 1000 if sizes else 0.0,
+        "age_p50_ms": percentile(tail, 50) * 1000,
+        "age_p95_ms": percentile(tail, 95) * 1000,
+    }
+    if box:
+        stats = box[0].stats()
+        result.update(dropped=stats["dropped"], quality=stats["quality"], target_fps=stats["target_fps"])
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--link", type=float, default=400000.0, help="viewer bandwidth, bytes/s")
+    parser.add_argument("--rcvbuf", type=int, default=32768)
+    parser.add_argument("--sndbuf", type=int, default=65536)
+    args = parser.parse_args()
+
+    print(f"30 fps camera, {args.link / 1000:.0f} kB/s link, {args.seconds:.0f} s")
+    for mode in ("old loop", "streamer"):
+        result = run(mode, args)
+        print(f"{mode:<10} " + "  ".join(
+            f"{name} {value:.1f}" if isinstance(value, float) else f"{name} {value}" for name, value in result.items()))
@@ -0,0 +1,219 @@
+"""
+Append-only binary robot log with fixed-width records.
+
+The same readings as robot_data.csv, 28 bytes a row instead of ~60, in a
+layout NumPy can memory-map without parsing:
+
+    offset  field      type        content
+         0  t_ns       int64       time.monotonic_ns(), or wall ns for converted CSVs
+         8  distance   uint16[3]   L, M, R in cm
+        14  light      uint16[2]   light1, light2 in hundredths of a volt
+        18  line       uint8       line sensors as bits, '101' -> 5
+        19  direction  uint8       index into the header's direction names
+        20  motor      int16[4]    motor1..motor4 duties
+
+The file starts with MAGIC, a uint32 header length and a JSON header
+(dtype, direction names, wall_offset_ns) padded so the records start on
+a 64-byte boundary. wall clock = t_ns + wall_offset_ns. A record cut
+short by a crash is ignored on load.
+
+    python binary_log.py to-binary data/robot_data_v2.csv data/robot_data.rlog
+    python binary_log.py to-csv data/robot_data.rlog out.csv [--no-direction]
+    python binary_log.py compare data/robot_data.csv
+
+modules/training_tools.py reads these files directly (load_binary_log).
+"""
+import csv
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from csv_logger import CsvLogger
+from directions import DIRECTION_TO_MOTOR, MOTOR_TO_DIRECTION
+
+MAGIC = b"RBTLOG1\n"
+ALIGN = 64
+RECORD = np.dtype([
+    ("t_ns", "<i8"),
+    ("distance", "<u2", (3,)),
+    ("light", "<u2", (2,)),
+    ("line", "u1"),
+    ("direction", "u1"),
+    ("motor", "<i2", (4,)),
+])
+DIRECTIONS = list(DIRECTION_TO_MOTOR)
+CSV_HEADER = ["timestamp", "L_distance", "M_distance", "R_distance", "light1", "light2",
+              "line_sensors", "motor1", "motor2", "motor3", "motor4"]
+
+DIRECTION_IDS = {name: i for i, name in enumerate(DIRECTIONS)}
+LABEL_IDS = {duties: DIRECTION_IDS[name] for duties, name in MOTOR_TO_DIRECTION.items()}
+UNKNOWN = DIRECTION_IDS["UNKNOWN"]
+
+def direction_id(m1, m2, m3, m4):
+    return LABEL_IDS.get((m1, m2, m3, m4), UNKNOWN)
+
+def line_bits(line):
+    """'101' -> 5; already-numeric CSV values (pandas turns '000' into 0) are read as bit strings too."""
+    text = str(line)
+    return int(text, 2) if text and set(text) <= {"0", "1"} else 0
+
+def make_header(directions=DIRECTIONS, wall_offset_ns=None):
+    if wall_offset_ns is None:
+        wall_offset_ns = time.time_ns() - time.monotonic_ns()
+    meta = json.dumps({
+        "dtype": RECORD.descr,
+        "directions": list(directions),
+        "wall_offset_ns": wall_offset_ns,
+    }).encode()
+    size = len(MAGIC) + 4 + len(meta)
+    meta += b" " * (-size % ALIGN)
+    return MAGIC + struct.pack("<I", len(meta)) + meta
+
+def read_header(f):
+    """Returns (meta dict, offset of the first record)."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a robot binary log")
+    (length,) = struct.unpack("<I", f.read(4))
+    meta = json.loads(f.read(length))
+    return meta, len(MAGIC) + 4 + length
+
+def load(path):
+    """Memory-maps a log: returns (records, meta). records['distance'] is an (n, 3) view, no copy."""
+    with open(path, "rb") as f:
+        meta, offset = read_header(f)
+    dtype = np.dtype([tuple(field[:2]) + tuple(tuple(shape) for shape in field[2:]) for field in meta["dtype"]])
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype), meta
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,)), meta
+
+def record(t_ns, L, M, R, light1, light2, line, m1, m2, m3, m4, direction=None):
+    """One row as a tuple for RECORD."""
+    return (t_ns, (L, M, R), (round(light1 * 100), round(light2 * 100)), line_bits(line),
+            direction_id(m1, m2, m3, m4) if direction is None else direction, (m1, m2, m3, m4))
+
+class BinaryLogger(CsvLogger):
+    """CsvLogger writing RECORD rows (tuples from record()) instead of CSV lines."""
+    def _open(self, header):
+        self.file = open(self.path, "ab")
+        if self.created:
+            self.file.write(make_header())
+            return
+        with open(self.path, "rb") as f:
+            offset = read_header(f)[1]
+        # Drop a record torn by a crash, so new ones stay aligned.
+        size = os.path.getsize(self.path)
+        torn = (size - offset) % RECORD.itemsize
+        if torn:
+            self.file.truncate(size - torn)
+
+    def _write_rows(self, rows):
+        self.file.write(np.array(rows, dtype=RECORD).tobytes())
+
+def csv_to_records(path):
+    """Reads a robot_data(_v2).csv into a RECORD array and its direction names."""
+    directions = list(DIRECTIONS)
+    ids = dict(DIRECTION_IDS)
+    stamps, rows = [], []
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        for values in reader:
+            number = lambda name: int(float(values[name]))
+            motor = [number(f"motor{i}") for i in range(1, 5)]
+            direction = None
+            if "direction" in values:
+                direction = ids.setdefault(values["direction"], len(directions))
+                if direction == len(directions):
+                    directions.append(values["direction"])
+            stamps.append(values["timestamp"])
+            rows.append(record(0, number("L_distance"), number("M_distance"), number("R_distance"),
+                               float(values["light1"]), float(values["light2"]), values["line_sensors"],
+                               *motor, direction=direction))
+    records = np.array(rows, dtype=RECORD)
+    records["t_ns"] = np.array(stamps, dtype="datetime64[ns]").astype(np.int64)
+    return records, directions
+
+def write_records(path, records, directions=DIRECTIONS, wall_offset_ns=0):
+    with open(path, "wb") as f:
+        f.write(make_header(directions, wall_offset_ns))
+        f.write(records.tobytes())
+
+def _volts(hundredths):
+    return hundredths // 100 if hundredths % 100 == 0 else hundredths / 100
+
+def records_to_csv(path, records, meta, direction=True):
+    """Writes records in the robot_data(_v2).csv schema."""
+    stamps = np.datetime_as_string((records["t_ns"] + meta["wall_offset_ns"]).astype("datetime64[ns]"), unit="us")
+    names = meta["directions"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER + (["direction"] if direction else []))
+        for stamp, rec in zip(stamps, records.tolist()):
+            _, (L, M, R), (light1, light2), line, label, motor = rec
+            row = [stamp, L, M, R, _volts(light1), _volts(light2), format(line, "03b"), *motor]
+            writer.writerow(row + ([names[label]] if direction else []))
+
+def compare(csv_path):
+    """Size and load time of csv_path against its binary conversion, loaded the way training does."""
+    import tempfile
+    import pandas as pd
+
+    records, directions = csv_to_records(csv_path)
+    binary_path = os.path.join(tempfile.mkdtemp(prefix="binary_log_"), "robot_data.rlog")
+    write_records(binary_path, records, directions)
+
+    def csv_load():
+        df = pd.read_csv(csv_path)
+        X = df[["L_distance", "M_distance", "R_distance"]].to_numpy().astype(np.float32)
+        return X, df["motor1"].to_numpy()
+
+    def binary_load():
+        records, meta = load(binary_path)
+        return records["distance"].astype(np.float32), records["motor"][:, 0]
+
+    def best(fn, repeats=5):
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+        return min(times), result
+
+    csv_time, (X_csv, m_csv) = best(csv_load)
+    bin_time, (X_bin, m_bin) = best(binary_load)
+    csv_size, bin_size = os.path.getsize(csv_path), os.path.getsize(binary_path)
+    print(f"{len(records)} rows")
+    print(f"{'':<8}{'bytes':>12}{'bytes/row':>11}{'load ms':>10}")
+    print(f"{'csv':<8}{csv_size:>12,}{csv_size / len(records):>11.1f}{csv_time * 1000:>10.2f}")
+    print(f"{'binary':<8}{bin_size:>12,}{bin_size / len(records):>11.1f}{bin_time * 1000:>10.2f}")
+    print(f"size {csv_size / bin_size:.1f}x smaller, load {csv_time / bin_time:.0f}x faster, "
+          f"features identical: {np.array_equal(X_csv, X_bin) and np.array_equal(m_csv, m_bin)}")
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert between robot_data CSV and the binary log, or compare them.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    to_binary = sub.add_parser("to-binary")
+    to_binary.add_argument("csv")
+    to_binary.add_argument("binary")
+    to_csv = sub.add_parser("to-csv")
+    to_csv.add_argument("binary")
+    to_csv.add_argument("csv")
+    to_csv.add_argument("--no-direction", action="store_true", help="write the robot_data.csv schema")
+    comparison = sub.add_parser("compare")
+    comparison.add_argument("csv")
+    args = parser.parse_args()
+
+    if args.command == "to-binary":
+        records, directions = csv_to_records(args.csv)
+        write_records(args.binary, records, directions)
+        print(f"{len(records)} rows -> {args.binary}")
+    elif args.command == "to-csv":
+        records, meta = load(args.binary)
+        records_to_csv(args.csv, records, meta, direction=not args.no_direction)
+        print(f"{len(records)} rows -> {args.csv}")
+    else:
+        compare(args.csv)
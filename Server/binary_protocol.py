@@ -0,0 +1,68 @@
+"""
+Fixed-size binary frames for the port-5000 protocol.
+
+A client opts in by sending the text command
+
+    CMD_PROTOCOL#binary\n
+
+and the server answers CMD_PROTOCOL#binary\n before it switches its own
+output to frames. Text lines stay valid in both directions, so old
+clients and mixed streams still work; a frame is recognised by its
+first byte, MAGIC, which never starts a UTF-8 text line.
+
+Frame, little-endian, FRAME.size = 22 bytes:
+
+    B  magic        MAGIC (0xA5)
+    B  opcode       OPCODES[command]
+    4h values       duties, or the command's arguments in order
+    I  seq          sender's frame counter
+    Q  timestamp    sender's clock, microseconds
+
+String arguments travel as their integer value (CMD_SERVO channel '0',
+CMD_MODE 'two' -> 3, line pattern '010' -> 10) and float telemetry as
+hundredths (7.85 V -> 785).
+"""
+import struct
+import time
+
+from Command import COMMAND as cmd
+
+MAGIC = 0xA5
+FRAME = struct.Struct("<BB4hIQ")
+OPCODES = {
+    cmd.CMD_MOTOR: 1,
+    cmd.CMD_M_MOTOR: 2,
+    cmd.CMD_CAR_ROTATE: 3,
+    cmd.CMD_LED: 4,
+    cmd.CMD_SERVO: 5,
+    cmd.CMD_LED_MOD: 6,
+    cmd.CMD_SONIC: 7,
+    cmd.CMD_BUZZER: 8,
+    cmd.CMD_LIGHT: 9,
+    cmd.CMD_POWER: 10,
+    cmd.CMD_MODE: 11,
+    cmd.CMD_PROTOCOL: 12,
+}
+COMMANDS = {opcode: name for name, opcode in OPCODES.items()}
+MODE_NAMES = {"one": 1, "two": 3, "three": 4, "four": 2, "text": 0, "binary": 1}
+
+def field_value(field):
+    """int16 wire value of one text-protocol field."""
+    if isinstance(field, float):
+        return int(round(field * 100))
+    if isinstance(field, str):
+        return MODE_NAMES[field] if field in MODE_NAMES else int(field)
+    return int(field)
+
+def encode(command, fields, seq, timestamp_us=None):
+    values = [field_value(field) for field in fields[:4]]
+    values += [0] * (4 - len(values))
+    if timestamp_us is None:
+        timestamp_us = time.monotonic_ns() // 1000
+    return FRAME.pack(MAGIC, OPCODES[command], values[0], values[1], values[2], values[3],
+                      seq & 0xFFFFFFFF, timestamp_us)
+
+def encode_text(line, seq):
+    """Frame for an outgoing text message such as 'CMD_MODE#3#0\\n'."""
+    fields = line.rstrip("\n").split("#")
+    return encode(fields[0], fields[1:], seq)
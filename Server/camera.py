@@ -1,4 +1,4 @@
-from picamera2 import Picamera2
+from hal import Picamera2
 
 picam2 = Picamera2()
 picam2.start_and_capture_file("image.jpg")
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+One camera shared by every port-8000 viewer, recording only while watched.
+
+    service = CameraService()
+    viewer = service.subscribe(FrameSlot())   # starts the camera if needed
+    ...
+    service.unsubscribe(viewer)                # last one out starts the idle timer
+
+The camera encodes each frame once and the service hands the same
+buffer to every viewer's output (a FrameSlot, or any object with
+write()). When the last viewer leaves, recording stops after
+IDLE_TIMEOUT seconds, so a quick reconnect does not restart the camera.
+
+Each viewer also acts as the encoder/camera handle of its VideoStreamer:
+the q and frame rate it asks for are combined over all viewers (lowest
+quality, lowest frame rate) and applied to the shared encoder, so the
+slowest link sets the pace for everyone.
+
+    python camera_service.py --measure [--seconds 5]
+
+prints the process CPU load with the camera stopped, recording for
+nobody, and streaming to a viewer, i.e. what the idle stop saves.
+"""
+import threading
+import time
+
+from hal import Picamera2, JpegEncoder, FileOutput, Quality
+from video_stream import FRAME_RATE
+
+IDLE_TIMEOUT = 5.0
+FRAME_SIZE = (400, 300)
+QUALITY = 90
+DEFAULT_FRAME_DURATION = int(1e6 / FRAME_RATE[1])   # microseconds, the streamers' max fps
+
+class Viewer:
+    """A subscriber's output plus the quality and frame duration its streamer asked for."""
+    def __init__(self, service, output):
+        self.service = service
+        self.output = output
+        self._q = service.quality
+        self.frame_duration = None   # microseconds; None = camera default
+
+    @property
+    def q(self):
+        return self._q
+
+    @q.setter
+    def q(self, value):
+        self._q = value
+        self.service.apply()
+
+    def set_controls(self, controls):
+        limits = controls.get("FrameDurationLimits")
+        if limits:
+            self.frame_duration = limits[0]
+            self.service.apply()
+
+class CameraService:
+    def __init__(self, size=FRAME_SIZE, quality=QUALITY, idle_timeout=IDLE_TIMEOUT, camera_factory=Picamera2):
+        self.size = size
+        self.quality = quality
+        self.idle_timeout = idle_timeout
+        self.camera_factory = camera_factory
+        self.viewers = []
+        self.camera = None
+        self.encoder = None
+        self.frames = 0
+        self.starts = 0
+        self.recording_time = 0.0
+        self._started_at = None
+        self._frame_duration = None
+        self._idle_timer = None
+        self._lock = threading.RLock()
+
+    def subscribe(self, output):
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            viewer = Viewer(self, output)
+            self.viewers = self.viewers + [viewer]
+            if self.camera is None:
+                self.start()
+            return viewer
+
+    def unsubscribe(self, viewer):
+        with self._lock:
+            self.viewers = [v for v in self.viewers if v is not viewer]
+            if not self.viewers and self.camera is not None and self._idle_timer is None:
+                self._idle_timer = threading.Timer(self.idle_timeout, self._idle_stop)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+            self.apply()
+
+    def write(self, buf):
+        """Recording output: one encoded frame, handed to every viewer as the same buffer."""
+        self.frames += 1
+        for viewer in self.viewers:
+            viewer.output.write(buf)
+        return len(buf)
+
+    def flush(self):
+        pass
+
+    def start(self):
+        with self._lock:
+            if self.camera is not None:
+                return
+            camera = self.camera_factory()
+            camera.configure(camera.create_video_configuration(main={"size": self.size}))
+            self.encoder = JpegEncoder(q=self.quality)
+            self._frame_duration = None
+            camera.start_recording(self.encoder, FileOutput(self), quality=Quality.VERY_HIGH)
+            self.camera = camera
+            self.starts += 1
+            self._started_at = time.monotonic()
+            self.apply()
+
+    def stop(self):
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            camera, self.camera = self.camera, None
+            if camera is None:
+                return
+            camera.stop_recording()
+            camera.close()
+            self.recording_time += time.monotonic() - self._started_at
+            self._started_at = None
+
+    def _idle_stop(self):
+        with self._lock:
+            self._idle_timer = None
+            if not self.viewers:
+                self.stop()
+
+    def apply(self):
+        """Sets the shared encoder to the lowest quality and frame rate any viewer asked for."""
+        with self._lock:
+            if self.camera is None:
+                return
+            viewers = self.viewers
+            # Both fall back to the defaults once no viewer asks for less, e.g.
+            # when the one that backed off leaves.
+            quality = min([v.q for v in viewers], default=self.quality)
+            if self.encoder.q != quality:
+                self.encoder.q = quality
+            durations = [v.frame_duration for v in viewers if v.frame_duration]
+            duration = max(durations) if durations else None
+            if duration != self._frame_duration:
+                limit = duration if duration is not None else DEFAULT_FRAME_DURATION
+                self.camera.set_controls({"FrameDurationLimits": (limit, limit)})
+            self._frame_duration = duration
+
+    def stats(self):
+        recording = self.recording_time
+        if self._started_at is not None:
+            recording += time.monotonic() - self._started_at
+        return {
+            "recording": self.camera is not None,
+            "viewers": len(self.viewers),
+            "frames_encoded": self.frames,
+            "starts": self.starts,
+            "recording_s": recording,
+            "quality": self.encoder.q if self.encoder is not None else None,
+        }
+
+def cpu_load(seconds):
+    """Process CPU time over the next seconds of wall time, as a fraction of one core."""
+    wall, cpu = time.monotonic(), time.process_time()
+    time.sleep(seconds)
+    return (time.process_time() - cpu) / (time.monotonic() - wall)
+
+def measure(seconds):
+    import socket
+    from video_stream import FrameSlot, VideoStreamer
+
+    service = CameraService(idle_timeout=0.0)
+    print(f"camera stopped          {cpu_load(seconds) * 100:6.1f} % CPU")
+    service.start()
+    time.sleep(0.5)
+    print(f"recording, no viewers   {cpu_load(seconds) * 100:6.1f} % CPU")
+
+    a, b = socket.socketpair()
+    slot = FrameSlot()
+    viewer = service.subscribe(slot)
+    streamer = VideoStreamer(a, slot, viewer, viewer)
+    threading.Thread(target=streamer.run, daemon=True).start()
+    def drain():
+        while b.recv(1 << 16):
+            pass
+    threading.Thread(target=drain, daemon=True).start()
+    time.sleep(0.5)
+    print(f"streaming to a viewer   {cpu_load(seconds) * 100:6.1f} % CPU")
+    streamer.stop()
+    service.unsubscribe(viewer)
+    service.stop()
+    print(service.stats())
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Shared on-demand camera; --measure reports the CPU the idle stop saves.")
+    parser.add_argument("--measure", action="store_true")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.seconds)
+    else:
+        parser.print_help()
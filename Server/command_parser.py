@@ -0,0 +1,172 @@
+"""
+Incremental parser for the port-5000 text protocol.
+
+    CMD_MOTOR#600#600#600#600\n
+
+Received bytes are appended to one buffer; every complete line is split
+on '#', its first field looked up in ARGUMENTS and the arguments
+converted there, and the handler registered for that command is called
+with ready-made values:
+
+    parser = CommandParser({cmd.CMD_MOTOR: motor.setMotorModel, ...})
+    parser.feed(sock.recv(1024))
+
+Lines with an unknown command, too few or non-integer arguments are
+dropped and counted in parser.rejected. Extra fields are ignored, as the
+old split-based loop did. Binary frames from binary_protocol may be
+mixed in; runs of them are decoded in place with FRAME.iter_unpack.
+"""
+from Command import COMMAND as cmd
+from binary_protocol import MAGIC, FRAME, OPCODES
+
+INT4 = (int, int, int, int)
+ARGUMENTS = {
+    cmd.CMD_MOTOR: INT4,
+    cmd.CMD_M_MOTOR: INT4,
+    cmd.CMD_CAR_ROTATE: INT4,
+    cmd.CMD_LED: INT4,
+    cmd.CMD_SERVO: (str, int),
+    cmd.CMD_LED_MOD: (str,),
+    cmd.CMD_SONIC: (str,),
+    cmd.CMD_BUZZER: (str,),
+    cmd.CMD_LIGHT: (str,),
+    cmd.CMD_MODE: (str,),
+    cmd.CMD_POWER: (),
+    cmd.CMD_PROTOCOL: (str,),
+}
+MAX_LINE = 1024  # a partial line longer than this is garbage, not a command
+_MAGIC = bytes([MAGIC])
+
+def _text(field):
+    return field.decode('utf-8')
+
+def converter(spec):
+    """Function turning the '#'-split fields of a line into the argument tuple for spec."""
+    if spec == INT4:
+        return None  # converted inline by CommandParser.feed
+    kinds = tuple(int if kind is int else _text for kind in spec)
+    n = len(kinds)
+    def convert(fields):
+        if len(fields) <= n:
+            raise IndexError("missing arguments")
+        return tuple([kind(field) for kind, field in zip(kinds, fields[1:])])
+    return convert
+
+def binary_converter(spec):
+    """Like converter(), for the four int16 values of a binary frame."""
+    if spec == INT4:
+        return None
+    kinds = tuple(spec)
+    return lambda values: tuple([str(value) if kind is str else value for kind, value in zip(kinds, values)])
+
+class CommandParser:
+    """
+    handlers maps command names to callables; feed() calls them in arrival
+    order. A handler that raises is reported and the stream carries on.
+    Binary frames (see binary_protocol) are accepted between text lines;
+    their sequence gaps are counted in seq_gaps.
+    """
+    def __init__(self, handlers, arguments=ARGUMENTS, max_line=MAX_LINE):
+        self.table = {name.encode(): (name, converter(arguments[name]), handler)
+                      for name, handler in handlers.items()}
+        self.frames = {OPCODES[name]: (name, binary_converter(arguments[name]), handler)
+                       for name, handler in handlers.items() if name in OPCODES}
+        self.max_line = max_line
+        self.buffer = bytearray()
+        self.parsed = 0
+        self.rejected = 0
+        self.binary = 0
+        self.seq_gaps = 0
+        self.last_seq = None
+        self.last_timestamp_us = None
+
+    def feed(self, data):
+        """Appends received bytes and dispatches every complete line or frame; returns the number dispatched."""
+        buffer = self.buffer
+        buffer += data
+        if buffer.find(_MAGIC) >= 0:
+            return self._feed_mixed()
+        end = buffer.rfind(b"\n")
+        if end < 0:
+            if len(buffer) > self.max_line:
+                self.rejected += 1
+                buffer.clear()
+            return 0
+        lines = bytes(buffer[:end]).split(b"\n")
+        del buffer[:end + 1]
+        return self._lines(lines)
+
+    def _lines(self, lines):
+        table = self.table
+        dispatched = 0
+        for line in lines:
+            fields = line.split(b"#")
+            entry = table.get(fields[0])
+            if entry is None:
+                if line:
+                    self.rejected += 1
+                continue
+            name, convert, handler = entry
+            try:
+                if convert is None:   # INT4, inlined: it is most of the traffic
+                    args = (int(fields[1]), int(fields[2]), int(fields[3]), int(fields[4]))
+                else:
+                    args = convert(fields)
+            except (ValueError, IndexError, UnicodeDecodeError):
+                self.rejected += 1
+                continue
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"{name} exception: ", e)
+            dispatched += 1
+        self.parsed += dispatched
+        return dispatched
+
+    def _feed_mixed(self):
+        """Path for a buffer holding binary frames: unpacks runs of frames in place, text lines in between."""
+        buffer = self.buffer
+        size = FRAME.size
+        pos = 0
+        dispatched = 0
+        while pos < len(buffer):
+            if buffer[pos] != MAGIC:
+                end = buffer.find(b"\n", pos)
+                if end < 0:
+                    break
+                dispatched += self._lines([bytes(buffer[pos:end])])
+                pos = end + 1
+                continue
+            count = (len(buffer) - pos) // size
+            if count == 0:
+                break
+            frames = self.frames
+            last_seq = self.last_seq
+            with memoryview(buffer) as view:
+                for magic, opcode, v1, v2, v3, v4, seq, timestamp in FRAME.iter_unpack(view[pos:pos + count * size]):
+                    if magic != MAGIC:   # text resumes here
+                        break
+                    pos += size
+                    self.binary += 1
+                    if last_seq is not None and seq != (last_seq + 1) & 0xFFFFFFFF:
+                        self.seq_gaps += 1
+                    last_seq = seq
+                    self.last_timestamp_us = timestamp
+                    entry = frames.get(opcode)
+                    if entry is None:
+                        self.rejected += 1
+                        continue
+                    name, convert, handler = entry
+                    args = (v1, v2, v3, v4) if convert is None else convert((v1, v2, v3, v4))
+                    try:
+                        handler(*args)
+                    except Exception as e:
+                        print(f"{name} exception: ", e)
+                    dispatched += 1
+                    self.parsed += 1
+            self.last_seq = last_seq
+        del buffer[:pos]
+        if len(buffer) > self.max_line:
+            self.rejected += 1
+            buffer.clear()
+        return dispatched
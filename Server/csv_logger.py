@@ -0,0 +1,117 @@
+"""
+Buffered CSV logger with one writer thread.
+
+    log = CsvLogger("robot_data.csv", HEADER)
+    log.log([timestamp, L, M, R, ...])   # any thread; never touches the file
+    log.close()
+
+log() appends the row to a deque and counts it under a lock only
+producers take (append and popleft are atomic, so the writer never
+waits on it) and returns. The writer thread keeps the file
+open and writes whatever is queued in one writerows() call when
+batch_rows rows are waiting or flush_interval seconds have passed,
+whichever comes first.
+
+fsync controls durability: None leaves the data to the OS page cache,
+"close" fsyncs when the log is closed, "batch" after every batch. Subclasses change the file format by
+overriding _open() and _write_rows() (see binary_log.BinaryLogger).
+"""
+import collections
+import csv
+import os
+import threading
+import time
+
+BATCH_ROWS = 64
+FLUSH_INTERVAL = 1.0
+FSYNC_MODES = (None, "close", "batch")
+
+class CsvLogger:
+    def __init__(self, path, header=None, batch_rows=BATCH_ROWS, flush_interval=FLUSH_INTERVAL, fsync=None):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync must be one of {FSYNC_MODES}")
+        self.path = path
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.created = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._open(header)
+        self.queue = collections.deque()
+        self.enqueued = 0          # rows logged so far; what flush() waits for
+        self._enqueue_lock = threading.Lock()
+        self.batches = 0
+        self.max_depth = 0
+        self._written = 0          # rows written so far; only the writer thread changes it
+        self._wake = threading.Event()
+        self._done = threading.Condition()
+        self._running = True
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="csv_logger", daemon=True)
+        self._thread.start()
+
+    def _open(self, header):
+        self.file = open(self.path, 'a', newline='')
+        self.writer = csv.writer(self.file)
+        if self.created and header:
+            self.writer.writerow(header)
+
+    def _write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def log(self, row):
+        """Queues one row; wakes the writer only when a batch is full."""
+        queue = self.queue
+        with self._enqueue_lock:   # uncontended, and never held by the writer
+            queue.append(row)
+            self.enqueued += 1
+        if len(queue) >= self.batch_rows:
+            self._wake.set()
+
+    def flush(self, timeout=5.0):
+        """Waits until every row logged so far is written and flushed to the OS; False on timeout."""
+        target = self.enqueued
+        self._wake.set()
+        with self._done:
+            return self._done.wait_for(lambda: self._written >= target or not self._running, timeout)
+
+    def close(self):
+        if not self._running:
+            return
+        self._running = False
+        self._wake.set()
+        self._thread.join()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.file.close()
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._write_batch()
+        self._write_batch()
+
+    def _write_batch(self):
+        queue = self.queue
+        depth = len(queue)
+        if depth:
+            self.max_depth = max(self.max_depth, depth)
+            batch = [queue.popleft() for _ in range(depth)]
+            self._write_rows(batch)
+            self.file.flush()
+            if self.fsync == "batch":
+                os.fsync(self.file.fileno())
+            self.batches += 1
+        with self._done:
+            self._written += depth
+            self._done.notify_all()
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started
+        return {
+            "written": self._written,
+            "rows_per_s": self._written / elapsed if elapsed else 0.0,
+            "queue_depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "batches": self.batches,
+        }
@@ -0,0 +1,123 @@
+"""
+Precomputed DirectionClassifierNet decisions over the whole (L, M, R) grid.
+
+get_distance() returns whole centimetres in [0, MAX_CM], so the classifier
+input domain is finite. build_table() evaluates the MLP over every grid
+cell (optionally binned) and stores the class index as uint8; DecisionTable
+memory-maps the result so a prediction is a single array index.
+
+    python decision_table.py build best_model.pth decision_table.npy [--bin 1]
+    python decision_table.py bench best_model.pth decision_table.npy [--csv robot_data_v2.csv]
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from numpy_inference import NumpyDirectionClassifier
+
+MAX_CM = 300
+
+def _meta_path(table_path):
+    return os.path.splitext(table_path)[0] + ".json"
+
+def bin_centres(bin_size, max_cm=MAX_CM):
+    """Representative distance fed to the model for every bin."""
+    starts = np.arange(0, max_cm + 1, bin_size, dtype=np.float32)
+    return np.minimum(starts + (bin_size - 1) / 2.0, max_cm).astype(np.float32)
+
+def build_table(model_path, table_path, bin_size=1, max_cm=MAX_CM):
+    """
+    Evaluates the model over the full grid one L-slice at a time
+    and writes a uint8 .npy table plus a small .json sidecar.
+    """
+    model = NumpyDirectionClassifier(model_path)
+    if model.output_dim > 256:
+        raise ValueError("Class index does not fit in uint8")
+
+    centres = bin_centres(bin_size, max_cm)
+    n = len(centres)
+    table = np.lib.format.open_memmap(table_path, mode='w+', dtype=np.uint8, shape=(n, n, n))
+
+    mm, rr = np.meshgrid(centres, centres, indexing='ij')
+    batch = np.empty((n * n, 3), dtype=np.float32)
+    batch[:, 1] = mm.ravel()
+    batch[:, 2] = rr.ravel()
+    for i, l in enumerate(centres):
+        batch[:, 0] = l
+        table[i] = model.predict_batch(batch).reshape(n, n)
+    table.flush()
+    del table
+
+    with open(_meta_path(table_path), "w") as f:
+        json.dump({"bin_size": bin_size, "max_cm": max_cm, "source": os.path.basename(model_path)}, f)
+
+class DecisionTable:
+    """Memory-mapped lookup table with the same predict_index() as the MLP."""
+    def __init__(self, table_path):
+        with open(_meta_path(table_path), "r") as f:
+            meta = json.load(f)
+        self.bin_size = meta["bin_size"]
+        self.max_cm = meta["max_cm"]
+        self.table = np.load(table_path, mmap_mode='r')
+
+    def _bin(self, d):
+        d = int(d)
+        if d < 0:
+            d = 0
+        elif d > self.max_cm:
+            d = self.max_cm
+        return d // self.bin_size
+
+    def predict_index(self, L, M, R):
+        return int(self.table[self._bin(L), self._bin(M), self._bin(R)])
+
+    def predict_batch(self, X):
+        idx = np.clip(np.asarray(X, dtype=np.int64), 0, self.max_cm) // self.bin_size
+        return self.table[idx[:, 0], idx[:, 1], idx[:, 2]]
+
+def _time_per_call(predict, inputs, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for L, M, R in inputs:
+            predict(L, M, R)
+    return (time.perf_counter() - start) / (repeats * len(inputs))
+
+def bench(model_path, table_path, csv_file=None):
+    model = NumpyDirectionClassifier(model_path)
+    table = DecisionTable(table_path)
+
+    if csv_file:
+        import csv
+        with open(csv_file, newline='') as f:
+            inputs = [(int(r["L_distance"]), int(r["M_distance"]), int(r["R_distance"]))
+                      for r in csv.DictReader(f)]
+    else:
+        inputs = [tuple(x) for x in np.random.default_rng(0).integers(0, MAX_CM + 1, size=(5000, 3))]
+
+    mlp_us = _time_per_call(model.predict_index, inputs) * 1e6
+    lut_us = _time_per_call(table.predict_index, inputs) * 1e6
+    X = np.array(inputs)
+    agreement = float(np.mean(model.predict_batch(X) == table.predict_batch(X)))
+
+    print(f"table: {table.table.shape} bin={table.bin_size}cm, {os.path.getsize(table_path) / 1e6:.2f} MB")
+    print(f"per-lookup latency: MLP {mlp_us:.2f} us, table {lut_us:.2f} us ({mlp_us / lut_us:.1f}x)")
+    print(f"agreement with MLP on {len(inputs)} inputs: {agreement * 100:.2f}%")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("action", choices=["build", "bench"])
+    parser.add_argument("model")
+    parser.add_argument("table")
+    parser.add_argument("--bin", type=int, default=1, help="bin width in cm")
+    parser.add_argument("--csv", help="dataset used as benchmark inputs (default: random grid points)")
+    args = parser.parse_args()
+
+    if args.action == "build":
+        start = time.perf_counter()
+        build_table(args.model, args.table, bin_size=args.bin)
+        print(f"Built {args.table} in {time.perf_counter() - start:.2f} s "
+              f"({os.path.getsize(args.table) / 1e6:.2f} MB)")
+    else:
+        bench(args.model, args.table, args.csv)
@@ -0,0 +1,140 @@
+"""
+Registry of the robot's peripherals, each built lazily and exactly once.
+
+Importing a Server module no longer touches hardware; the first caller
+of get() builds the device and everyone after that shares it:
+
+    motor = devices.get("motor")
+
+    PWM = devices.lazy("motor")          # module-level stand-in
+    PWM.setMotorModel(0, 0, 0, 0)        # built here, on first use
+
+    class Server:
+        servo = devices.device("servo")  # built on first self.servo
+"""
+import threading
+import time
+
+def _adc():
+    from ADC import Adc
+    return Adc()
+
+def _adc_sampler():
+    from adc_sampler import AdcSampler
+    return AdcSampler(get("adc")).start()
+
+def _motor():
+    from Motor import Motor
+    return Motor()
+
+def _servo():
+    from servo import Servo
+    return Servo()
+
+def _led():
+    from Led import Led
+    return Led()
+
+def _buzzer():
+    from Buzzer import Buzzer
+    return Buzzer()
+
+def _distance_sensor():
+    from hal import DistanceSensor
+    from Ultrasonic import trigger_pin, echo_pin
+    return DistanceSensor(echo=echo_pin, trigger=trigger_pin, max_distance=3)
+
+def _ultrasonic():
+    from Ultrasonic import Ultrasonic
+    return Ultrasonic()
+
+def _light():
+    from Light import Light
+    return Light()
+
+def _line_sensor(pin_name):
+    def build():
+        import Line_Tracking
+        from hal import LineSensor
+        return LineSensor(getattr(Line_Tracking, pin_name))
+    return build
+
+def _line_tracking():
+    from Line_Tracking import Line_Tracking
+    return Line_Tracking()
+
+FACTORIES = {
+    "adc": _adc,
+    "adc_sampler": _adc_sampler,
+    "motor": _motor,
+    "servo": _servo,
+    "led": _led,
+    "buzzer": _buzzer,
+    "distance_sensor": _distance_sensor,
+    "ultrasonic": _ultrasonic,
+    "light": _light,
+    "ir01": _line_sensor("IR01"),
+    "ir02": _line_sensor("IR02"),
+    "ir03": _line_sensor("IR03"),
+    "line_tracking": _line_tracking,
+}
+
+_instances = {}
+_build_times = {}
+_lock = threading.RLock()
+_build_locks = {}
+
+def register(name, factory):
+    """Adds or replaces the factory of a device that has not been built yet."""
+    with _lock:
+        if name in _instances:
+            raise RuntimeError(f"Device '{name}' is already built")
+        FACTORIES[name] = factory
+
+def get(name):
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    with _lock:
+        if name not in FACTORIES:
+            raise KeyError(f"Unknown device '{name}'")
+        lock = _build_locks.setdefault(name, threading.RLock())
+    # One lock per device, so a slow build (Ultrasonic waits for the servo)
+    # does not hold up callers of unrelated devices.
+    with lock:
+        if name not in _instances:
+            start = time.perf_counter()
+            _instances[name] = FACTORIES[name]()
+            _build_times[name] = time.perf_counter() - start
+        return _instances[name]
+
+def built():
+    """Seconds each device took to build (including devices it pulled in), in build order."""
+    return dict(_build_times)
+
+def reset():
+    """Forgets every built device, e.g. between simulated runs."""
+    with _lock:
+        _instances.clear()
+        _build_times.clear()
+
+class LazyDevice:
+    """Module-level stand-in that forwards attribute access to get(name)."""
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get(self._name), attr)
+
+def lazy(name):
+    return LazyDevice(name)
+
+class device:
+    """Class attribute that resolves to get(name) on first instance access."""
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return get(self.name)
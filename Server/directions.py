@@ -0,0 +1,41 @@
+# Motor duties (left upper, left lower, right upper, right lower) for every
+# direction class the model can predict.
+DIRECTION_TO_MOTOR = {
+    "STOP":             [0, 0, 0, 0],
+    "FORWARD":          [600, 600, 600, 600],
+    "REVERSE":          [-1200, -1200, -1200, -1200],
+    "HARD_LEFT":        [-1600, -1600, 1600, 1600],
+    "HARD_RIGHT":       [1600, 1600, -1600, -1600],
+    "SOFT_RIGHT":       [1500, 1500, -800, -800],
+    "SOFT_LEFT":        [-800, -800, 1500, 1500],
+    "REVERSE_LEFT":     [2000, 2000, -2000, -2000],
+    "REVERSE_RIGHT":    [-2000, -2000, 2000, 2000],
+    "ESCAPE_REVERSE":   [-1500, -1500, -1500, -1500],
+    "ESCAPE_LEFT":      [-1800, -1800, 1800, 1800],
+    "ESCAPE_RIGHT":     [1800, 1800, -1800, -1800],
+    "AGGRESSIVE_RIGHT": [2000, 2000, -1200, -1200],
+    "AGGRESSIVE_LEFT":  [-1200, -1200, 2000, 2000],
+    "UNKNOWN":          [600, 600, 600, 600]
+}
+
+# Direction label of logged motor duties: the labelling rules of the
+# training data (data_processing/new_feature.py, data_processing/pipeline.py,
+# binary_log.py). Duties not listed are "UNKNOWN".
+MOTOR_TO_DIRECTION = {
+    (0, 0, 0, 0):                   "STOP",
+    (800, 800, 800, 800):           "FORWARD",
+    (600, 600, 600, 600):           "FORWARD",
+    (-1200, -1200, -1200, -1200):   "REVERSE",
+    (-1600, -1600, 1600, 1600):     "HARD_LEFT",
+    (1600, 1600, -1600, -1600):     "HARD_RIGHT",
+    (1500, 1500, -800, -800):       "SOFT_RIGHT",
+    (-800, -800, 1500, 1500):       "SOFT_LEFT",
+    (-600, -600, 1500, 1500):       "SOFT_LEFT",
+    (-2000, -2000, 2000, 2000):     "REVERSE_LEFT",
+    (2000, 2000, -2000, -2000):     "REVERSE_RIGHT",
+    (-1500, -1500, -1500, -1500):   "ESCAPE_REVERSE",
+    (-1800, -1800, 1800, 1800):     "ESCAPE_LEFT",
+    (1800, 1800, -1800, -1800):     "ESCAPE_RIGHT",
+    (2000, 2000, -1200, -1200):     "AGGRESSIVE_RIGHT",
+    (-1200, -1200, 2000, 2000):     "AGGRESSIVE_LEFT",
+}
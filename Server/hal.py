@@ -0,0 +1,358 @@
+"""
+Hardware abstraction layer for the Server stack.
+
+Every hardware library is reached through this module instead of being
+imported directly:
+
+    from hal import smbus, DistanceSensor, LineSensor, GPIOBuzzer, spidev
+    from hal import Picamera2, JpegEncoder, FileOutput, Quality, Adafruit_NeoPixel, Color
+
+With ROBOT_HARDWARE=pi (default) these are the real libraries, imported on
+first use. With ROBOT_HARDWARE=sim they are simulated devices sharing one
+SimState (hal.sim): I2C register writes are recorded, sensor values are
+scripted and every transaction can be given a latency, so server.py,
+test_inference.py and the mode loops run and can be profiled on a plain
+Linux box.
+"""
+import importlib
+import os
+import struct
+import subprocess
+import threading
+import time
+
+BACKEND = os.environ.get("ROBOT_HARDWARE", "pi")
+
+class _LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+class _LazyAttr:
+    """A module attribute (class or function) resolved on first use."""
+    def __init__(self, module, attr):
+        self._module = _LazyModule(module)
+        self._attr = attr
+
+    def _resolve(self):
+        return getattr(self._module, self._attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+class SimState:
+    """
+    Shared state of all simulated devices. The I2C latency is spent
+    while holding the bus lock, so concurrent users queue like on a real bus.
+
+    Latencies (seconds) are applied per transaction: i2c_write, i2c_read
+    (plus i2c_byte for every data byte of a write), echo (one DistanceSensor.distance read), spi and frame (camera frame
+    interval). Sensor values come from scripts: distance_source(angle)
+    returns centimetres for the current servo angle, adc_values[channel]
+    volts, line_values[pin] 0/1.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {"i2c_write": 0.0, "i2c_read": 0.0, "i2c_byte": 0.0, "echo": 0.0, "spi": 0.0,
+                        "frame": 1 / 30}
+        self.registers = {}
+        self.writes = []
+        self.record_writes = True
+        self.counters = {"i2c_write": 0, "i2c_read": 0, "spi": 0, "frames": 0}
+        self.distance_source = lambda angle: 100
+        self.adc_values = {0: 1.0, 1: 1.0, 2: 2.6}
+        self.adc_address = 0x48
+        self.adc_model = "ADS7830"
+        self.line_values = {}
+        self.buzzer = {}
+        self.adc_command = {}
+        self.pi_model = "Raspberry Pi 5 Model B"
+
+    def configure(self, **latency):
+        for name, value in latency.items():
+            if name not in self.latency:
+                raise KeyError(f"Unknown latency '{name}'")
+            self.latency[name] = value
+
+    def reset(self):
+        with self.lock:
+            self.registers.clear()
+            del self.writes[:]
+            for name in self.counters:
+                self.counters[name] = 0
+
+    def _wait(self, name, data_bytes=0):
+        delay = self.latency[name] + data_bytes * self.latency["i2c_byte"]
+        if delay:
+            time.sleep(delay)
+
+    def servo_angle(self, channel=8, address=0x40):
+        """Angle of servo '0' decoded from the PCA9685 OFF registers (see Servo.setServoPwm)."""
+        base = 0x08 + 4 * channel
+        off = self.registers.get((address, base), 0) | (self.registers.get((address, base + 1), 0) << 8)
+        if off == 0:
+            return 90
+        pulse = off * 20000 / 4096
+        return (2500 - pulse) * 0.09 - 10
+
+    def pwm(self, channel, address=0x40):
+        """(on, off) counts of one PCA9685 channel."""
+        reg = 0x06 + 4 * channel
+        r = self.registers
+        on = r.get((address, reg), 0) | (r.get((address, reg + 1), 0) << 8)
+        off = r.get((address, reg + 2), 0) | (r.get((address, reg + 3), 0) << 8)
+        return on, off
+
+sim = SimState()
+
+_ADS7830_CHANNEL = {((((c << 2) | (c >> 1)) & 0x07)): c for c in range(8)}
+
+class SimSMBus:
+    def __init__(self, bus=1):
+        self.bus = bus
+
+    def _write(self, address, reg, values):
+        with sim.lock:
+            sim._wait("i2c_write", len(values))
+            sim.counters["i2c_write"] += 1
+            for i, value in enumerate(values):
+                sim.registers[(address, reg + i)] = value & 0xFF
+            if sim.record_writes:
+                sim.writes.append((time.monotonic(), address, reg, tuple(values)))
+
+    def write_byte_data(self, address, reg, value):
+        self._write(address, reg, [value])
+
+    def write_i2c_block_data(self, address, reg, values):
+        self._write(address, reg, list(values))
+
+    def write_byte(self, address, value):
+        with sim.lock:
+            sim._wait("i2c_write")
+            sim.counters["i2c_write"] += 1
+            sim.adc_command[address] = value
+
+    def _adc_raw(self, channel, full_scale):
+        volts = sim.adc_values.get(channel, 0.0)
+        if callable(volts):
+            volts = volts()
+        return max(0, min(full_scale, int(round(volts / 3.3 * full_scale))))
+
+    def read_byte_data(self, address, reg):
+        with sim.lock:
+            sim._wait("i2c_read")
+            sim.counters["i2c_read"] += 1
+            if address == sim.adc_address:
+                if reg == 0xf4:
+                    return 200 if sim.adc_model == "ADS7830" else 0
+                return self._adc_raw(reg - 0x40, 255)
+            return sim.registers.get((address, reg), 0)
+
+    def read_byte(self, address):
+        with sim.lock:
+            sim._wait("i2c_read")
+            sim.counters["i2c_read"] += 1
+            command = sim.adc_command.get(address, 0x84)
+            return self._adc_raw(_ADS7830_CHANNEL[(command >> 4) & 0x07], 255)
+
+    def read_i2c_block_data(self, address, reg, length):
+        return [self.read_byte_data(address, reg + i) for i in range(length)]
+
+    def close(self):
+        pass
+
+class SimDistanceSensor:
+    def __init__(self, echo=None, trigger=None, max_distance=1, **kwargs):
+        self.max_distance = max_distance
+
+    @property
+    def distance(self):
+        sim._wait("echo")
+        cm = sim.distance_source(sim.servo_angle())
+        return max(0.0, min(self.max_distance, cm / 100.0))
+
+class SimLineSensor:
+    def __init__(self, pin, **kwargs):
+        self.pin = pin
+
+    @property
+    def value(self):
+        value = sim.line_values.get(self.pin, 0)
+        return value() if callable(value) else value
+
+class SimBuzzer:
+    def __init__(self, pin, **kwargs):
+        self.pin = pin
+        sim.buzzer[pin] = False
+
+    def on(self):
+        sim.buzzer[self.pin] = True
+
+    def off(self):
+        sim.buzzer[self.pin] = False
+
+class SimSpiDev:
+    def __init__(self):
+        self.mode = 0
+        self.transfers = 0
+
+    def open(self, bus, device):
+        self.bus, self.device = bus, device
+
+    def xfer(self, data, speed_hz=0, *args):
+        sim._wait("spi")
+        sim.counters["spi"] += 1
+        self.transfers += 1
+        return [0] * len(data)
+
+    xfer2 = xfer
+
+    def close(self):
+        pass
+
+class SimQuality:
+    VERY_LOW, LOW, MEDIUM, HIGH, VERY_HIGH = range(5)
+
+class SimJpegEncoder:
+    def __init__(self, q=None, **kwargs):
+        self.q = q
+
+class SimFileOutput:
+    def __init__(self, file=None):
+        self.fileoutput = file
+
+def synthetic_frame(index, size=(400, 300), quality=90, captured=None):
+    """
+    A JPEG-sized byte string (SOI ... EOI) whose length scales with resolution
+    and quality. The 8 bytes after SOI hold the capture time (time.monotonic).
+    """
+    length = max(256, int(size[0] * size[1] * (0.05 + quality / 400.0)))
+    stamp = struct.pack("<d", time.monotonic() if captured is None else captured)
+    body = (index % 256).to_bytes(1, "little") * (length - 12)
+    return b"\xff\xd8" + stamp + body + b"\xff\xd9"
+
+class SimPicamera2:
+    """
+    Generates synthetic frames at 1 / latency['frame'] fps into the recording
+    output. Like picamera2, the encoder's q is read for every frame and
+    set_controls(FrameDurationLimits=...) changes the frame rate while recording.
+    """
+    def __init__(self, *args, **kwargs):
+        self.size = (400, 300)
+        self.frame_duration = None   # seconds; None = latency['frame']
+        self._thread = None
+        self._running = False
+
+    def set_controls(self, controls):
+        limits = controls.get("FrameDurationLimits")
+        if limits:
+            self.frame_duration = limits[0] / 1e6
+
+    def create_video_configuration(self, main=None, **kwargs):
+        return {"main": main or {"size": self.size}}
+
+    create_still_configuration = create_video_configuration
+
+    def configure(self, config):
+        self.size = tuple(config.get("main", {}).get("size", self.size))
+
+    def start_recording(self, encoder, output, quality=None):
+        target = output.fileoutput if isinstance(output, SimFileOutput) else output
+        self._running = True
+
+        def produce():
+            index = 0
+            while self._running:
+                if self.frame_duration is None:
+                    sim._wait("frame")
+                else:
+                    time.sleep(self.frame_duration)
+                sim.counters["frames"] += 1
+                q = encoder.q if getattr(encoder, "q", None) is not None else 90
+                target.write(synthetic_frame(index, self.size, q))
+                index += 1
+        self._thread = threading.Thread(target=produce, daemon=True)
+        self._thread.start()
+
+    def stop_recording(self):
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def start_and_capture_file(self, name, **kwargs):
+        with open(name, "wb") as f:
+            f.write(synthetic_frame(0, self.size))
+
+    def close(self):
+        self.stop_recording()
+
+class SimNeoPixel:
+    def __init__(self, num, pin, freq_hz=800000, dma=10, invert=False, brightness=255, channel=0, *args):
+        self.pixels = [0] * num
+        self.brightness = brightness
+
+    def begin(self):
+        return None
+
+    def setPixelColor(self, n, color):
+        self.pixels[n] = color
+
+    def setBrightness(self, brightness):
+        self.brightness = brightness
+
+    def show(self):
+        sim._wait("spi")
+
+    def numPixels(self):
+        return len(self.pixels)
+
+def sim_color(red, green, blue, white=0):
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+def read_pi_model():
+    """Board model string from the device tree (sim.pi_model when simulated)."""
+    if BACKEND == "sim":
+        return sim.pi_model
+    result = subprocess.run(['cat', '/sys/firmware/devicetree/base/model'], capture_output=True, text=True)
+    return result.stdout.strip()
+
+class _SimModule:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+if BACKEND == "sim":
+    smbus = _SimModule(SMBus=SimSMBus)
+    spidev = _SimModule(SpiDev=SimSpiDev, __version__="sim")
+    DistanceSensor = SimDistanceSensor
+    LineSensor = SimLineSensor
+    GPIOBuzzer = SimBuzzer
+    Picamera2 = SimPicamera2
+    Preview = None
+    JpegEncoder = SimJpegEncoder
+    FileOutput = SimFileOutput
+    Quality = SimQuality
+    Adafruit_NeoPixel = SimNeoPixel
+    Color = sim_color
+elif BACKEND == "pi":
+    smbus = _LazyModule("smbus")
+    spidev = _LazyModule("spidev")
+    DistanceSensor = _LazyAttr("gpiozero", "DistanceSensor")
+    LineSensor = _LazyAttr("gpiozero", "LineSensor")
+    GPIOBuzzer = _LazyAttr("gpiozero", "Buzzer")
+    Picamera2 = _LazyAttr("picamera2", "Picamera2")
+    Preview = None
+    JpegEncoder = _LazyAttr("picamera2.encoders", "JpegEncoder")
+    FileOutput = _LazyAttr("picamera2.outputs", "FileOutput")
+    Quality = _LazyAttr("picamera2.encoders", "Quality")
+    Adafruit_NeoPixel = _LazyAttr("rpi_ws281x", "Adafruit_NeoPixel")
+    Color = _LazyAttr("rpi_ws281x", "Color")
+else:
+    raise ValueError(f"Unknown ROBOT_HARDWARE backend: {BACKEND}")
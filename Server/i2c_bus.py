@@ -0,0 +1,156 @@
+"""
+Process-wide, arbitrated access to I2C bus 1.
+
+Motor, Servo (both through PCA9685) and Adc used to open their own
+smbus.SMBus(1) handle and talk to the bus from whatever thread they ran
+in. Now they get a client of the one shared I2CBus instead:
+
+    bus = get_bus().client("motor")
+    bus.write_i2c_block_data(0x40, reg, data)
+
+Every transaction first queues for the bus. Waiters are served by
+priority (PRIORITY: motor, then servo, then adc) and FIFO within a
+priority, so a motor command never waits behind more than the one
+transaction already on the wire. Multi-step sequences that must not be
+interleaved go in a transaction block:
+
+    with bus.transaction():
+        bus.write_byte(0x48, command)
+        value = bus.read_byte(0x48)
+
+The bus is re-entrant for the thread holding it. stats() reports the
+queue depth and the wait time per client.
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from hal import smbus
+from loop_timing import StageHistogram
+
+PRIORITY = {"motor": 0, "servo": 1, "adc": 9}
+DEFAULT_PRIORITY = 5
+
+class I2CBus:
+    def __init__(self, bus=1, prioritised=True, size=1024):
+        self.smbus = smbus.SMBus(bus)
+        self.prioritised = prioritised
+        self.size = size
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._tickets = itertools.count()
+        self._owner = None
+        self._held = 0
+        self.max_queue_depth = 0
+        self.waits = {}
+        self.grants = {}
+
+    def acquire(self, name):
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._held += 1
+                return
+            priority = PRIORITY.get(name, DEFAULT_PRIORITY) if self.prioritised else 0
+            ticket = (priority, next(self._tickets))
+            start = time.perf_counter()
+            heapq.heappush(self._waiting, ticket)
+            if len(self._waiting) > self.max_queue_depth:
+                self.max_queue_depth = len(self._waiting)
+            while self._owner is not None or self._waiting[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._owner = me
+            self._held = 1
+            if name not in self.waits:
+                self.waits[name] = StageHistogram(self.size)
+                self.grants[name] = 0
+            self.waits[name].add(time.perf_counter() - start)
+            self.grants[name] += 1
+
+    def release(self):
+        with self._cond:
+            self._held -= 1
+            if self._held == 0:
+                self._owner = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def transaction(self, name):
+        self.acquire(name)
+        try:
+            yield self.smbus
+        finally:
+            self.release()
+
+    def client(self, name):
+        return BusClient(self, name)
+
+    def queue_depth(self):
+        return len(self._waiting)
+
+    def stats(self):
+        """Current and peak queue depth plus the wait-time summary of every client."""
+        clients = {}
+        for name, hist in list(self.waits.items()):
+            summary = hist.summary()
+            summary["grants"] = self.grants[name]
+            clients[name] = summary
+        return {"queue_depth": self.queue_depth(), "max_queue_depth": self.max_queue_depth, "clients": clients}
+
+    def format(self):
+        stats = self.stats()
+        lines = [f"[i2c] queue depth {stats['queue_depth']} (max {stats['max_queue_depth']})"]
+        for name, s in stats["clients"].items():
+            lines.append(f"  {name:<6} n={s['count']:<6} wait p50={s['p50_ms']:7.3f} ms  "
+                         f"p99={s['p99_ms']:7.3f} ms  max={s['max_ms']:7.3f} ms")
+        return "\n".join(lines)
+
+class BusClient:
+    """smbus.SMBus look-alike that queues on the shared I2CBus under one client name."""
+    def __init__(self, bus, name):
+        self.i2c = bus
+        self.name = name
+
+    def transaction(self):
+        return self.i2c.transaction(self.name)
+
+    def write_byte_data(self, address, reg, value):
+        with self.i2c.transaction(self.name) as bus:
+            bus.write_byte_data(address, reg, value)
+
+    def write_i2c_block_data(self, address, reg, values):
+        with self.i2c.transaction(self.name) as bus:
+            bus.write_i2c_block_data(address, reg, values)
+
+    def write_byte(self, address, value):
+        with self.i2c.transaction(self.name) as bus:
+            bus.write_byte(address, value)
+
+    def read_byte_data(self, address, reg):
+        with self.i2c.transaction(self.name) as bus:
+            return bus.read_byte_data(address, reg)
+
+    def read_byte(self, address):
+        with self.i2c.transaction(self.name) as bus:
+            return bus.read_byte(address)
+
+    def read_i2c_block_data(self, address, reg, length):
+        with self.i2c.transaction(self.name) as bus:
+            return bus.read_i2c_block_data(address, reg, length)
+
+    def close(self):
+        pass  # the handle belongs to the shared I2CBus
+
+_bus = None
+_bus_lock = threading.Lock()
+
+def get_bus():
+    """The process-wide I2CBus for bus 1, created on first use."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = I2CBus(1)
+        return _bus
@@ -0,0 +1,297 @@
+"""
+Segmented robot log: rotated CSV segments with a time-range index.
+
+    log = SegmentedLogger("logs", HEADER)     # a CsvLogger, one new segment per start
+    log.log([timestamp, L, M, R, ...])
+
+    store = LogStore("logs")
+    for row in store.query("2026-10-18T14:00", "2026-10-18T15:00"):
+        ...
+
+Rows go to logs/robot_data-<opened>.csv. The writer starts a new segment
+once the current one holds max_bytes or has been open max_seconds. A
+closed segment gets a sidecar logs/robot_data-<opened>.idx, a small JSON
+object with the first and last timestamp, the row count and the size,
+and is then gzipped by a background thread (.csv.gz replaces .csv).
+
+query() reads the sidecars only, and opens just the segments whose time
+range overlaps the requested window; the segment still being written has
+no sidecar and is read whenever it may overlap. Timestamps are the ISO
+strings in column 0 and compare as strings.
+
+Segments left unindexed or half-compressed by a crash are finished the
+next time a SegmentedLogger opens the directory.
+
+    python log_store.py list [--dir logs]
+    python log_store.py export out.csv [--dir logs] [--start ISO] [--end ISO]
+
+export writes the robot_data.csv schema that data_processing/ expects.
+"""
+import csv
+import datetime
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+from csv_logger import CsvLogger
+
+PREFIX = "robot_data"
+MAX_BYTES = 16 * 1024 * 1024
+MAX_SECONDS = 3600.0
+
+def _stem(path):
+    """logs/robot_data-X.csv(.gz) -> logs/robot_data-X"""
+    return path[:-len(".csv.gz")] if path.endswith(".csv.gz") else os.path.splitext(path)[0]
+
+def _bound(value):
+    """datetime or ISO string -> ISO string, comparable with the row timestamps."""
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+def read_index(stem):
+    try:
+        with open(stem + ".idx") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_index(stem, index):
+    tmp = stem + ".idx.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, stem + ".idx")
+
+def open_segment(stem):
+    """Opens a segment for reading, compressed or not (compression may finish between the two tries)."""
+    for _ in range(2):
+        try:
+            return gzip.open(stem + ".csv.gz", "rt", newline="")
+        except FileNotFoundError:
+            pass
+        try:
+            return open(stem + ".csv", newline="")
+        except FileNotFoundError:
+            pass
+    raise FileNotFoundError(stem + ".csv")
+
+def scan_segment(stem):
+    """Builds the index of a segment by reading it (crash recovery)."""
+    rows, first, last = 0, None, None
+    with open_segment(stem) as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            stamp = row[0]
+            first = stamp if first is None or stamp < first else first
+            last = stamp if last is None or stamp > last else last
+            rows += 1
+    size = os.path.getsize(stem + ".csv") if os.path.exists(stem + ".csv") else None
+    return {"start": first, "end": last, "rows": rows, "bytes": size}
+
+def compress(stem):
+    """stem.csv -> stem.csv.gz; the .csv stays readable until the .gz is complete."""
+    tmp = stem + ".csv.gz.tmp"
+    with open(stem + ".csv", "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp, stem + ".csv.gz")
+    os.remove(stem + ".csv")
+
+class LogStore:
+    """Read side: lists segments and reads the ones overlapping a time window."""
+    def __init__(self, directory, prefix=PREFIX):
+        self.directory = directory
+        self.prefix = prefix
+
+    def stems(self):
+        pattern = os.path.join(self.directory, self.prefix + "-*.csv")
+        return sorted({_stem(path) for path in glob.glob(pattern) + glob.glob(pattern + ".gz")})
+
+    def segments(self):
+        """One dict per segment, oldest first; 'start'/'end' are None for the open segment."""
+        result = []
+        for stem in self.stems():
+            index = read_index(stem) or {"start": None, "end": None, "rows": None, "bytes": None}
+            index["stem"] = stem
+            index["compressed"] = os.path.exists(stem + ".csv.gz")
+            result.append(index)
+        return result
+
+    def overlapping(self, start=None, end=None):
+        """Segments that may hold rows with start <= timestamp < end."""
+        start, end = _bound(start), _bound(end)
+        chosen = []
+        for segment in self.segments():
+            if segment["rows"] == 0:
+                continue
+            if segment["start"] is not None:
+                if start is not None and segment["end"] < start:
+                    continue
+                if end is not None and segment["start"] >= end:
+                    continue
+            chosen.append(segment)
+        return chosen
+
+    def query(self, start=None, end=None):
+        """Yields the rows (lists of strings) with start <= timestamp < end, in segment order."""
+        start, end = _bound(start), _bound(end)
+        for segment in self.overlapping(start, end):
+            with open_segment(segment["stem"]) as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    if not row:
+                        continue
+                    stamp = row[0]
+                    if (start is None or stamp >= start) and (end is None or stamp < end):
+                        yield row
+
+    def header(self):
+        for stem in self.stems():
+            with open_segment(stem) as f:
+                return next(csv.reader(f), None)
+        return None
+
+    def export(self, path, start=None, end=None):
+        """Writes the matching rows, with the segments' header, to one CSV; returns the row count."""
+        count = 0
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            header = self.header()
+            if header:
+                writer.writerow(header)
+            for row in self.query(start, end):
+                writer.writerow(row)
+                count += 1
+        return count
+
+class SegmentedLogger(CsvLogger):
+    """CsvLogger writing rotated, indexed, compressed segments into a directory."""
+    def __init__(self, directory, header=None, prefix=PREFIX, max_bytes=MAX_BYTES, max_seconds=MAX_SECONDS,
+                 compress=True, **kwargs):
+        self.directory = directory
+        self.prefix = prefix
+        self.header = header
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compress = compress
+        self.rotations = 0
+        self.compressed = 0
+        os.makedirs(directory, exist_ok=True)
+        self.store = LogStore(directory, prefix)
+        self._pending = queue.Queue()
+        self._compressor = threading.Thread(target=self._compress_loop, name="log_compressor", daemon=True)
+        self._compressor.start()
+        self._recover()
+        super().__init__(self._new_path(), header, **kwargs)
+
+    def _new_path(self):
+        opened = datetime.datetime.now().strftime("%Y%m%dT%H%M%S_%f")
+        return os.path.join(self.directory, f"{self.prefix}-{opened}.csv")
+
+    def _open(self, header):
+        super()._open(header)
+        self._opened = time.monotonic()
+        self._rows = 0
+        self._first = None
+        self._last = None
+
+    def _write_rows(self, rows):
+        if self._rows and (self.file.tell() >= self.max_bytes or time.monotonic() - self._opened >= self.max_seconds):
+            self._rotate()
+        super()._write_rows(rows)
+        stamps = [row[0] for row in rows]
+        first, last = min(stamps), max(stamps)
+        self._first = first if self._first is None or first < self._first else self._first
+        self._last = last if self._last is None or last > self._last else self._last
+        self._rows += len(rows)
+
+    def _rotate(self):
+        self.file.close()
+        self._finish(self.path)
+        self.path = self._new_path()
+        self.created = True
+        self._open(self.header)
+        self.rotations += 1
+
+    def _finish(self, path):
+        """Indexes a closed segment and queues it for compression; an empty one is removed."""
+        stem = _stem(path)
+        if not self._rows:
+            os.remove(path)
+            return
+        write_index(stem, {"start": self._first, "end": self._last, "rows": self._rows,
+                           "bytes": os.path.getsize(path)})
+        if self.compress:
+            self._pending.put(stem)
+
+    def _recover(self):
+        """Finishes segments a previous run left unindexed or half-compressed."""
+        for stem in self.store.stems():
+            if os.path.exists(stem + ".csv.gz.tmp"):
+                os.remove(stem + ".csv.gz.tmp")
+            if os.path.exists(stem + ".csv.gz") and os.path.exists(stem + ".csv"):
+                os.remove(stem + ".csv")
+            if read_index(stem) is None:
+                write_index(stem, scan_segment(stem))
+            if self.compress and os.path.exists(stem + ".csv"):
+                self._pending.put(stem)
+
+    def _compress_loop(self):
+        while True:
+            stem = self._pending.get()
+            if stem is None:
+                return
+            try:
+                compress(stem)
+                self.compressed += 1
+            except OSError as e:
+                print(f"Log compression failed for {stem}: {e}")
+
+    def close(self, wait=True):
+        """Closes and indexes the open segment; wait=True also waits for pending compression."""
+        if not self._running:
+            return
+        super().close()
+        self._finish(self.path)
+        self._pending.put(None)
+        if wait:
+            self._compressor.join()
+
+    def stats(self):
+        result = super().stats()
+        result.update({
+            "segment": os.path.basename(self.path),
+            "segment_rows": self._rows,
+            "rotations": self.rotations,
+            "compressed": self.compressed,
+            "compress_pending": self._pending.qsize(),
+        })
+        return result
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="List the log segments or export a time window as one CSV.")
+    parser.add_argument("--dir", default="logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    export = sub.add_parser("export")
+    export.add_argument("csv")
+    export.add_argument("--start", help="ISO timestamp, inclusive")
+    export.add_argument("--end", help="ISO timestamp, exclusive")
+    args = parser.parse_args()
+
+    store = LogStore(args.dir)
+    if args.command == "list":
+        for segment in store.segments():
+            name = os.path.basename(segment["stem"]) + (".csv.gz" if segment["compressed"] else ".csv")
+            print(f"{name:<44} {segment['start'] or 'open':<27} {segment['end'] or '':<27} {segment['rows'] or ''}")
+    else:
+        chosen = store.overlapping(args.start, args.end)
+        count = store.export(args.csv, args.start, args.end)
+        print(f"{count} rows from {len(chosen)} of {len(store.stems())} segments -> {args.csv}")
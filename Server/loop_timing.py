@@ -0,0 +1,117 @@
+import json
+import signal
+import time
+import numpy as np
+
+STAGES = ("servo_settle", "echo_read", "predict", "motor_write")
+_timers = []
+
+class StageHistogram:
+    """
+    Fixed-size ring buffer of the latest stage durations (seconds).
+    add() only writes into preallocated storage; percentiles are computed
+    when someone asks for them.
+    """
+    def __init__(self, size=1024):
+        self.samples = np.zeros(size, dtype=np.float64)
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index += 1
+        if self.index == self.size:
+            self.index = 0
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        n = min(self.count, self.size)
+        if n == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(self.samples[:n], (50, 95, 99))
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000,
+            "p50_ms": p50 * 1000,
+            "p95_ms": p95 * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+class LoopTimer:
+    """
+    Per-stage timing for one control policy.
+
+        t0 = timer.now()
+        ...stage...
+        timer.record("echo_read", t0)
+
+    Every timer is registered so dump_all() (and the signal handler
+    from install_dump_handler) can print all policies side by side.
+    If trace_path is given, every sample is also appended to it as CSV,
+    or as JSON lines when the path ends with .json/.jsonl.
+    """
+    def __init__(self, policy, stages=STAGES, size=1024, trace_path=None, register=True):
+        self.policy = policy
+        self.stages = {stage: StageHistogram(size) for stage in stages}
+        self.trace = None
+        self.trace_json = False
+        if trace_path:
+            self.open_trace(trace_path)
+        if register:
+            _timers.append(self)
+
+    now = staticmethod(time.perf_counter)
+
+    def open_trace(self, trace_path):
+        self.trace_json = trace_path.endswith((".json", ".jsonl"))
+        self.trace = open(trace_path, "a", buffering=1)
+        if not self.trace_json and self.trace.tell() == 0:
+            self.trace.write("time,policy,stage,duration_ms\n")
+
+    def record(self, stage, start):
+        return self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage, duration):
+        self.stages[stage].add(duration)
+        if self.trace is not None:
+            if self.trace_json:
+                self.trace.write(json.dumps({"time": time.time(), "policy": self.policy,
+                                             "stage": stage, "duration_ms": duration * 1000}) + "\n")
+            else:
+                self.trace.write(f"{time.time():.6f},{self.policy},{stage},{duration * 1000:.3f}\n")
+        return duration
+
+    def summary(self):
+        return {stage: hist.summary() for stage, hist in self.stages.items()}
+
+    def format(self):
+        lines = [f"[{self.policy}]"]
+        for stage, s in self.summary().items():
+            if s["count"] == 0:
+                lines.append(f"  {stage:<13} no samples")
+            else:
+                lines.append(f"  {stage:<13} n={s['count']:<6} p50={s['p50_ms']:8.2f} ms  "
+                             f"p95={s['p95_ms']:8.2f} ms  p99={s['p99_ms']:8.2f} ms  max={s['max_ms']:8.2f} ms")
+        return "\n".join(lines)
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+def dump_all():
+    """Prints the stage statistics of every LoopTimer and returns them as a dict."""
+    for timer in _timers:
+        print(timer.format())
+    return {timer.policy: timer.summary() for timer in _timers}
+
+def install_dump_handler(signum=signal.SIGUSR1):
+    """kill -USR1 <pid> prints the current histograms without stopping the loop."""
+    signal.signal(signum, lambda *_: dump_all())
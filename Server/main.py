@@ -12,6 +12,8 @@ class ServerWindow(QMainWindow, Ui_server_ui):
     def __init__(self):
         self.use_ui = True
         self.start_tcp = False
+        self.use_async = False
+        self.async_server = None
         self.TCP_Server = Server()
         self.parse_options()
         
@@ -34,15 +36,24 @@ class ServerWindow(QMainWindow, Ui_server_ui):
                 self.Button_Server.setText("Off")
     
     def parse_options(self):
-        opts, _ = getopt.getopt(sys.argv[1:], "tn")
+        opts, _ = getopt.getopt(sys.argv[1:], "tna")
         for opt, _ in opts:
             if opt == "-t":
                 print("Opening TCP Server")
                 self.start_tcp = True
             elif opt == "-n":
                 self.use_ui = False
+            elif opt == "-a":
+                self.use_async = True
     
     def start_server_threads(self):
+        if self.use_async:
+            # One event loop serves commands, telemetry and video (see async_server.py).
+            if self.async_server is None:
+                from async_server import AsyncServer
+                self.async_server = AsyncServer(self.TCP_Server)
+                Thread(target=self.async_server.run, daemon=True).start()
+            return
         self.TCP_Server.StartTcpServer()
         self.ReadData = Thread(target=self.TCP_Server.readdata)
         self.SendVideo = Thread(target=self.TCP_Server.sendvideo)
@@ -53,10 +64,19 @@ class ServerWindow(QMainWindow, Ui_server_ui):
         self.PowerThread.start()
     
     def stop_server_threads(self):
+        if self.use_async:
+            if self.async_server is not None:
+                self.async_server.stop()
+                self.async_server = None
+            self.TCP_Server.StopTcpServer()
+            self.TCP_Server.telemetry.stop()
+            return
         for thread in [self.ReadData, self.SendVideo, self.PowerThread]:
             if thread.is_alive():
                 thread.join()
         self.TCP_Server.StopTcpServer()
+        # Subscribers outlive control-client reconnects (Reset); only switching the server off ends them.
+        self.TCP_Server.telemetry.stop()
     
     def close(self):
         try:
@@ -0,0 +1,152 @@
+import json
+import pickle
+import re
+import zipfile
+import numpy as np
+
+STORAGE_DTYPES = {
+    "FloatStorage": np.float32,
+    "DoubleStorage": np.float64,
+    "HalfStorage": np.float16,
+    "LongStorage": np.int64,
+    "IntStorage": np.int32,
+    "ShortStorage": np.int16,
+    "CharStorage": np.int8,
+    "ByteStorage": np.uint8,
+    "BoolStorage": np.bool_,
+}
+
+class _StorageType:
+    def __init__(self, name):
+        self.name = name
+
+def _rebuild_tensor(storage, storage_offset, size, stride, *args):
+    itemsize = storage.dtype.itemsize
+    view = np.lib.stride_tricks.as_strided(
+        storage[storage_offset:],
+        shape=tuple(size),
+        strides=tuple(s * itemsize for s in stride),
+    )
+    return np.ascontiguousarray(view)
+
+class _TorchUnpickler(pickle.Unpickler):
+    """
+    Reads the data.pkl of a torch zip checkpoint without importing torch.
+    Only the handful of globals a plain state_dict needs are allowed.
+    """
+    def __init__(self, file, archive, prefix, byteorder):
+        super().__init__(file)
+        self.archive = archive
+        self.prefix = prefix
+        self.byteorder = byteorder
+        self.storages = {}
+
+    def find_class(self, module, name):
+        if module == "collections" and name == "OrderedDict":
+            import collections
+            return collections.OrderedDict
+        if module == "torch._utils" and name in ("_rebuild_tensor_v2", "_rebuild_tensor"):
+            return _rebuild_tensor
+        if module == "torch._utils" and name == "_rebuild_parameter":
+            return lambda data, requires_grad, backward_hooks: data
+        if module == "torch" and name in STORAGE_DTYPES:
+            return _StorageType(name)
+        raise pickle.UnpicklingError(f"Unsupported global in checkpoint: {module}.{name}")
+
+    def persistent_load(self, pid):
+        kind, storage_type, key, location, numel = pid
+        if kind != "storage":
+            raise pickle.UnpicklingError(f"Unsupported persistent id: {kind}")
+        if key not in self.storages:
+            dtype = np.dtype(STORAGE_DTYPES[storage_type.name]).newbyteorder(
+                "<" if self.byteorder == "little" else ">")
+            raw = self.archive.read(f"{self.prefix}data/{key}")
+            self.storages[key] = np.frombuffer(raw, dtype=dtype, count=numel)
+        return self.storages[key]
+
+def load_state_dict(path):
+    """
+    Returns {name: np.ndarray} from either a torch .pth checkpoint
+    (read directly from the zip, no torch needed) or an exported .npz file.
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as weights:
+            return {name: weights[name].astype(np.float32) for name in weights.files}
+
+    with zipfile.ZipFile(path) as archive:
+        pkl_name = next(n for n in archive.namelist() if n.endswith("data.pkl"))
+        prefix = pkl_name[:-len("data.pkl")]
+        byteorder = "little"
+        if f"{prefix}byteorder" in archive.namelist():
+            byteorder = archive.read(f"{prefix}byteorder").decode().strip()
+        with archive.open(pkl_name) as f:
+            state = _TorchUnpickler(f, archive, prefix, byteorder).load()
+    return {name: np.asarray(value, dtype=np.float32) for name, value in state.items()}
+
+def export_weights(pth_path, npz_path):
+    """Writes the checkpoint weights to a plain .npz file for the robot."""
+    np.savez(npz_path, **load_state_dict(pth_path))
+
+class NumpyDirectionClassifier:
+    """
+    NumPy re-implementation of DirectionClassifierNet (Linear/ReLU stack).
+    Single-sample calls reuse preallocated buffers so nothing is allocated
+    per scan; forward() handles whole batches for offline evaluation.
+    """
+    def __init__(self, model_path, classes_json=None):
+        state = load_state_dict(model_path)
+        indices = sorted({int(m.group(1)) for m in
+                          (re.match(r"net\.(\d+)\.weight$", k) for k in state) if m})
+        if not indices:
+            raise ValueError(f"No Linear layers found in {model_path}")
+
+        self.weights = [np.ascontiguousarray(state[f"net.{i}.weight"].T) for i in indices]
+        self.biases = [state[f"net.{i}.bias"] for i in indices]
+        self.input_dim = self.weights[0].shape[0]
+        self.output_dim = self.weights[-1].shape[1]
+
+        self._input = np.zeros((1, self.input_dim), dtype=np.float32)
+        self._buffers = [np.zeros((1, w.shape[1]), dtype=np.float32) for w in self.weights]
+
+        self.classes_ = None
+        if classes_json is not None:
+            with open(classes_json, "r") as f:
+                self.classes_ = json.load(f)
+
+    def forward(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            x = x @ w
+            x += b
+            if i != last:
+                np.maximum(x, 0, out=x)
+        return x
+
+    def predict_index(self, L, M, R):
+        self._input[0, 0] = L
+        self._input[0, 1] = M
+        self._input[0, 2] = R
+        x = self._input
+        last = len(self.weights) - 1
+        for i, (w, b, out) in enumerate(zip(self.weights, self.biases, self._buffers)):
+            np.matmul(x, w, out=out)
+            out += b
+            if i != last:
+                np.maximum(out, 0, out=out)
+            x = out
+        return int(x[0].argmax())
+
+    def predict_batch(self, X):
+        return self.forward(X).argmax(axis=1)
+
+    def predict(self, L, M, R):
+        return self.classes_[self.predict_index(L, M, R)]
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 3:
+        print("Usage: python numpy_inference.py best_model.pth best_model.npz")
+        sys.exit(1)
+    export_weights(sys.argv[1], sys.argv[2])
+    print(f"Weights exported to {sys.argv[2]}")
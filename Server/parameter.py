@@ -1,6 +1,6 @@
 import os
 import json
-import subprocess
+from hal import read_pi_model
 
 class ParameterManager:
     PARAM_FILE = 'params.json'
@@ -55,8 +55,7 @@ class ParameterManager:
     
     def get_raspberry_pi_version(self):
         try:
-            result = subprocess.run(['cat', '/sys/firmware/devicetree/base/model'], capture_output=True, text=True)
-            return 2 if "Raspberry Pi 5" in result.stdout.strip() else 1
+            return 2 if "Raspberry Pi 5" in read_pi_model() else 1
         except Exception as e:
             print(f"Error getting Raspberry Pi version: {e}")
             return 1
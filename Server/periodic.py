@@ -0,0 +1,132 @@
+"""
+One thread for all periodic jobs.
+
+Replaces the self-respawning threading.Timer chains (a new thread per
+tick) with a heap of deadlines served by a single scheduler thread:
+
+    scheduler = PeriodicScheduler()
+    scheduler.add("light", 0.17, server.sendLight)
+    scheduler.enable("light", delay=0.3)
+    scheduler.disable("light")
+
+Deadlines advance by whole periods from the first one, so jobs do not
+drift. A run that ends past the job's next deadline counts as an overrun
+and the missed ticks are skipped rather than run back to back.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+class PeriodicJob:
+    def __init__(self, name, period, fn):
+        self.name = name
+        self.period = period
+        self.fn = fn
+        self.enabled = False
+        self.deadline = 0.0
+        self.generation = 0   # bumped by enable/disable; older heap entries are stale
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.busy = 0.0
+        self.max_late = 0.0
+
+    def ran(self, started, finished):
+        """Books one run and moves the deadline to the next period boundary after finished."""
+        self.runs += 1
+        self.busy += finished - started
+        self.max_late = max(self.max_late, started - self.deadline)
+        self.deadline += self.period
+        if self.deadline <= finished:
+            missed = int((finished - self.deadline) // self.period) + 1
+            self.overruns += 1
+            self.skipped += missed
+            self.deadline += missed * self.period
+        return self.deadline
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "period_ms": self.period * 1000,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "mean_run_ms": self.busy / self.runs * 1000 if self.runs else 0.0,
+            "max_late_ms": self.max_late * 1000,
+        }
+
+class PeriodicScheduler:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.jobs = {}
+        self._heap = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def add(self, name, period, fn):
+        with self._cond:
+            self.jobs[name] = PeriodicJob(name, period, fn)
+        return self.jobs[name]
+
+    def enable(self, name, delay=None):
+        """Starts a job (first run after delay, default one period). No-op if it is already running."""
+        with self._cond:
+            job = self.jobs[name]
+            if job.enabled:
+                return
+            job.enabled = True
+            job.generation += 1
+            job.deadline = self.clock() + (job.period if delay is None else delay)
+            heapq.heappush(self._heap, (job.deadline, next(self._order), job.generation, job))
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name="periodic", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def disable(self, name):
+        with self._cond:
+            job = self.jobs[name]
+            job.enabled = False
+            job.generation += 1
+            self._cond.notify()
+
+    def is_enabled(self, name):
+        return self.jobs[name].enabled
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    while self._heap and self._heap[0][3].generation != self._heap[0][2]:
+                        heapq.heappop(self._heap)
+                    if self._heap and self._heap[0][0] <= self.clock():
+                        break
+                    self._cond.wait(self._heap[0][0] - self.clock() if self._heap else None)
+                if not self._running:
+                    return
+                _, _, generation, job = heapq.heappop(self._heap)
+            started = self.clock()
+            try:
+                job.fn()
+            except Exception as e:
+                print(f"Periodic job '{job.name}' failed: {e}")
+            finished = self.clock()
+            with self._cond:
+                if job.generation == generation:
+                    deadline = job.ran(started, finished)
+                    heapq.heappush(self._heap, (deadline, next(self._order), generation, job))
+
+    def stats(self):
+        return {name: job.stats() for name, job in self.jobs.items()}
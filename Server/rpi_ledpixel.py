@@ -1,5 +1,5 @@
 import time
-from rpi_ws281x import Adafruit_NeoPixel, Color
+from hal import Adafruit_NeoPixel, Color
 
 class Freenove_RPI_WS281X:
     def __init__(self, led_count=4, bright=255, sequence="RGB"):
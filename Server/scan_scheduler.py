@@ -0,0 +1,137 @@
+import time
+from collections import deque
+
+SWEEP = [(30, 'L'), (90, 'M'), (150, 'R'), (90, 'M')]
+
+class LoopStats:
+    """
+    Decisions per second and latency over a sliding window.
+    sense-to-actuate runs from the servo command that started gathering the
+    decision's new reading(s) to the motor write; echo-to-actuate runs from
+    the newest echo read to the motor write.
+    """
+    def __init__(self, window=100):
+        self.decision_times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.echo_latencies = deque(maxlen=window)
+        self.total_decisions = 0
+
+    def record(self, sense_start, newest_read, actuated):
+        self.decision_times.append(actuated)
+        self.latencies.append(actuated - sense_start)
+        self.echo_latencies.append(actuated - newest_read)
+        self.total_decisions += 1
+
+    def decisions_per_second(self):
+        if len(self.decision_times) < 2:
+            return 0.0
+        span = self.decision_times[-1] - self.decision_times[0]
+        return (len(self.decision_times) - 1) / span if span > 0 else 0.0
+
+    @staticmethod
+    def _median(values):
+        values = sorted(values)
+        return values[len(values) // 2] if values else 0.0
+
+    def summary(self):
+        return {
+            "decisions": self.total_decisions,
+            "decisions_per_s": self.decisions_per_second(),
+            "latency_ms": self._median(self.latencies) * 1000,
+            "echo_latency_ms": self._median(self.echo_latencies) * 1000,
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return (f"{s['decisions']} decisions, {s['decisions_per_s']:.2f}/s, "
+                f"sense->actuate {s['latency_ms']:.1f} ms, "
+                f"echo->actuate {s['echo_latency_ms']:.1f} ms")
+
+class ScanScheduler:
+    """
+    Drives the scan/decide loop of a test_inference.Ultrasonic robot.
+
+    "sequential" reproduces Ultrasonic.run_once: three blocking moves back to
+    30, 90, 150 and then one decision. "pipelined" sweeps 30->90->150->90->30
+    and makes a decision at every stop, running inference and the motor
+    command for the latest (L, M, R) while the servo travels to the next angle.
+
+    settle_time=None waits exactly as long as the servo travel-time model
+    predicts; a number restores the old fixed sleep after every move.
+    """
+    def __init__(self, robot, mode="pipelined", settle_time=None, report_every=20):
+        if mode not in ("pipelined", "sequential"):
+            raise ValueError(f"Unknown scheduler mode: {mode}")
+        self.robot = robot
+        self.timing = robot.timing
+        self.mode = mode
+        self.settle_time = settle_time
+        self.report_every = report_every
+        self.stats = LoopStats()
+        self.readings = {}
+        self.last_read = None
+        self.sense_start = None
+        self.move_cost = 0.0
+        self.index = 0
+
+    def _move(self, angle):
+        now = time.monotonic()
+        if self.sense_start is None:
+            self.sense_start = now
+        t0 = self.timing.now()
+        self.robot.pwm_S.setServoPwm('0', angle)
+        self.move_cost = self.timing.now() - t0
+        if self.settle_time is None:
+            return now + self.robot.pwm_S.settle_remaining('0')
+        return now + self.settle_time
+
+    def _wait(self, settled_at):
+        """Blocks until the servo has settled; servo_settle = write + time blocked here."""
+        t0 = self.timing.now()
+        remaining = settled_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        self.timing.add("servo_settle", self.move_cost + self.timing.now() - t0)
+
+    def _decide(self, sense_start):
+        L, M, R = self.readings['L'], self.readings['M'], self.readings['R']
+        self.robot.decide(L, M, R)
+        self.stats.record(sense_start, self.last_read, time.monotonic())
+        if self.report_every and self.stats.total_decisions % self.report_every == 0:
+            print(f"[{self.mode}] {self.stats}")
+
+    def _read(self, label):
+        t0 = self.timing.now()
+        self.readings[label] = self.robot.get_distance()
+        self.timing.record("echo_read", t0)
+        self.last_read = time.monotonic()
+
+    def step_sequential(self):
+        for angle, label in SWEEP[:3]:
+            self._wait(self._move(angle))
+            self._read(label)
+        sense_start, self.sense_start = self.sense_start, None
+        self._decide(sense_start)
+        time.sleep(0.1)
+
+    def step_pipelined(self):
+        angle, label = SWEEP[self.index]
+        self.index = (self.index + 1) % len(SWEEP)
+
+        sense_start, self.sense_start = self.sense_start, None
+        settled_at = self._move(angle)
+        if len(self.readings) == 3:
+            self._decide(sense_start)
+        self._wait(settled_at)
+        self._read(label)
+
+    def step(self):
+        if self.mode == "pipelined":
+            self.step_pipelined()
+        else:
+            self.step_sequential()
+
+    def run(self, max_decisions=None):
+        while max_decisions is None or self.stats.total_decisions < max_decisions:
+            self.step()
+        return self.stats.summary()
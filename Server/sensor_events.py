@@ -0,0 +1,49 @@
+"""
+In-process change events from the ultrasonic scan and the motors.
+
+    import sensor_events
+    sensor_events.bus.subscribe(handler)    # handler(event) on the publishing thread
+
+Ultrasonic.scan_angle publishes a ScanRecord for every echo it reads and
+Motor.setMotorModel a MotorRecord whenever the duties actually change.
+Both carry time.monotonic_ns() taken right after the reading or the
+write, so a subscriber sees each change once, stamped with when it
+happened, instead of polling for it. Handlers run on the publisher's
+thread (the scan loop, the actuator writer) and must return quickly,
+e.g. by queueing a log row.
+"""
+import collections
+import threading
+
+ScanRecord = collections.namedtuple("ScanRecord", "t_ns angle distance L M R")
+MotorRecord = collections.namedtuple("MotorRecord", "t_ns m1 m2 m3 m4")
+
+class EventBus:
+    def __init__(self):
+        self.handlers = []
+        self.published = collections.Counter()
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler):
+        with self._lock:
+            self.handlers = self.handlers + [handler]
+        return handler
+
+    def unsubscribe(self, handler):
+        with self._lock:
+            self.handlers = [h for h in self.handlers if h is not handler]
+
+    def publish(self, event):
+        self.published[type(event).__name__] += 1
+        for handler in self.handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                self.errors += 1
+                print(f"Sensor event handler failed: {e}")
+
+    def stats(self):
+        return {"published": dict(self.published), "handlers": len(self.handlers), "errors": self.errors}
+
+bus = EventBus()
@@ -1,17 +1,10 @@
-import io
 import os
 import math
 import socket
 import  numpy as np
 import struct
 import time
-import csv
 import datetime
-from picamera2 import Picamera2,Preview
-from picamera2.encoders import JpegEncoder
-from picamera2.outputs import FileOutput
-from picamera2.encoders import Quality
-from threading import Condition
 import fcntl
 import  sys
 import threading
@@ -27,33 +20,53 @@ from Line_Tracking import *
 from threading import Timer
 from threading import Thread
 from Command import COMMAND as cmd
-
-class StreamingOutput(io.BufferedIOBase):
-    def __init__(self):
-        self.frame = None
-        self.condition = Condition()
-
-    def write(self, buf):
-        with self.condition:
-            self.frame = buf
-            self.condition.notify_all()
+from periodic import PeriodicScheduler
+from actuator_writer import ActuatorWriter
+from telemetry import TelemetryHub
+from video_stream import FrameSlot, VideoStreamer
+from camera_service import CameraService
+from log_store import SegmentedLogger
+from binary_log import BinaryLogger, record
+from sensor_events import ScanRecord, MotorRecord
+import sensor_events
+from command_parser import CommandParser
+from binary_protocol import encode, encode_text
+import itertools
+import devices
 
 class Server:
+    # Peripherals are built by the device registry on first use, once per process.
+    PWM=devices.device("motor")
+    servo=devices.device("servo")
+    led=devices.device("led")
+    ultrasonic=devices.device("ultrasonic")
+    buzzer=devices.device("buzzer")
+    adc=devices.device("adc_sampler")  # cached, filtered ADC readings; never waits on the bus
+    light=devices.device("light")
+    infrared=devices.device("line_tracking")
+
     def __init__(self):
-        self.PWM=Motor()
-        self.servo=Servo()
-        self.led=Led()
-        self.ultrasonic=Ultrasonic()
-        self.buzzer=Buzzer()
-        self.adc=Adc()
-        self.light=Light()
-        self.infrared=Line_Tracking()
         self.tcp_Flag = True
         self.sonic=True
         self.Light=False
         self.Light=False
         self.Line=False
+        # One scheduler thread runs the telemetry jobs; modes and commands toggle them.
+        self.scheduler = PeriodicScheduler()
+        self.scheduler.add("ultrasonic", 0.23, self.sendUltrasonic)
+        self.scheduler.add("light", 0.17, self.sendLight)
+        self.scheduler.add("line", 0.20, self.sendLine)
+        # Drive, servo and LED commands are coalesced and applied by one writer thread.
+        self.actuators = ActuatorWriter()
+        # Read-only monitors attach to the hub's port; port 5000 keeps one controlling client.
+        self.telemetry = TelemetryHub()
+        # Any number of port-8000 viewers share one camera, which records only while watched.
+        self.camera_service = CameraService()
+        self.viewers = []
         self.Mode = 'one'
+        self.handlers = self.command_handlers()
+        self.protocol = 'text'
+        self.tx_seq = itertools.count()
         self.endChar='\n'
         self.intervalChar='#'
         self.rotation_flag = False
@@ -68,41 +81,38 @@ class Server:
         self.current_L = 0
         self.current_M = 0
         self.current_R = 0
-        self.csv_file_path = "robot_data.csv"
-        self.log_interval = 0.2
-        self.keep_logging = True
-        self.logger_thread = Thread(target=self.continuous_logger)
-        self.logger_thread.start()
-        self.ultrasonic_thread = Thread(target=self.continuous_ultrasonic_loop)
-        self.ultrasonic_thread.start()
+        self.log_dir = "logs"  # rotated robot_data-*.csv segments, see log_store.py
+        self.binary_log_path = "robot_data.rlog"  # same rows as fixed-width records, see binary_log.py
+        self.wall_offset_ns = time.time_ns() - time.monotonic_ns()
         self.init_csv_file()
+        sensor_events.bus.subscribe(self.on_sensor_event)
 
 
     def init_csv_file(self):
-        if not os.path.exists(self.csv_file_path):
-            with open(self.csv_file_path, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "timestamp",
-                    "L_distance",
-                    "M_distance",
-                    "R_distance",
-                    "light1",
-                    "light2",
-                    "line_sensors",
-                    "motor1",
-                    "motor2",
-                    "motor3",
-                    "motor4"
-                ])
-            print("Created new CSV file with header.")
-        else:
-            print("CSV file already exists, will append data to it.")
+        # Rows are queued and written in batches by the logger's own thread, into a new
+        # segment per start, rotated by size and age and gzipped once closed.
+        self.csv_log = SegmentedLogger(self.log_dir, [
+            "timestamp",
+            "L_distance",
+            "M_distance",
+            "R_distance",
+            "light1",
+            "light2",
+            "line_sensors",
+            "motor1",
+            "motor2",
+            "motor3",
+            "motor4"
+        ])
+        self.binary_log = BinaryLogger(self.binary_log_path)
+        print(f"Logging to {self.csv_log.path}")
 
     
 
-    def log_data_to_csv(self, m1, m2, m3, m4):
-        timestamp = datetime.datetime.now().isoformat()
+    def log_data_to_csv(self, m1, m2, m3, m4, t_ns=None):
+        if t_ns is None:
+            t_ns = time.monotonic_ns()
+        timestamp = datetime.datetime.fromtimestamp((t_ns + self.wall_offset_ns) / 1e9).isoformat()
         row = [
             timestamp,
             self.current_L,
@@ -113,35 +123,25 @@ class Server:
             self.current_line, 
             m1, m2, m3, m4
         ]
-        with open(self.csv_file_path, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
+        self.csv_log.log(row)
+        self.binary_log.log(record(t_ns, *row[1:]))
 
-    def continuous_logger(self):
+    def on_sensor_event(self, event):
         """
-        Logs data every self.log_interval seconds.
-        Even if the user is holding the same button (i.e. no new commands),
-        the ultrasonic distance might be changing as we approach an obstacle.
+        Logs one row per ultrasonic reading that changes L/M/R and per motor
+        change, stamped with the time of the reading or the write (see
+        sensor_events.py). Unchanged state is not logged again, however long it lasts.
+        Logging follows the robot, not the control connection, so it carries on across reconnects.
         """
-        while self.keep_logging:
-            m1 = self.last_m1
-            m2 = self.last_m2
-            m3 = self.last_m3
-            m4 = self.last_m4
-
-            self.log_data_to_csv(m1, m2, m3, m4)
-
-            time.sleep(self.log_interval)
-    
-    def continuous_ultrasonic_loop(self):
-        while self.sonic:
-            L, M, R = self.ultrasonic.get_last_sensor_values()
-            motor_values = self.ultrasonic.get_motor_values()
-            
-            self.current_L, self.current_M, self.current_R = L, M, R
-            self.last_m1, self.last_m2, self.last_m3, self.last_m4 = motor_values
-            
-            time.sleep(0.2)
+        if isinstance(event, ScanRecord):
+            if (event.L, event.M, event.R) == (self.current_L, self.current_M, self.current_R):
+                return
+            self.current_L, self.current_M, self.current_R = event.L, event.M, event.R
+        elif isinstance(event, MotorRecord):
+            self.last_m1, self.last_m2, self.last_m3, self.last_m4 = event.m1, event.m2, event.m3, event.m4
+        else:
+            return
+        self.log_data_to_csv(self.last_m1, self.last_m2, self.last_m3, self.last_m4, t_ns=event.t_ns)
 
 
     def get_interface_ip(self, ifname="wlan0"):
@@ -163,9 +163,11 @@ class Server:
         self.server_socket = socket.socket()
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_socket.bind((HOST, 8000))
-        self.server_socket.listen(1)
+        self.server_socket.listen(4)
 
-        print("Server listening on 0.0.0.0 (ports 5000 & 8000).")
+        self.telemetry.serve(HOST)
+
+        print("Server listening on 0.0.0.0 (ports 5000 & 8000, telemetry on 5001).")
         print("Clients can connect via any IP assigned to the Pi:")
         try:
             ip_wlan0 = self.get_interface_ip("wlan0")
@@ -176,10 +178,19 @@ class Server:
             pass
 
     def StopTcpServer(self):
-        self.keep_logging = False
+        self.csv_log.flush()
+        self.binary_log.flush()
 
         try:
-            self.connection.close()
+            self.server_socket.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+        for connection in self.viewers:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+        try:
             self.connection1.close()
         except Exception as e:
             print ('\n'+"No client connection")
@@ -192,36 +203,54 @@ class Server:
         self.SendVideo.start()
         self.ReadData.start()
     def send(self,data):
-        self.connection1.send(data.encode('utf-8'))
+        if self.protocol=='binary':
+            self.connection1.send(encode_text(data, next(self.tx_seq)))
+        else:
+            self.connection1.send(data.encode('utf-8'))
+
+    def send_message(self, command, *fields):
+        """Sends command#field#...; packed straight into a frame once the client chose binary."""
+        if self.protocol=='binary':
+            self.connection1.send(encode(command, fields, next(self.tx_seq)))
+        else:
+            self.connection1.send(("#".join([command] + [str(field) for field in fields]) + '\n').encode('utf-8'))
+
+    def report(self, topic, command, *fields):
+        """Publishes a reading to the telemetry subscribers, then sends it to the controlling client."""
+        self.telemetry.publish(topic, command, *fields)
+        self.send_message(command, *fields)
     def sendvideo(self):
-        try:
-            self.connection,self.client_address = self.server_socket.accept()
-            self.connection=self.connection.makefile('wb')
-        except:
-            pass
-        self.server_socket.close()
-        print ("socket video connected ... ")
-        camera = Picamera2()
-        camera.configure(camera.create_video_configuration(main={"size": (400, 300)}))
-        output = StreamingOutput()
-        encoder = JpegEncoder(q=90)
-        camera.start_recording(encoder, FileOutput(output),quality=Quality.VERY_HIGH)
+        # Reset() replaces self.server_socket while this loop may still be leaving; close only our own.
+        listener = self.server_socket
         while True:
-            with output.condition:
-                output.condition.wait()
-                frame = output.frame
             try:
-                lenFrame = len(output.frame)
-                lengthBin = struct.pack('<I', lenFrame)
-                self.connection.write(lengthBin)
-                self.connection.write(frame)
-            except Exception as e:
-                camera.stop_recording()
-                camera.close()
-                print ("End transmit ... " )
+                connection,client_address = listener.accept()
+            except:
                 break
+            print ("socket video connected ... ")
+            Thread(target=self.serve_viewer, args=(connection,), daemon=True).start()
+        listener.close()
+
+    def serve_viewer(self, connection):
+        """Streams the shared camera to one viewer until it disconnects."""
+        self.viewers.append(connection)
+        output = FrameSlot()
+        viewer = self.camera_service.subscribe(output)
+        # Sends only the newest frame; the viewer stands in for encoder and camera, see camera_service.
+        streamer = VideoStreamer(connection, output, viewer, viewer)
+        try:
+            streamer.run()
+        except Exception as e:
+            pass
+        self.camera_service.unsubscribe(viewer)
+        self.viewers.remove(connection)
+        connection.close()
+        print ("End transmit ... " )
+        print ("Video stats: ", streamer.stats())
 
     def stopMode(self):
+        for group in ("drive", "servo"):
+            self.actuators.cancel(group)
         try:
             stop_thread(self.infraredRun)
             self.PWM.setMotorModel(0,0,0,0)
@@ -246,6 +275,8 @@ class Server:
         self.sonic=False
         self.Light=False
         self.Line=False         
+        for job in ("ultrasonic", "light", "line"):
+            self.scheduler.disable(job)
         self.send('CMD_MODE'+'#1'+'#'+'0'+'#'+'0'+'\n')
         self.send('CMD_MODE'+'#3'+'#'+'0'+'\n')
         self.send('CMD_MODE'+'#2'+'#'+'000'+'\n')           
@@ -254,266 +285,263 @@ class Server:
             try:
                 self.connection1,self.client_address1 = self.server_socket1.accept()
                 print ("Client connection successful !")
+                self.protocol='text'
             except:
                 print ("Client connect failed")
-            restCmd=""
+            parser=CommandParser(self.handlers)
             self.server_socket1.close()
             while True:
                 try:
-                    AllData=restCmd+self.connection1.recv(1024).decode('utf-8')
+                    AllData=self.connection1.recv(1024)
                 except:
                     if self.tcp_Flag:
-                        self.Reset()
+                        self.Reset()   # stops this connection and starts fresh listeners and threads
+                        return
                     break
-                print(AllData)
-                if len(AllData) < 5:
-                    restCmd=AllData
-                    if restCmd=='' and self.tcp_Flag:
+                if AllData==b'':
+                    if self.tcp_Flag:
                         self.Reset()
-                        break
-                restCmd=""
-                if AllData=='':
+                        return
                     break
-                else:
-                    cmdArray=AllData.split("\n")
-                    if(cmdArray[-1] != ""):
-                        restCmd=cmdArray[-1]
-                        cmdArray=cmdArray[:-1]
-
-                for oneCmd in cmdArray:
-                    data=oneCmd.split("#")
-                    if data==None:
-                        continue
-                    elif cmd.CMD_MODE in data:
-                        if data[1]=='one' or data[1]=="1":
-                            self.stopMode()
-                            self.Mode='one'
-                        elif data[1]=='two' or data[1]=="3":
-                            self.stopMode()
-                            self.Mode='two'
-                            self.lightRun=Thread(target=self.light.run)
-                            self.lightRun.start()
-                            self.Light = True
-                            self.lightTimer = threading.Timer(0.3, self.sendLight)
-                            self.lightTimer.start()
-                        elif data[1]=='three' or data[1]=="4":
-                            self.stopMode()
-                            self.Mode='three'
-                            self.ultrasonicRun=threading.Thread(target=self.ultrasonic.run)
-                            self.ultrasonicRun.start()
-                            self.sonic=True
-                            self.ultrasonicTimer = threading.Timer(0.2,self.sendUltrasonic)
-                            self.ultrasonicTimer.start()
-                        elif data[1]=='four' or data[1]=="2":
-                            self.stopMode()
-                            self.Mode='four'
-                            self.infraredRun=threading.Thread(target=self.infrared.run)
-                            self.infraredRun.start()
-                            self.Line=True
-                            self.lineTimer = threading.Timer(0.4,self.sendLine)
-                            self.lineTimer.start()
-
-                    elif (cmd.CMD_MOTOR in data) and self.Mode=='one':
-                        try:
-                            data1=int(data[1])
-                            data2=int(data[2])
-                            data3=int(data[3])
-                            data4=int(data[4])
-                            if data1==None or data2==None or data2==None or data3==None:
-                                continue
-                            self.PWM.setMotorModel(data1,data2,data3,data4)
-                            
-                            self.last_m1 = data1
-                            self.last_m2 = data2
-                            self.last_m3 = data3
-                            self.last_m4 = data4
-                        except Exception as e:
-                            print("CMD_MOTOR exception: ", e)
-                            pass
-                    elif (cmd.CMD_M_MOTOR in data) and self.Mode=='one':
-                        try:
-                            data1=int(data[1])
-                            data2=int(data[2])
-                            data3=int(data[3])
-                            data4=int(data[4])
-
-                            LX = -int((data2 * math.sin(math.radians(data1))))
-                            LY = int(data2 * math.cos(math.radians(data1)))
-                            RX = int(data4 * math.sin(math.radians(data3)))
-                            RY = int(data4 * math.cos(math.radians(data3)))
-
-                            FR = LY - LX + RX
-                            FL = LY + LX - RX
-                            BL = LY - LX - RX
-                            BR = LY + LX + RX
-
-                            if data1==None or data2==None or data2==None or data3==None:
-                                continue
-                            self.PWM.setMotorModel(FL,BL,FR,BR)
-                            self.log_data_to_csv(FL, BL, FR, BR)
-                        except:
-                            pass
-                    elif (cmd.CMD_CAR_ROTATE in data) and self.Mode == 'one':
-                        try:
-
-                            data1 = int(data[1])
-                            data2 = int(data[2])
-                            data3 = int(data[3])
-                            data4 = int(data[4])
-                            set_angle = data3
-                            if data4 == 0:
-                                try:
-                                    stop_thread(Rotate_Mode)
-                                    self.rotation_flag = False
-                                except:
-                                    pass
-                                LX = -int((data2 * math.sin(math.radians(data1))))
-                                LY = int(data2 * math.cos(math.radians(data1)))
-                                RX = int(data4 * math.sin(math.radians(data3)))
-                                RY = int(data4 * math.cos(math.radians(data3)))
-
-                                FR = LY - LX + RX
-                                FL = LY + LX - RX
-                                BL = LY - LX - RX
-                                BR = LY + LX + RX
-
-                                if data1 == None or data2 == None or data2 == None or data3 == None:
-                                    continue
-                                self.PWM.setMotorModel(FL, BL, FR, BR)
-                                self.log_data_to_csv(FL, BL, FR, BR)
-                            elif self.rotation_flag == False:
-                                self.angle = data[3]
-                                try:
-                                    stop_thread(Rotate_Mode)
-                                except:
-                                    pass
-                                self.rotation_flag = True
-                                Rotate_Mode = Thread(target=self.PWM.Rotate, args=(data3,))
-                                Rotate_Mode.start()
-                        except:
-                            pass
-                    elif cmd.CMD_SERVO in data:
-                        try:
-                            data1 = data[1]
-                            data2 = int(data[2])
-                            if data1 == None or data2 == None:
-                                continue
-                            self.servo.setServoPwm(data1,data2)
-                        except:
-                            pass
-
-                    elif cmd.CMD_LED in data:
-                        try:
-                            data1=int(data[1])
-                            data2=int(data[2])
-                            data3=int(data[3])
-                            data4=int(data[4])
-                            if data1==None or data2==None or data3==None or data4==None:
-                                continue
-                            self.led.ledIndex(data1,data2,data3,data4)
-                        except:
-                            pass
-                    elif cmd.CMD_LED_MOD in data:
-                        self.LedMoD=data[1]
-                        try:
-                            stop_thread(self.Led_Run_Mode)
-                        except:
-                            pass
-                        time.sleep(0.1)
-                        self.Led_Run_Mode=Thread(target=self.led.ledMode,args=(data[1],))
-                        self.Led_Run_Mode.start()
-                    elif cmd.CMD_SONIC in data:
-                        if data[1]=='1':
-                            self.sonic=True
-                            self.ultrasonicTimer = threading.Timer(0.5,self.sendUltrasonic)
-                            self.ultrasonicTimer.start()
-                        else:
-                            self.sonic=False
-                    elif cmd.CMD_BUZZER in data:
-                        try:
-                            self.buzzer.run(data[1])
-                        except:
-                            pass
-                    elif cmd.CMD_LIGHT in data:
-                        if data[1]=='1':
-                            self.Light=True
-                            self.lightTimer = threading.Timer(0.3,self.sendLight)
-                            self.lightTimer.start()
-                        else:
-                            self.Light=False
-                    elif cmd.CMD_POWER in data:
-                        ADC_Power=self.adc.recvADC(2)*3
-                        try:
-                            self.send(cmd.CMD_POWER+'#'+str(round(ADC_Power, 2))+'\n')
-                        except:
-                            pass
+                parser.feed(AllData)
         except Exception as e:
             print(e)
         self.StopTcpServer()
 
+    def command_handlers(self):
+        """Command token -> handler for CommandParser; arguments arrive converted as listed in command_parser.ARGUMENTS."""
+        return {
+            cmd.CMD_MODE: self.on_mode,
+            cmd.CMD_MOTOR: self.on_motor,
+            cmd.CMD_M_MOTOR: self.on_m_motor,
+            cmd.CMD_CAR_ROTATE: self.on_car_rotate,
+            cmd.CMD_SERVO: self.on_servo,
+            cmd.CMD_LED: self.on_led,
+            cmd.CMD_LED_MOD: self.on_led_mode,
+            cmd.CMD_SONIC: self.on_sonic,
+            cmd.CMD_BUZZER: self.on_buzzer,
+            cmd.CMD_LIGHT: self.on_light,
+            cmd.CMD_POWER: self.on_power,
+            cmd.CMD_PROTOCOL: self.on_protocol,
+        }
+
+    def on_mode(self, mode):
+        if mode=='one' or mode=="1":
+            self.stopMode()
+            self.Mode='one'
+        elif mode=='two' or mode=="3":
+            self.stopMode()
+            self.Mode='two'
+            self.lightRun=Thread(target=self.light.run)
+            self.lightRun.start()
+            self.Light = True
+            self.scheduler.enable("light", delay=0.3)
+        elif mode=='three' or mode=="4":
+            self.stopMode()
+            self.Mode='three'
+            self.ultrasonicRun=threading.Thread(target=self.ultrasonic.run)
+            self.ultrasonicRun.start()
+            self.sonic=True
+            self.scheduler.enable("ultrasonic", delay=0.2)
+        elif mode=='four' or mode=="2":
+            self.stopMode()
+            self.Mode='four'
+            self.infraredRun=threading.Thread(target=self.infrared.run)
+            self.infraredRun.start()
+            self.Line=True
+            self.scheduler.enable("line", delay=0.4)
+
+    def on_motor(self, data1, data2, data3, data4):
+        if self.Mode!='one':
+            return
+        self.actuators.submit("drive", self.apply_motor, data1, data2, data3, data4)
+
+    def apply_motor(self, data1, data2, data3, data4):
+        self.PWM.setMotorModel(data1,data2,data3,data4)
+
+        self.last_m1 = data1
+        self.last_m2 = data2
+        self.last_m3 = data3
+        self.last_m4 = data4
+        self.telemetry.publish("motor", cmd.CMD_MOTOR, data1, data2, data3, data4)
+
+    def apply_drive(self, FL, BL, FR, BR):
+        self.PWM.setMotorModel(FL,BL,FR,BR)
+        self.telemetry.publish("motor", cmd.CMD_MOTOR, FL, BL, FR, BR)
+
+    @staticmethod
+    def mecanum_duties(data1, data2, data3, data4):
+        LX = -int((data2 * math.sin(math.radians(data1))))
+        LY = int(data2 * math.cos(math.radians(data1)))
+        RX = int(data4 * math.sin(math.radians(data3)))
+
+        FR = LY - LX + RX
+        FL = LY + LX - RX
+        BL = LY - LX - RX
+        BR = LY + LX + RX
+        return FL, BL, FR, BR
+
+    def on_m_motor(self, data1, data2, data3, data4):
+        if self.Mode!='one':
+            return
+        self.actuators.submit("drive", self.apply_drive, *self.mecanum_duties(data1, data2, data3, data4))
+
+    def on_car_rotate(self, data1, data2, data3, data4):
+        if self.Mode != 'one':
+            return
+        if data4 == 0:
+            try:
+                stop_thread(self.Rotate_Mode)
+                self.rotation_flag = False
+            except:
+                pass
+            self.actuators.submit("drive", self.apply_drive, *self.mecanum_duties(data1, data2, data3, data4))
+        elif self.rotation_flag == False:
+            self.actuators.cancel("drive")
+            self.angle = str(data3)
+            try:
+                stop_thread(self.Rotate_Mode)
+            except:
+                pass
+            self.rotation_flag = True
+            self.Rotate_Mode = Thread(target=self.PWM.Rotate, args=(data3,))
+            self.Rotate_Mode.start()
+
+    def on_servo(self, channel, angle):
+        self.actuators.submit("servo", self.apply_servo, channel, angle, key=channel)
+
+    def apply_servo(self, channel, angle):
+        self.servo.setServoPwm(channel,angle)
+
+    def on_led(self, data1, data2, data3, data4):
+        self.actuators.submit("led", self.apply_led, data1, data2, data3, data4, key=data1)
+
+    def apply_led(self, data1, data2, data3, data4):
+        self.led.ledIndex(data1,data2,data3,data4)
+
+    def on_led_mode(self, mode):
+        self.LedMoD=mode
+        try:
+            stop_thread(self.Led_Run_Mode)
+        except:
+            pass
+        time.sleep(0.1)
+        self.Led_Run_Mode=Thread(target=self.led.ledMode,args=(mode,))
+        self.Led_Run_Mode.start()
+
+    def on_sonic(self, flag):
+        if flag=='1':
+            self.sonic=True
+            self.scheduler.enable("ultrasonic", delay=0.5)
+        else:
+            self.sonic=False
+
+    def on_buzzer(self, flag):
+        self.buzzer.run(flag)
+
+    def on_light(self, flag):
+        if flag=='1':
+            self.Light=True
+            self.scheduler.enable("light", delay=0.3)
+        else:
+            self.Light=False
+
+    def on_power(self):
+        ADC_Power=self.adc.recvADC(2)*3
+        try:
+            self.send_message(cmd.CMD_POWER, round(ADC_Power, 2))
+        except:
+            pass
+
+    def on_protocol(self, name):
+        """CMD_PROTOCOL#binary / #text: the answer goes out as text, then output switches."""
+        if name in ('binary', '1'):
+            self.send_message(cmd.CMD_PROTOCOL, 'binary')
+            self.protocol='binary'
+        else:
+            self.protocol='text'
+            self.send_message(cmd.CMD_PROTOCOL, 'text')
+
+    def ultrasonic_tick(self):
+        ADC_Ultrasonic=self.ultrasonic.get_distance()
+        self.current_ultrasonic = ADC_Ultrasonic
+
+        try:
+            self.report("distance", cmd.CMD_MODE, "3", ADC_Ultrasonic)
+        except:
+            self.sonic=False
+
     def sendUltrasonic(self):
         if self.sonic==True:
-            ADC_Ultrasonic=self.ultrasonic.get_distance()
-            self.current_ultrasonic = ADC_Ultrasonic
+            self.ultrasonic_tick()
+        else:
+            self.scheduler.disable("ultrasonic")
 
-            try:
-                self.send(cmd.CMD_MODE+"#"+"3"+"#"+str(ADC_Ultrasonic)+'\n')
-            except:
-                self.sonic=False
-                
-            self.ultrasonicTimer = threading.Timer(0.23,self.sendUltrasonic)
-            self.ultrasonicTimer.start()
+    def light_tick(self):
+        ADC_Light1=self.adc.recvADC(0)
+        ADC_Light2=self.adc.recvADC(1)
+
+        self.current_light1 = ADC_Light1
+        self.current_light2 = ADC_Light2
+        
+        try:
+            self.report("light", cmd.CMD_MODE, "1", ADC_Light1, ADC_Light2)
+        except:
+            self.Light=False
 
     def sendLight(self):
         if self.Light==True:
-            ADC_Light1=self.adc.recvADC(0)
-            ADC_Light2=self.adc.recvADC(1)
+            self.light_tick()
+        else:
+            self.scheduler.disable("light")
 
-            self.current_light1 = ADC_Light1
-            self.current_light2 = ADC_Light2
-            
-            try:
-                self.send("CMD_MODE#1"+'#'+str(ADC_Light1)+'#'+str(ADC_Light2)+'\n')
-            except:
-                self.Light=False
-            self.lightTimer = threading.Timer(0.17,self.sendLight)
-            self.lightTimer.start()
+    def line_tick(self):
+        Line1= IR01_sensor.value
+        Line2= IR02_sensor.value
+        Line3= IR03_sensor.value
+        self.current_line = f"{Line1}{Line2}{Line3}"
+
+        try:
+            self.report("line", cmd.CMD_MODE, "2", f"{Line1}{Line2}{Line3}")
+        except:
+            self.Line=False
 
     def sendLine(self):
         if self.Line==True:
-            Line1= IR01_sensor.value
-            Line2= IR02_sensor.value
-            Line3= IR03_sensor.value
-            self.current_line = f"{Line1}{Line2}{Line3}"
+            self.line_tick()
+        else:
+            self.scheduler.disable("line")
+
+    def power_tick(self):
+        """Sends the battery voltage to the client and returns it; power_alarm beeps if it is low."""
+        ADC_Power=self.adc.recvADC(2)*3
+        try:
+            self.report("power", cmd.CMD_POWER, round(ADC_Power, 2))
+        except:
+            pass
+        return ADC_Power
+
+    def power_alarm(self, ADC_Power):
+        if ADC_Power < 6.5:
+            for i in range(4):
+                self.buzzer.run('1')
+                time.sleep(0.1)
+                self.buzzer.run('0')
+                time.sleep(0.1)
+        elif ADC_Power< 7:
+            for i in range(2):
+                self.buzzer.run('1')
+                time.sleep(0.1)
+                self.buzzer.run('0')
+                time.sleep(0.1)
+        else:
+            self.buzzer.run('0')
 
-            try:
-                self.send("CMD_MODE#2"+'#'+str(Line1)+str(Line2)+str(Line3)+'\n')
-            except:
-                self.Line=False
-            self.LineTimer = threading.Timer(0.20,self.sendLine)
-            self.LineTimer.start()
     def Power(self):
         while True:
-            ADC_Power=self.adc.recvADC(2)*3
-            try:
-                self.send(cmd.CMD_POWER+'#'+str(round(ADC_Power, 2))+'\n')
-            except:
-                pass
+            ADC_Power=self.power_tick()
             time.sleep(3)
-            if ADC_Power < 6.5:
-                for i in range(4):
-                    self.buzzer.run('1')
-                    time.sleep(0.1)
-                    self.buzzer.run('0')
-                    time.sleep(0.1)
-            elif ADC_Power< 7:
-                for i in range(2):
-                    self.buzzer.run('1')
-                    time.sleep(0.1)
-                    self.buzzer.run('0')
-                    time.sleep(0.1)
-            else:
-                self.buzzer.run('0')
+            self.power_alarm(ADC_Power)
 if __name__=='__main__':
     pass
 
@@ -1,16 +1,133 @@
+import os
+import json
 import time
 from PCA9685 import PCA9685
 
+SERVO_SPEED = 400.0      # degrees per second
+SERVO_DEAD_TIME = 0.05   # seconds before the horn starts moving / echo is usable
+SERVO_RANGE = 180
+CALIBRATION_FILE = 'servo_calibration.json'
+
+class ServoMotion:
+    """
+    Travel-time model of one servo channel.
+    Tracks the last commanded angle and predicts when the horn arrives:
+    dead_time + |delta| / speed. An unknown start position counts as full range.
+    """
+    def __init__(self, speed=SERVO_SPEED, dead_time=SERVO_DEAD_TIME):
+        self.speed = speed
+        self.dead_time = dead_time
+        self.angle = None
+        self.settled_at = 0.0
+
+    def travel_time(self, from_angle, to_angle):
+        delta = SERVO_RANGE if from_angle is None else abs(to_angle - from_angle)
+        if delta == 0:
+            return 0.0
+        return self.dead_time + delta / self.speed
+
+    def command(self, angle, now=None):
+        """
+        Records a new target and returns the predicted arrival time.
+        If the previous move is still running, its remaining time is added,
+        which is an upper bound on the horn's true path.
+        """
+        now = time.monotonic() if now is None else now
+        self.settled_at = max(now, self.settled_at) + self.travel_time(self.angle, angle)
+        self.angle = angle
+        return self.settled_at
+
+    def remaining(self, now=None):
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.settled_at - now)
+
+    def wait_settled(self):
+        remaining = self.remaining()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    @staticmethod
+    def fit(samples):
+        """
+        Least-squares fit of t = dead_time + delta / speed
+        from (delta_degrees, seconds) samples. Returns (speed, dead_time).
+        """
+        n = len(samples)
+        if n < 2:
+            raise ValueError("Need at least two samples to fit the servo model")
+        mean_d = sum(d for d, _ in samples) / n
+        mean_t = sum(t for _, t in samples) / n
+        var_d = sum((d - mean_d) ** 2 for d, _ in samples)
+        if var_d == 0:
+            raise ValueError("Samples must cover at least two different move sizes")
+        slope = sum((d - mean_d) * (t - mean_t) for d, t in samples) / var_d
+        if slope <= 0:
+            raise ValueError("Travel time does not grow with angle, check the calibration scene")
+        return 1.0 / slope, max(0.0, mean_t - slope * mean_d)
+
 class Servo:
 
     def __init__(self):
-        self.PwmServo = PCA9685(0x40, debug=True)
+        self.PwmServo = PCA9685(0x40, debug=True, client="servo")
         self.PwmServo.setPWMFreq(50)
         self.PwmServo.setServoPulse(8,1500)
         self.PwmServo.setServoPulse(9,1500)
+        speed, dead_time = load_calibration()
+        self.motion = {str(channel): ServoMotion(speed, dead_time) for channel in range(8)}
+
+    def settle_remaining(self,channel='0'):
+        return self.motion[channel].remaining()
+
+    def wait_settled(self,channel='0'):
+        self.motion[channel].wait_settled()
+
+    def calibrate(self,read_distance,channel='0',moves=((90,60),(90,30),(30,150),(150,90),(90,150),(150,30)),
+                  tolerance=2,hold=1.0,poll=0.005,timeout=1.5):
+        """
+        Fits SERVO_SPEED/SERVO_DEAD_TIME for one channel.
+        Point the sensor at a scene whose distance differs between the angles
+        in moves. For each move the reference distance at the target is read
+        after a long hold, then the move is timed until read_distance() stays
+        within tolerance of it for two consecutive polls. Moves that do not
+        settle within timeout are dropped (and reported), not fitted.
+        """
+        samples = []
+        dropped = 0
+        for start, target in moves:
+            self.setServoPwm(channel, target)
+            time.sleep(hold)
+            reference = read_distance()
+            self.setServoPwm(channel, start)
+            time.sleep(hold)
+
+            self.setServoPwm(channel, target)
+            t0 = time.monotonic()
+            hits = 0
+            while time.monotonic() - t0 < timeout:
+                if abs(read_distance() - reference) <= tolerance:
+                    hits += 1
+                    if hits == 2:
+                        break
+                else:
+                    hits = 0
+                time.sleep(poll)
+            else:
+                dropped += 1
+                print(f"Servo move {start}->{target} did not settle within {timeout} s, dropped")
+                continue
+            samples.append((abs(target - start), time.monotonic() - t0))
+        if dropped:
+            print(f"{dropped} of {len(moves)} calibration moves dropped")
+
+        speed, dead_time = ServoMotion.fit(samples)
+        motion = self.motion[channel]
+        motion.speed, motion.dead_time = speed, dead_time
+        return speed, dead_time, samples
 
     def setServoPwm(self,channel,angle,error=10):
         angle=int(angle)
+        if channel in self.motion:
+            self.motion[channel].command(angle)
         if channel=='0':
             self.PwmServo.setServoPulse(8,2500-int((angle+error)/0.09))
         elif channel=='1':
@@ -28,25 +145,47 @@ class Servo:
         elif channel=='7':
             self.PwmServo.setServoPulse(15,500+int((angle+error)/0.09))
 
-if __name__ == '__main__':
-    print("Now servos will rotate to 90°.") 
-    print("If they have already been at 90°, nothing will be observed.")
-    print("Please keep the program running when installing the servos.")
-    print("After that, you can press ctrl-C to end the program.")
-    pwm=Servo()
-    while True:
-        try :
-            pwm.setServoPwm('0',90)
-            pwm.setServoPwm('1',90)
-        except KeyboardInterrupt:
-            print ("\nEnd of program")
-            break
-
-    
-
-    
-       
+def load_calibration(file_path=CALIBRATION_FILE):
+    if os.path.exists(file_path):
+        try:
+            with open(file_path, 'r') as file:
+                params = json.load(file)
+            return params['speed'], params['dead_time']
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"Error reading {file_path}: {e}")
+    return SERVO_SPEED, SERVO_DEAD_TIME
 
+def save_calibration(speed, dead_time, file_path=CALIBRATION_FILE):
+    with open(file_path, 'w') as file:
+        json.dump({'speed': speed, 'dead_time': dead_time}, file, indent=4)
 
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Centre the servos at 90 degrees, or --calibrate the scan servo's speed.")
+    parser.add_argument("--calibrate", action="store_true",
+                        help=f"fit SERVO_SPEED/SERVO_DEAD_TIME with the distance sensor and save them to {CALIBRATION_FILE}")
+    args = parser.parse_args()
 
-    
+    if args.calibrate:
+        from gpiozero import DistanceSensor
+        sensor = DistanceSensor(echo=22, trigger=27, max_distance=3)
+        pwm=Servo()
+        speed, dead_time, samples = pwm.calibrate(lambda: int(sensor.distance * 100))
+        for delta, seconds in samples:
+            print(f"  {delta:3d} deg -> {seconds * 1000:.0f} ms")
+        print(f"Servo speed {speed:.0f} deg/s, dead time {dead_time * 1000:.0f} ms")
+        save_calibration(speed, dead_time)
+        print(f"Saved to {CALIBRATION_FILE}")
+    else:
+        print("Now servos will rotate to 90°.") 
+        print("If they have already been at 90°, nothing will be observed.")
+        print("Please keep the program running when installing the servos.")
+        print("After that, you can press ctrl-C to end the program.")
+        pwm=Servo()
+        while True:
+            try :
+                pwm.setServoPwm('0',90)
+                pwm.setServoPwm('1',90)
+            except KeyboardInterrupt:
+                print ("\nEnd of program")
+                break
@@ -0,0 +1,316 @@
+"""
+Closed-loop 2D simulator for the navigation policies.
+
+Many episodes are stepped in parallel with NumPy: skid-steer kinematics
+driven by the four motor duties, three ultrasonic rays (servo at 30/90/150)
+cast against polygon obstacle maps, and circle-vs-segment collision checks.
+
+Policies are called whenever an episode finishes its previous command:
+
+    policy(readings, episodes, t) -> one command timeline per episode
+
+where readings is an (n, 3) int array of L/M/R distances in cm and a
+timeline is a list of (duties, seconds) segments; the last segment is
+held until the next decision. Two adapters are provided:
+
+    rule_policy()              Server/Ultrasonic.run_motor, its sleeps
+                               turned into segment durations
+    classifier_policy(model)   the test_inference classifier + DIRECTION_TO_MOTOR
+
+    python simulator.py --policy classifier --model ../models/best_model.pth --classes ../models/classes.json
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from directions import DIRECTION_TO_MOTOR
+
+MAX_CM = 300
+SERVO_ANGLES = (30, 90, 150)      # L, M, R
+DEADBAND = 400                    # duty below which the wheels do not turn
+SPEED_PER_DUTY = 0.05             # cm/s per duty unit above the deadband
+TRACK_WIDTH = 14.0                # cm
+SKID_FACTOR = 1.6                 # skid-steer turns slower than an ideal diff drive
+ROBOT_RADIUS = 12.0               # cm
+SENSOR_OFFSET = 9.0               # cm ahead of the robot centre
+SCAN_TIME = 0.3                   # seconds of sensing between decisions
+
+def box(x, y, w, h):
+    return [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+
+def random_map(rng, width=400.0, height=300.0, n_boxes=6, min_size=20.0, max_size=60.0):
+    """A walled arena with random rectangular obstacles, as a list of polygons."""
+    polygons = [box(0.0, 0.0, width, height)]
+    for _ in range(n_boxes):
+        w, h = rng.uniform(min_size, max_size, size=2)
+        x = rng.uniform(0.0, width - w)
+        y = rng.uniform(0.0, height - h)
+        polygons.append(box(x, y, w, h))
+    return polygons
+
+def load_map(path):
+    """JSON file with a list of polygons, each a list of [x, y] vertices in cm."""
+    with open(path, "r") as f:
+        return [[tuple(p) for p in poly] for poly in json.load(f)]
+
+def polygons_to_segments(polygons):
+    segments = []
+    for poly in polygons:
+        for i in range(len(poly)):
+            (x1, y1), (x2, y2) = poly[i], poly[(i + 1) % len(poly)]
+            segments.append((x1, y1, x2, y2))
+    return np.array(segments, dtype=np.float64)
+
+def segment_distance(points, segments):
+    """(E, 2) points vs (S, 4) segments -> (E,) distance to the nearest segment."""
+    a = segments[None, :, 0:2]
+    ab = segments[None, :, 2:4] - a
+    ap = points[:, None, :] - a
+    t = np.clip((ap * ab).sum(-1) / np.maximum((ab * ab).sum(-1), 1e-12), 0.0, 1.0)
+    closest = a + t[..., None] * ab
+    return np.sqrt(((points[:, None, :] - closest) ** 2).sum(-1)).min(axis=1)
+
+def cast_rays(origins, directions, segments, max_range=MAX_CM):
+    """
+    (E, R, 2) ray origins and unit directions vs (S, 4) segments
+    -> (E, R) distance to the first hit, capped at max_range.
+    """
+    p = origins[:, :, None, :]
+    d = directions[:, :, None, :]
+    a = segments[None, None, :, 0:2]
+    s = segments[None, None, :, 2:4] - a
+    denom = d[..., 0] * s[..., 1] - d[..., 1] * s[..., 0]
+    ap = a - p
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (ap[..., 0] * s[..., 1] - ap[..., 1] * s[..., 0]) / denom
+        u = (ap[..., 0] * d[..., 1] - ap[..., 1] * d[..., 0]) / denom
+    hit = (np.abs(denom) > 1e-12) & (t >= 0) & (u >= 0) & (u <= 1)
+    t = np.where(hit, t, np.inf).min(axis=2)
+    return np.minimum(t, max_range)
+
+def wheel_speeds(duties):
+    """(E, 4) duties -> (E,) left and right track speeds in cm/s."""
+    duties = np.clip(duties, -4095, 4095)
+    effective = np.sign(duties) * np.maximum(np.abs(duties) - DEADBAND, 0)
+    speed = effective * SPEED_PER_DUTY
+    return speed[:, 0:2].mean(axis=1), speed[:, 2:4].mean(axis=1)
+
+class Simulation:
+    """Steps n_episodes robots on one obstacle map in lock-step."""
+    def __init__(self, polygons, n_episodes=64, dt=0.05, seed=0, noise_cm=0.0, scan_time=SCAN_TIME):
+        self.rng = np.random.default_rng(seed)
+        self.scan_time = scan_time
+        self.segments = polygons_to_segments(polygons)
+        self.n = n_episodes
+        self.dt = dt
+        self.noise_cm = noise_cm
+        self.pose = self._random_poses(polygons)
+        self.duties = np.zeros((self.n, 4))
+        self.alive = np.ones(self.n, dtype=bool)
+        self.collided = np.zeros(self.n, dtype=bool)
+        self.collision_time = np.full(self.n, np.nan)
+        self.distance = np.zeros(self.n)
+        self.next_decision = np.zeros(self.n)
+        self.timelines = [[] for _ in range(self.n)]
+        self.multi_segment = set()
+        self.t = 0.0
+
+    def _random_poses(self, polygons):
+        xs = [x for poly in polygons for x, _ in poly]
+        ys = [y for poly in polygons for _, y in poly]
+        lo, hi = np.array([min(xs), min(ys)]), np.array([max(xs), max(ys)])
+        boxes = [(np.min(p, axis=0), np.max(p, axis=0)) for p in map(np.array, polygons[1:])]
+        poses = np.zeros((self.n, 3))
+        filled = 0
+        while filled < self.n:
+            cand = self.rng.uniform(lo, hi, size=(self.n, 2))
+            ok = segment_distance(cand, self.segments) > ROBOT_RADIUS * 2
+            for bmin, bmax in boxes:
+                ok &= ~np.all((cand >= bmin) & (cand <= bmax), axis=1)
+            cand = cand[ok][: self.n - filled]
+            poses[filled:filled + len(cand), 0:2] = cand
+            filled += len(cand)
+        poses[:, 2] = self.rng.uniform(-np.pi, np.pi, size=self.n)
+        return poses
+
+    def readings(self, idx):
+        """L/M/R distances in whole cm for the given episodes, like get_distance()."""
+        pose = self.pose[idx]
+        heading = pose[:, 2:3]
+        rays = heading + np.radians(90.0 - np.array(SERVO_ANGLES))[None, :]
+        directions = np.stack([np.cos(rays), np.sin(rays)], axis=-1)
+        sensor = pose[:, 0:2] + SENSOR_OFFSET * np.stack([np.cos(pose[:, 2]), np.sin(pose[:, 2])], axis=-1)
+        origins = np.repeat(sensor[:, None, :], len(SERVO_ANGLES), axis=1)
+        dist = cast_rays(origins, directions, self.segments)
+        if self.noise_cm:
+            dist = dist + self.rng.normal(0.0, self.noise_cm, size=dist.shape)
+        return np.clip(dist, 0, MAX_CM).astype(np.int64)
+
+    def _apply_timelines(self):
+        for e in list(self.multi_segment):
+            timeline = self.timelines[e]
+            while len(timeline) > 1 and timeline[0][1] <= self.t:
+                timeline.pop(0)
+            self.duties[e] = timeline[0][0]
+            if len(timeline) == 1 or not self.alive[e]:
+                self.multi_segment.discard(e)
+
+    def step(self, policy):
+        due = np.flatnonzero(self.alive & (self.next_decision <= self.t))
+        if len(due):
+            commands = policy(self.readings(due), due, self.t)
+            for e, segments in zip(due, commands):
+                start = self.t
+                timeline = []
+                for duties, seconds in segments:
+                    start += seconds
+                    timeline.append((np.asarray(duties, dtype=np.float64), start))
+                self.timelines[e] = timeline
+                self.duties[e] = timeline[0][0]
+                if len(timeline) > 1:
+                    self.multi_segment.add(e)
+                self.next_decision[e] = start + self.scan_time
+        self._apply_timelines()
+
+        left, right = wheel_speeds(self.duties)
+        v = np.where(self.alive, (left + right) / 2.0, 0.0)
+        omega = np.where(self.alive, (right - left) / (TRACK_WIDTH * SKID_FACTOR), 0.0)
+        theta = self.pose[:, 2] + omega * self.dt / 2.0
+        self.pose[:, 0] += v * np.cos(theta) * self.dt
+        self.pose[:, 1] += v * np.sin(theta) * self.dt
+        self.pose[:, 2] = (self.pose[:, 2] + omega * self.dt + np.pi) % (2 * np.pi) - np.pi
+        self.distance += np.abs(v) * self.dt
+        self.t += self.dt
+
+        hit = self.alive & (segment_distance(self.pose[:, 0:2], self.segments) < ROBOT_RADIUS)
+        self.collided |= hit
+        self.collision_time[hit] = self.t
+        self.alive &= ~hit
+
+    def run(self, policy, duration=60.0):
+        start = time.perf_counter()
+        while self.t < duration and self.alive.any():
+            self.step(policy)
+        wall = time.perf_counter() - start
+        return {
+            "episodes": self.n,
+            "sim_seconds": duration,
+            "collisions": int(self.collided.sum()),
+            "collision_rate": float(self.collided.mean()),
+            "mean_time_to_collision_s": float(np.nanmean(self.collision_time)) if self.collided.any() else None,
+            "mean_distance_cm": float(self.distance.mean()),
+            "wall_seconds": wall,
+            "episodes_per_second": self.n / wall if wall > 0 else float("inf"),
+        }
+
+def classifier_policy(model_path, classes_json, backend="numpy", table_path=None):
+    """Batched DirectionClassifierNet (or lookup table) -> DIRECTION_TO_MOTOR duties."""
+    if backend == "table":
+        from decision_table import DecisionTable
+        model = DecisionTable(table_path)
+    else:
+        from numpy_inference import NumpyDirectionClassifier
+        model = NumpyDirectionClassifier(model_path)
+    with open(classes_json, "r") as f:
+        classes = json.load(f)
+    duties = np.array([DIRECTION_TO_MOTOR.get(c, DIRECTION_TO_MOTOR["UNKNOWN"]) for c in classes])
+
+    def policy(readings, episodes, t):
+        idx = model.predict_batch(readings)
+        return [[(duties[i], 0.0)] for i in idx]
+    return policy
+
+class SimClock:
+    """Stands in for the time module inside a policy: sleep() advances simulated time."""
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class _RecordingMotor:
+    def __init__(self, clock):
+        self.clock = clock
+        self.commands = []
+
+    def setMotorModel(self, duty1, duty2, duty3, duty4):
+        self.commands.append(((duty1, duty2, duty3, duty4), self.clock.now))
+
+def rule_policy():
+    """
+    Runs the real Ultrasonic.run_motor for every episode on a per-episode
+    Ultrasonic state object (constructed without touching hardware), with
+    the module's time replaced by a SimClock so manoeuvre sleeps become
+    segment durations. Importing Ultrasonic builds no devices, so this
+    runs without robot hardware.
+    """
+    import Ultrasonic as ultrasonic_module
+    from loop_timing import LoopTimer
+
+    clock = SimClock()
+    timing = LoopTimer("simulated_rule_based", stages=ultrasonic_module.RULE_STAGES, register=False)
+    robots = {}
+
+    def new_robot():
+        robot = ultrasonic_module.Ultrasonic.__new__(ultrasonic_module.Ultrasonic)
+        robot.timing = timing
+        robot.motor_values = [0, 0, 0, 0]
+        robot.last_L, robot.last_M, robot.last_R = 100, 100, 100
+        robot.prev_L, robot.prev_M, robot.prev_R = 100, 100, 100
+        robot.stuck_timer = None
+        return robot
+
+    def policy(readings, episodes, t):
+        real_time = ultrasonic_module.time
+        ultrasonic_module.time = clock
+        try:
+            commands = []
+            for e, (L, M, R) in zip(episodes, readings.tolist()):
+                if e not in robots:
+                    robots[e] = new_robot()
+                robot = robots[e]
+                robot.PWM = _RecordingMotor(clock)
+                clock.now = t
+                robot.run_motor(L, M, R)
+                recorded = robot.PWM.commands
+                segments = []
+                for i, (duties, at) in enumerate(recorded):
+                    end = recorded[i + 1][1] if i + 1 < len(recorded) else clock.now
+                    segments.append((duties, end - at))
+                commands.append(segments or [(robot.motor_values, 0.0)])
+            return commands
+        finally:
+            ultrasonic_module.time = real_time
+    return policy
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policy", choices=["rule", "classifier"], default="classifier")
+    parser.add_argument("--model", default="best_model.pth")
+    parser.add_argument("--classes", default="classes.json")
+    parser.add_argument("--backend", choices=["numpy", "table"], default="numpy")
+    parser.add_argument("--table", default="decision_table.npy")
+    parser.add_argument("--map", help="JSON polygon map (default: random arena per seed)")
+    parser.add_argument("--episodes", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--dt", type=float, default=0.05)
+    parser.add_argument("--noise", type=float, default=0.0, help="distance noise std-dev in cm")
+    parser.add_argument("--scan-time", type=float, default=SCAN_TIME, help="sensing time before each decision")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    polygons = load_map(args.map) if args.map else random_map(np.random.default_rng(args.seed))
+    if args.policy == "rule":
+        policy = rule_policy()
+    else:
+        policy = classifier_policy(args.model, args.classes, args.backend, args.table)
+    sim = Simulation(polygons, n_episodes=args.episodes, dt=args.dt, seed=args.seed, noise_cm=args.noise,
+                     scan_time=args.scan_time)
+    print(json.dumps(sim.run(policy, args.duration), indent=4))
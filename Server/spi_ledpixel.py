@@ -1,4 +1,4 @@
-import spidev
+from hal import spidev
 import numpy
 
 class Freenove_SPI_LedPixel:
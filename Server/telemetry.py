@@ -0,0 +1,152 @@
+"""
+Read-only telemetry fan-out.
+
+Port 5000 stays the single control connection. Any number of monitors
+or recorders can connect to TELEMETRY_PORT and receive the telemetry
+stream as text lines of the control protocol:
+
+    CMD_MODE#3#42.5
+    CMD_POWER#7.85
+    CMD_MOTOR#600#600#600#600
+
+Server publishes each reading once; the hub appends the encoded line to
+a bounded queue per subscriber and a sender thread per subscriber writes
+it out. When a subscriber falls behind, its oldest lines are dropped
+(and counted), so a slow client never stalls the control client or the
+robot loop. A client that stops reading altogether is dropped once a
+send has blocked for SEND_TIMEOUT seconds. Subscribers send nothing;
+anything they do send is ignored.
+
+    hub = TelemetryHub()
+    hub.serve()                               # accept subscribers on port 5001
+    hub.publish("power", cmd.CMD_POWER, 7.85)
+"""
+import collections
+import socket
+import threading
+
+TELEMETRY_PORT = 5001
+QUEUE_LENGTH = 64
+SEND_TIMEOUT = 5.0
+TOPICS = ("distance", "light", "line", "power", "motor")
+
+class Subscriber:
+    def __init__(self, sock, address, topics=TOPICS, maxlen=QUEUE_LENGTH):
+        self.sock = sock
+        self.sock.settimeout(SEND_TIMEOUT)
+        self.address = address
+        self.topics = frozenset(topics)
+        self.queue = collections.deque(maxlen=maxlen)
+        self.cond = threading.Condition()
+        self.connected = True
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, line):
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(line)
+            self.cond.notify()
+
+    def run(self):
+        """Sender thread: writes queued lines in batches until the client goes away."""
+        try:
+            while True:
+                with self.cond:
+                    while self.connected and not self.queue:
+                        self.cond.wait()
+                    if not self.connected:
+                        return
+                    lines = list(self.queue)
+                    self.queue.clear()
+                self.sock.sendall(b"".join(lines))
+                self.sent += len(lines)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        with self.cond:
+            self.connected = False
+            self.cond.notify()
+        # shutdown() wakes a sendall() blocked in the sender thread; close() alone does not.
+        for end in (lambda: self.sock.shutdown(socket.SHUT_RDWR), self.sock.close):
+            try:
+                end()
+            except OSError:
+                pass
+
+    def stats(self):
+        return {"address": self.address, "sent": self.sent, "dropped": self.dropped, "queued": len(self.queue)}
+
+class TelemetryHub:
+    def __init__(self, maxlen=QUEUE_LENGTH):
+        self.maxlen = maxlen
+        self.subscribers = []
+        self.published = 0
+        self._lock = threading.Lock()
+        self._listener = None
+        self.port = None
+
+    def subscribe(self, sock, address=None, topics=TOPICS):
+        """Starts streaming to a connected socket; returns its Subscriber."""
+        subscriber = Subscriber(sock, address, topics, self.maxlen)
+        with self._lock:
+            self.subscribers = self.subscribers + [subscriber]
+        threading.Thread(target=self._serve_subscriber, args=(subscriber,),
+                         name=f"telemetry {address}", daemon=True).start()
+        return subscriber
+
+    def publish(self, topic, command, *fields):
+        """Queues command#field#... for every subscriber of topic. Never blocks on a socket."""
+        subscribers = self.subscribers
+        self.published += 1
+        if not subscribers:
+            return
+        line = ("#".join([command] + [str(field) for field in fields]) + "\n").encode("utf-8")
+        for subscriber in subscribers:
+            if topic in subscriber.topics:
+                subscriber.offer(line)
+
+    def serve(self, host="0.0.0.0", port=TELEMETRY_PORT):
+        """Accepts subscribers on port in a background thread; a second call is a no-op."""
+        if self._listener is not None:
+            return
+        self._listener = socket.socket()
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._listener.bind((host, port))
+        self._listener.listen(8)
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, name="telemetry", daemon=True).start()
+
+    def stop(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            try:
+                listener.shutdown(socket.SHUT_RDWR)   # wakes the accept thread
+            except OSError:
+                pass
+            listener.close()
+        for subscriber in self.subscribers:
+            subscriber.close()
+
+    def _accept(self):
+        listener = self._listener
+        while True:
+            try:
+                sock, address = listener.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            print(f"Telemetry subscriber {address[0]}:{address[1]} connected")
+            self.subscribe(sock, address)
+
+    def _serve_subscriber(self, subscriber):
+        subscriber.run()
+        with self._lock:
+            self.subscribers = [s for s in self.subscribers if s is not subscriber]
+
+    def stats(self):
+        return {"published": self.published, "subscribers": [s.stats() for s in self.subscribers]}
@@ -2,45 +2,68 @@ import time
 import random
 import json
 import numpy as np
-import torch
 from collections import deque
 
 from Motor import Motor
-from gpiozero import DistanceSensor
 from servo import Servo
 from PCA9685 import PCA9685
-
-from direction_classifier_net import DirectionClassifierNet
+from scan_scheduler import ScanScheduler
+from loop_timing import LoopTimer, install_dump_handler
+from directions import DIRECTION_TO_MOTOR
+import devices
 
 MODEL_PATH = "best_model.pth"
 CLASSES_JSON = "classes.json"
-
-trigger_pin = 27
-echo_pin    = 22
-sensor = DistanceSensor(echo=echo_pin, trigger=trigger_pin, max_distance=3)
+TABLE_PATH = "decision_table.npy"
+INFERENCE_BACKEND = "numpy"  # "numpy" (no torch import), "table" or "torch"
+SCAN_SCHEDULER = "pipelined"  # "pipelined" or "sequential" (original three-stop scan)
+TIMING_TRACE = None  # e.g. "inference_timing.csv" or ".jsonl" to trace every stage
+
+sensor = devices.lazy("distance_sensor")
+
+def load_model(backend, model_path):
+    """
+    "numpy" evaluates the MLP with numpy_inference and never imports torch;
+    "table" looks the decision up in the grid built by decision_table.py;
+    "torch" keeps the original DirectionClassifierNet path.
+    """
+    if backend == "numpy":
+        from numpy_inference import NumpyDirectionClassifier
+        return NumpyDirectionClassifier(model_path)
+    if backend == "table":
+        from decision_table import DecisionTable
+        return DecisionTable(TABLE_PATH)
+    if backend == "torch":
+        import torch
+        from direction_classifier_net import DirectionClassifierNet
+        model = DirectionClassifierNet(
+            input_dim=3,
+            hidden_dim=64,
+            output_dim=11,
+            num_hidden_layers=2
+        )
+        model.load_state_dict(torch.load(model_path, map_location="cpu"))
+        model.eval()
+        return model
+    raise ValueError(f"Unknown inference backend: {backend}")
 
 class Ultrasonic:
-    def __init__(self):
-        self.PWM = Motor()
-        self.pwm_S = Servo()
+    def __init__(self, backend=INFERENCE_BACKEND, trace_path=TIMING_TRACE):
+        self.timing = LoopTimer("inference", trace_path=trace_path)
+        self.PWM = devices.get("motor")
+        self.pwm_S = devices.get("servo")
         self.motor_values = [0, 0, 0, 0]
 
         self.pwm_S.setServoPwm('0', 90)
-        time.sleep(0.5)
+        self.pwm_S.wait_settled('0')
 
         self.last_L, self.last_M, self.last_R = 100, 100, 100
         self.prev_L, self.prev_M, self.prev_R = 100, 100, 100
         self.stuck_timer = None
 
-        print("Loading classification model...")
-        self.model = DirectionClassifierNet(
-            input_dim=3,
-            hidden_dim=64,
-            output_dim=11,
-            num_hidden_layers=2
-        )
-        self.model.load_state_dict(torch.load(MODEL_PATH, map_location="cpu"))
-        self.model.eval()
+        print(f"Loading classification model ({backend} backend)...")
+        self.backend = backend
+        self.model = load_model(backend, MODEL_PATH)
         print("Model loaded from:", MODEL_PATH)
 
         print("Loading classes list from JSON...")
@@ -50,23 +73,7 @@ class Ultrasonic:
 
         self.recent_preds = deque(maxlen=1)
 
-        self.direction_to_motor = {
-            "STOP":             [0, 0, 0, 0],
-            "FORWARD":          [600, 600, 600, 600],
-            "REVERSE":          [-1200, -1200, -1200, -1200],
-            "HARD_LEFT":        [-1600, -1600, 1600, 1600],
-            "HARD_RIGHT":       [1600, 1600, -1600, -1600],
-            "SOFT_RIGHT":       [1500, 1500, -800, -800],
-            "SOFT_LEFT":        [-800, -800, 1500, 1500],
-            "REVERSE_LEFT":     [2000, 2000, -2000, -2000],
-            "REVERSE_RIGHT":    [-2000, -2000, 2000, 2000],
-            "ESCAPE_REVERSE":   [-1500, -1500, -1500, -1500],
-            "ESCAPE_LEFT":      [-1800, -1800, 1800, 1800],
-            "ESCAPE_RIGHT":     [1800, 1800, -1800, -1800],
-            "AGGRESSIVE_RIGHT": [2000, 2000, -1200, -1200],
-            "AGGRESSIVE_LEFT":  [-1200, -1200, 2000, 2000],
-            "UNKNOWN":          [600, 600, 600, 600]
-        }
+        self.direction_to_motor = {k: list(v) for k, v in DIRECTION_TO_MOTOR.items()}
 
     def get_distance(self):
         return int(sensor.distance * 100)
@@ -74,9 +81,13 @@ class Ultrasonic:
     def read_three_distances(self):
         distances = {}
         for angle, label in [(30, 'L'), (90, 'M'), (150, 'R')]:
+            t0 = self.timing.now()
             self.pwm_S.setServoPwm('0', angle)
-            time.sleep(0.3)  # reduced delay for faster scanning
+            self.pwm_S.wait_settled('0')
+            self.timing.record("servo_settle", t0)
+            t0 = self.timing.now()
             d = self.get_distance()
+            self.timing.record("echo_read", t0)
             distances[label] = d
         return distances['L'], distances['M'], distances['R']
 
@@ -112,6 +123,10 @@ class Ultrasonic:
         self.PWM.setMotorModel(*self.motor_values)
 
     def predict_direction_class(self, L, M, R):
+        if self.backend != "torch":
+            return self.classes_[self.model.predict_index(L, M, R)]
+
+        import torch
         arr = np.array([[L, M, R]], dtype=np.float32)
         tensor_in = torch.from_numpy(arr)
         with torch.no_grad():
@@ -126,12 +141,19 @@ class Ultrasonic:
 
     def run_once(self):
         L, M, R = self.read_three_distances()
+        self.decide(L, M, R)
+
+    def decide(self, L, M, R):
+        """Inference + motor command for one (L, M, R) triple."""
+        self.last_L, self.last_M, self.last_R = L, M, R
 
         if self.detect_stuck(L, M, R):
             self.perform_unstuck_maneuver()
             return
 
+        t0 = self.timing.now()
         raw_direction = self.predict_direction_class(L, M, R)
+        self.timing.record("predict", t0)
 
         self.recent_preds.append(raw_direction)
 
@@ -139,22 +161,34 @@ class Ultrasonic:
         print(f"Raw prediction: {raw_direction}, Final direction: {direction_str}")
 
         self.motor_values = self.direction_to_motor.get(direction_str, [600, 600, 600, 600])
+        t0 = self.timing.now()
         self.PWM.setMotorModel(*self.motor_values)
+        self.timing.record("motor_write", t0)
         print(f"Motor command set to: {self.motor_values}")
 
-    def run(self):
-        print("Starting rapid navigation. Press Ctrl+C to stop.")
+    def run(self, scheduler=SCAN_SCHEDULER):
+        print(f"Starting rapid navigation ({scheduler} scan). Press Ctrl+C to stop.")
+        self.scheduler = ScanScheduler(self, mode=scheduler)
         try:
-            while True:
-                self.run_once()
-                time.sleep(0.1)
+            self.scheduler.run()
         except KeyboardInterrupt:
+            print(f"Loop stats: {self.scheduler.stats}")
+            print(self.timing.format())
+            self.timing.close()
             print("Stopping. Setting motors to 0.")
             self.PWM.setMotorModel(0, 0, 0, 0)
             self.pwm_S.setServoPwm('0', 90)
 
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", default=INFERENCE_BACKEND, choices=["numpy", "table", "torch"])
+    parser.add_argument("--scheduler", default=SCAN_SCHEDULER, choices=["pipelined", "sequential"])
+    parser.add_argument("--trace", default=TIMING_TRACE, help="per-stage timing trace (.csv or .jsonl)")
+    args = parser.parse_args()
+    install_dump_handler()
+
     print("🚀 Robot Inference Script Starting with reduced sensor delay and immediate decision-making...")
-    ultrasonic = Ultrasonic()
-    ultrasonic.run()
+    ultrasonic = Ultrasonic(backend=args.backend, trace_path=args.trace)
+    ultrasonic.run(scheduler=args.scheduler)
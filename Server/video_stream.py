@@ -0,0 +1,181 @@
+"""
+Port-8000 video streamer that only ever sends the newest frame.
+
+Same wire format as before: a little-endian uint32 length followed by
+the JPEG. The camera writes into a FrameSlot that keeps only the latest
+frame; VideoStreamer takes whatever is newest when the socket is ready,
+so frames that arrive while a send is in progress are replaced rather
+than queued. Header and payload go out in one sendmsg() from the
+camera's buffer.
+
+The streamer also adapts to the link. For every frame it looks at how
+long the send blocked and how many bytes of the previous frames were
+still unsent in the kernel's socket buffer (SIOCOUTQ) when it was
+ready. When the link is congested it lowers the JPEG quality, then the
+frame rate; after a run of clean frames it raises them again. While the
+socket buffer still holds more than one frame, new frames are skipped
+instead of being queued behind it.
+
+    slot = FrameSlot()
+    camera.start_recording(encoder, FileOutput(slot))
+    VideoStreamer(sock, slot, encoder, camera).run()
+
+Any object with start_recording/set_controls and a JpegEncoder-like q
+attribute works as the source; hal's simulated Picamera2 produces
+synthetic frames.
+"""
+import fcntl
+import io
+import socket
+import struct
+import threading
+import time
+
+SIOCOUTQ = 0x5411          # Linux: bytes not yet sent from a socket's send buffer
+QUALITY = (30, 90, 10)     # min, max, step down (step up is half of it)
+FRAME_RATE = (5, 30)       # min, max fps
+CLEAN_FRAMES = 30          # uncongested frames before quality/fps step up
+COOLDOWN_FRAMES = 5        # frames to let a change take effect before the next step down
+
+class FrameSlot(io.BufferedIOBase):
+    """Camera output holding only the newest frame; counts frames replaced before anyone took them."""
+    def __init__(self):
+        self.frame = None
+        self.seq = 0
+        self.taken = 0
+        self.replaced = 0
+        self.condition = threading.Condition()
+
+    def write(self, buf):
+        with self.condition:
+            if self.seq > self.taken:
+                self.replaced += 1
+            self.frame = buf
+            self.seq += 1
+            self.condition.notify_all()
+        return len(buf)
+
+    def take(self, timeout=None):
+        """Waits for a frame newer than the last one taken; returns (seq, frame) or None on timeout."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.seq > self.taken, timeout):
+                return None
+            self.taken = self.seq
+            return self.seq, self.frame
+
+def unsent_bytes(sock):
+    try:
+        return struct.unpack("i", fcntl.ioctl(sock.fileno(), SIOCOUTQ, b"\0\0\0\0"))[0]
+    except (OSError, ValueError):   # not Linux, or the socket is already closed
+        return 0
+
+def check_connected(sock):
+    """Raises ConnectionError if the viewer has closed its end; viewers never send, so any EOF is a hang-up."""
+    try:
+        if sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b"":
+            raise ConnectionError("viewer disconnected")
+    except BlockingIOError:
+        pass
+
+def send_frame(sock, frame):
+    """Length header and frame in one sendmsg; loops over partial sends without copying the frame."""
+    buffers = [struct.pack('<I', len(frame)), memoryview(frame)]
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        while sent:
+            if sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                buffers.pop(0)
+            else:
+                buffers[0] = buffers[0][sent:]
+                sent = 0
+
+class VideoStreamer:
+    def __init__(self, sock, slot, encoder=None, camera=None, quality=QUALITY, frame_rate=FRAME_RATE):
+        self.sock = sock
+        self.slot = slot
+        self.encoder = encoder
+        self.camera = camera
+        self.min_quality, self.max_quality, self.quality_step = quality
+        self.min_fps, self.max_fps = frame_rate
+        self.quality = getattr(encoder, "q", None) or self.max_quality
+        self.fps = self.max_fps
+        self.running = True
+        self.frames = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.congested = 0
+        self._clean = 0
+        self._cooldown = 0
+        self._started = None
+
+    def run(self):
+        """Streams until the client goes away (raises the socket error) or stop() is called."""
+        self._started = time.monotonic()
+        while self.running:
+            taken = self.slot.take(timeout=1.0)
+            if taken is None:
+                continue
+            frame = taken[1]
+            backlog = unsent_bytes(self.sock)
+            if backlog > len(frame):
+                check_connected(self.sock)   # nothing is sent while skipping, so look for a hang-up here
+                self.skipped += 1
+                self.adapt(True)
+                continue
+            t0 = time.monotonic()
+            send_frame(self.sock, frame)
+            blocked = time.monotonic() - t0
+            self.frames += 1
+            self.bytes += len(frame) + 4
+            # Congested: the send blocked, or half of the previous frame was still unsent a frame later.
+            self.adapt(blocked > 0.5 / self.fps or backlog > len(frame) // 2)
+
+    def stop(self):
+        self.running = False
+
+    def adapt(self, congested):
+        """One step of the controller: quality down first then fps on congestion, fps up first then quality when clean."""
+        if congested:
+            self.congested += 1
+            self._clean = 0
+            if self._cooldown:
+                self._cooldown -= 1
+            elif self.quality > self.min_quality:
+                self.set_quality(self.quality - self.quality_step)
+            elif self.fps > self.min_fps:
+                self.set_fps(self.fps * 3 // 4)
+            return
+        self._cooldown = 0
+        self._clean += 1
+        if self._clean >= CLEAN_FRAMES:
+            self._clean = 0
+            if self.fps < self.max_fps:
+                self.set_fps(self.fps * 5 // 4 + 1)
+            elif self.quality < self.max_quality:
+                self.set_quality(self.quality + self.quality_step // 2)
+
+    def set_quality(self, quality):
+        self.quality = max(self.min_quality, min(self.max_quality, quality))
+        self._cooldown = COOLDOWN_FRAMES
+        if self.encoder is not None:
+            self.encoder.q = self.quality
+
+    def set_fps(self, fps):
+        self.fps = max(self.min_fps, min(self.max_fps, fps))
+        self._cooldown = COOLDOWN_FRAMES
+        if self.camera is not None:
+            duration = int(1e6 / self.fps)
+            self.camera.set_controls({"FrameDurationLimits": (duration, duration)})
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            "fps": self.frames / elapsed if elapsed else 0.0,
+            "bytes_per_s": self.bytes / elapsed if elapsed else 0.0,
+            "frames": self.frames,
+            "dropped": self.slot.replaced + self.skipped,
+            "skipped_backlog": self.skipped,
+            "quality": self.quality,
+            "target_fps": self.fps,
+        }
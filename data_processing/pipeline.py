@@ -0,0 +1,105 @@
+"""
+Single-pass preprocessing: robot_data logs in, robot_data_v2.csv out.
+
+Applies what columns.py, clean_data.py and new_feature.py do, in that
+order, in one streamed pass: every input is read CHUNK_ROWS rows at a
+time and each chunk goes through all three steps before it is appended
+to the output, so memory stays the same however long the logs are.
+
+Inputs are processed in the order given. Each may be headerless (the
+case columns.py fixes) or have the header, may carry a trailing
+direction column (it is recomputed), and may be gzipped, e.g. the
+.csv.gz segments of Server/log_store.py.
+
+    python pipeline.py robot_data.csv [more.csv logs/robot_data-*.csv.gz] [-o robot_data_v2.csv]
+
+Values are copied as logged; only the motor duties clean_data.py
+rewrites change. On data/robot_data.csv the output is byte-identical to
+data/robot_data_v2.csv.
+"""
+import argparse
+import os
+import resource
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Server"))
+from directions import MOTOR_TO_DIRECTION
+
+COLUMNS = [
+    "timestamp",
+    "L_distance",
+    "M_distance",
+    "R_distance",
+    "light1",
+    "light2",
+    "line_sensors",
+    "motor1",
+    "motor2",
+    "motor3",
+    "motor4"
+]
+DISTANCES = ["L_distance", "M_distance", "R_distance"]
+MOTORS = ["motor1", "motor2", "motor3", "motor4"]
+CHUNK_ROWS = 50000
+
+def has_header(path):
+    first = pd.read_csv(path, header=None, nrows=1, dtype=str, keep_default_na=False)
+    return len(first) > 0 and first.iloc[0, 0] == COLUMNS[0]
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """columns.py: yields chunks with COLUMNS names, every value as the logged text; none for an empty file."""
+    try:
+        header = has_header(path)
+    except pd.errors.EmptyDataError:
+        return []
+    return pd.read_csv(path, header=None, names=COLUMNS, usecols=range(len(COLUMNS)),
+                       skiprows=1 if header else 0, dtype=str, keep_default_na=False,
+                       chunksize=chunk_rows)
+
+def clean(chunk):
+    """clean_data.py: drops idle rows (all distances 100, motors stopped) and rewrites 800 duties to 600."""
+    numbers = chunk[DISTANCES + MOTORS].apply(pd.to_numeric, errors="coerce")
+    idle = (numbers[DISTANCES] == 100).all(axis=1) & (numbers[MOTORS] == 0).all(axis=1)
+    chunk, numbers = chunk[~idle].copy(), numbers[~idle]
+    forward = (numbers[MOTORS] == 800).all(axis=1)
+    chunk.loc[forward, MOTORS] = "600"
+    numbers.loc[forward, MOTORS] = 600
+    return chunk, numbers
+
+def label(chunk, numbers):
+    """new_feature.py: drops rows with the motors stopped and adds the direction column."""
+    moving = ~(numbers[MOTORS] == 0).all(axis=1)
+    chunk, numbers = chunk[moving], numbers[moving]
+    duties = zip(*(numbers[m] for m in MOTORS))
+    return chunk.assign(direction=[MOTOR_TO_DIRECTION.get(key, "UNKNOWN") for key in duties])
+
+def process(inputs, output, chunk_rows=CHUNK_ROWS):
+    """Streams inputs through all three steps into output; returns row counts."""
+    counts = {"rows_in": 0, "rows_out": 0, "chunks": 0}
+    with open(output, "w", newline="") as f:
+        header = True
+        for path in inputs:
+            for chunk in read_chunks(path, chunk_rows):
+                counts["rows_in"] += len(chunk)
+                counts["chunks"] += 1
+                chunk = label(*clean(chunk))
+                chunk.to_csv(f, header=header, index=False)
+                header = False
+                counts["rows_out"] += len(chunk)
+        if header:
+            f.write(",".join(COLUMNS + ["direction"]) + "\n")
+    return counts
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fix headers, clean and label robot_data logs in one streamed pass.")
+    parser.add_argument("inputs", nargs="+", help="robot_data CSV logs (.csv or .csv.gz), in order")
+    parser.add_argument("-o", "--output", default="robot_data_v2.csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    counts = process(args.inputs, args.output, args.chunk_rows)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{counts['rows_in']} rows from {len(args.inputs)} file(s) in {counts['chunks']} chunks -> "
+          f"{counts['rows_out']} rows in {args.output} (peak RSS {peak_mb:.0f} MB)")
@@ -3,6 +3,7 @@ import random
 import numpy as np
 import pandas as pd
 import json
+import struct
 
 import torch
 import torch.nn as nn
@@ -39,6 +40,28 @@ def set_seed(seed=42):
     torch.manual_seed(seed)
     torch.cuda.manual_seed_all(seed)
 
+BINARY_LOG_MAGIC   = b"RBTLOG1\n"
+
+def load_binary_log(path):
+    """
+    Memory-maps a binary robot log (Server/binary_log.py) as a NumPy record
+    array, without parsing: records["distance"] is an (n, 3) uint16 view of
+    L, M, R. Returns (records, header), header["directions"] naming the
+    direction ids.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_LOG_MAGIC)) != BINARY_LOG_MAGIC:
+            raise ValueError(f"{path} is not a binary robot log")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+    offset = len(BINARY_LOG_MAGIC) + 4 + length
+    dtype = np.dtype([tuple(field[:2]) + tuple(tuple(shape) for shape in field[2:])
+                      for field in header["dtype"]])
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype), header
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,)), header
+
 def load_classification_data(csv_file):
     """
     We assume columns:
@@ -47,7 +70,14 @@ def load_classification_data(csv_file):
 
     We'll drop everything except [L_distance, M_distance, R_distance, direction].
     'direction' is our label, 'L_distance/M_distance/R_distance' are our features.
+    A binary log (.rlog, see Server/binary_log.py) is memory-mapped instead of parsed.
     """
+    if csv_file.endswith(".rlog"):
+        records, header = load_binary_log(csv_file)
+        X = records["distance"].astype(np.float32)
+        directions_str = np.array(header["directions"])[records["direction"]].tolist()
+        return X, directions_str
+
     df = pd.read_csv(csv_file)
 
     drop_cols = ["timestamp", "light1", "light2", "line_sensors",